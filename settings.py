@@ -33,6 +33,22 @@ ENCRYPTION_KEY = SECRET_KEY
 
 EMAIL_VERIFICATION_TIMEOUT = 60 * 60 * 24
 
+# The max number of emails background tasks send concurrently.
+MAIL_MAX_CONCURRENT_SENDS = int(os.getenv("MAIL_MAX_CONCURRENT_SENDS", "10"))
+# The max number of emails background tasks send per second. 0 = no limit.
+MAIL_MAX_SENDS_PER_SECOND = float(os.getenv("MAIL_MAX_SENDS_PER_SECOND", "0"))
+# The max number of data warehouse tasks the scheduler runs concurrently.
+DATA_WAREHOUSE_MAX_CONCURRENT_TASKS = int(
+    os.getenv("DATA_WAREHOUSE_MAX_CONCURRENT_TASKS", "4")
+)
+# The number of seconds after which the scheduler stops starting data warehouse
+# tasks. The tasks already running are left to finish.
+DATA_WAREHOUSE_RUN_TIME_LIMIT = int(
+    os.getenv("DATA_WAREHOUSE_RUN_TIME_LIMIT", str(60 * 60 * 4))
+)
+# The max number of passwords hashed concurrently when managing students.
+PASSWORD_HASH_MAX_WORKERS = int(os.getenv("PASSWORD_HASH_MAX_WORKERS", "4"))
+
 # ⚠️ The template keys must match their names on Dotdigital.
 DOTDIGITAL_CAMPAIGN_IDS = {
     "Verify new user email - first reminder": 1557170,
@@ -279,6 +295,7 @@ MIDDLEWARE = [
 
 INSTALLED_APPS = [
     "src.api",
+    "src.data_warehouse",
     "src.sso",
     "src.rapid_router",
     "pipeline",
@@ -0,0 +1,105 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 15:21:06(+01:00).
+"""
+
+from codeforlife.user.models import (
+    Class,
+    IndependentUser,
+    School,
+    StudentUser,
+    Teacher,
+    TeacherUser,
+    User,
+)
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..data_warehouse.models import Change
+from .anonymization import anonymize_school, anonymize_users
+
+# pylint: disable=missing-class-docstring
+
+
+class TestAnonymization(TestCase):
+    fixtures = ["school_1"]
+
+    def test_anonymize_users(self):
+        """Can anonymize many users at once."""
+        users = [*TeacherUser.objects.all(), *IndependentUser.objects.all()]
+        assert len(users) > 1
+        user_ids = [user.id for user in users]
+
+        usernames = {user.username for user in users}
+
+        assert anonymize_users(user_ids) == len(users)
+
+        assert not User.objects.filter(id__in=user_ids, is_active=True).exists()
+        for user in users:
+            user.refresh_from_db()
+            assert user.first_name == ""
+            assert user.last_name == ""
+            assert user.email == ""
+            assert not user.is_active
+            assert user.username not in usernames
+            user.userprofile.refresh_from_db()
+            assert user.userprofile.google_refresh_token is None
+            assert user.userprofile.google_sub is None
+
+        # Anonymized users are skipped.
+        Change.objects.all().delete()
+        assert anonymize_users(user_ids) == 0
+        for user in users:
+            username = user.username
+            user.refresh_from_db()
+            assert user.username == username
+        assert not Change.objects.exists()
+
+    def test_anonymize_school(self):
+        """Can anonymize a school and cascade to its classes, their students
+        and its teachers in a fixed number of statements."""
+        school = School.objects.first()
+        assert school
+        klasses = list(Class.objects.filter(teacher__school=school))
+        student_users = list(
+            StudentUser.objects.filter(new_student__class_field__in=klasses)
+        )
+        teachers = list(Teacher.objects.filter(school=school))
+        assert klasses and student_users and teachers
+        Change.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            counts = anonymize_school(school)
+
+        assert counts == {
+            "schools": 1,
+            "classes": len(klasses),
+            "students": len(student_users),
+            "teachers": len(teachers),
+        }
+        assert len(queries) <= 20
+
+        school.refresh_from_db()
+        assert not school.is_active
+
+        for klass in klasses:
+            klass.refresh_from_db()
+            assert klass.access_code == ""
+            assert not klass.is_active
+
+        for student_user in student_users:
+            student_user.refresh_from_db()
+            assert student_user.first_name == ""
+            assert not student_user.is_active
+
+        for teacher in teachers:
+            teacher.refresh_from_db()
+            assert teacher.school is None
+            assert not teacher.is_admin
+
+        assert set(
+            Change.objects.filter(entity=Change.Entity.CLASS).values_list(
+                "entity_id", flat=True
+            )
+        ) == {klass.id for klass in klasses}
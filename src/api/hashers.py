@@ -0,0 +1,40 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 02:52:14(+01:00).
+
+Hashes many passwords at once.
+"""
+
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+
+def make_passwords(
+    raw_passwords: t.Sequence[str], max_workers: t.Optional[int] = None
+):
+    # pylint: disable=line-too-long
+    """Hash many passwords concurrently.
+
+    The password hashers release the GIL while hashing, so a pool of threads
+    hashes the passwords in parallel without leaving the request's process.
+
+    Args:
+        raw_passwords: The passwords to hash.
+        max_workers: The max number of passwords hashed at once. If None, the value will be retrieved from the PASSWORD_HASH_MAX_WORKERS setting.
+
+    Returns:
+        The hashed passwords, in the same order as the raw passwords.
+    """
+    # pylint: enable=line-too-long
+    if max_workers is None:
+        max_workers = settings.PASSWORD_HASH_MAX_WORKERS
+
+    max_workers = min(max_workers, len(raw_passwords))
+    if max_workers <= 1:
+        return [make_password(raw_password) for raw_password in raw_passwords]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(make_password, raw_passwords))
@@ -0,0 +1,39 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 02:55:40(+01:00).
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import check_password
+from django.test import SimpleTestCase
+
+from .hashers import make_passwords
+
+# pylint: disable=missing-class-docstring
+
+
+class TestHashers(SimpleTestCase):
+    raw_passwords = ["alpha", "bravo", "charlie", "delta"]
+
+    def _test_make_passwords(self, max_workers: int):
+        passwords = make_passwords(self.raw_passwords, max_workers=max_workers)
+
+        assert len(passwords) == len(self.raw_passwords)
+        for password, raw_password in zip(passwords, self.raw_passwords):
+            assert check_password(raw_password, password)
+
+    def test_make_passwords(self):
+        """The passwords are hashed concurrently and kept in order."""
+        self._test_make_passwords(max_workers=2)
+
+    def test_make_passwords__serial(self):
+        """The passwords are hashed one at a time if there's 1 worker."""
+        with patch("src.api.hashers.ThreadPoolExecutor") as executor_class:
+            self._test_make_passwords(max_workers=1)
+
+        executor_class.assert_not_called()
+
+    def test_make_passwords__none(self):
+        """No passwords are hashed if none are given."""
+        assert not make_passwords([], max_workers=2)
@@ -0,0 +1,260 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 13:02:41(+01:00).
+
+Helpers for sending Dotdigital emails in the background and in bulk.
+"""
+
+import logging
+import threading
+import time
+import typing as t
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+
+from codeforlife.mail import send_mail
+from django.conf import settings
+
+from .models import OutboxMail
+
+SendMail: t.TypeAlias = t.Callable[..., t.Any]
+
+K = t.TypeVar("K")
+
+
+def queue_mail(
+    campaign_id: int,
+    to_addresses: t.List[str],
+    personalization_values: t.Optional[t.Dict[str, str]] = None,
+):
+    """Queue a triggered campaign to be sent in the background.
+
+    The mail is written to the outbox as part of the current transaction and
+    is later sent by the send_queued_mail task. If the transaction is rolled
+    back, the mail is never sent.
+
+    Args:
+        campaign_id: The ID of the triggered campaign.
+        to_addresses: The email address(es) to send to.
+        personalization_values: The values of the campaign's placeholders.
+
+    Returns:
+        The queued mail.
+    """
+    return OutboxMail.objects.create(
+        campaign_id=campaign_id,
+        to_addresses=to_addresses,
+        personalization_values=personalization_values,
+    )
+
+
+def send_batched_mail(
+    campaign_id: int,
+    to_addresses: t.List[str],
+    send: SendMail = send_mail,
+    **kwargs,
+):
+    """Send a triggered campaign to many recipients in a single call.
+
+    If the batched call fails, the batch is split in half and each half is
+    retried until the recipients causing the failure are isolated. This keeps
+    the number of calls low while still reporting failures per recipient.
+
+    Args:
+        campaign_id: The ID of the triggered campaign.
+        to_addresses: The email addresses to send to.
+        send: The function used to send the mail.
+        **kwargs: Extra keyword arguments passed to each send.
+
+    Returns:
+        The email addresses the campaign could not be sent to.
+    """
+    if not to_addresses:
+        return []
+
+    try:
+        send(campaign_id=campaign_id, to_addresses=to_addresses, **kwargs)
+        return []
+    except Exception as ex:  # pylint: disable=broad-exception-caught
+        if len(to_addresses) == 1:
+            logging.exception(ex)
+            return to_addresses
+
+    middle = len(to_addresses) // 2
+    return send_batched_mail(
+        campaign_id, to_addresses[:middle], send, **kwargs
+    ) + send_batched_mail(campaign_id, to_addresses[middle:], send, **kwargs)
+
+
+@dataclass
+class Mail:
+    """A triggered campaign to send."""
+
+    campaign_id: int
+    to_addresses: t.List[str]
+    personalization_values: t.Optional[t.Dict[str, str]] = None
+
+    def send(self, send: SendMail):
+        """Send this mail.
+
+        Args:
+            send: The function used to send the mail.
+        """
+        kwargs: t.Dict[str, t.Any] = {
+            "campaign_id": self.campaign_id,
+            "to_addresses": self.to_addresses,
+        }
+        if self.personalization_values is not None:
+            kwargs["personalization_values"] = self.personalization_values
+
+        send(**kwargs)
+
+
+# pylint: disable-next=too-many-instance-attributes
+class MailDispatcher:
+    """Sends many emails concurrently with a bounded number of sends in flight.
+
+    Sends are rate limited and failed sends are retried with an exponential
+    backoff. This ensures the mail provider's latency does not dictate how long
+    it takes to send many emails.
+    """
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        send: SendMail = send_mail,
+        max_workers: t.Optional[int] = None,
+        rate_limit: t.Optional[float] = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        clock: t.Callable[[], float] = time.monotonic,
+        sleep: t.Callable[[float], t.Any] = time.sleep,
+    ):
+        # pylint: disable=line-too-long
+        """Create a mail dispatcher.
+
+        Args:
+            send: The function used to send each mail.
+            max_workers: The max number of sends in flight at once. If None, the value will be retrieved from the MAIL_MAX_CONCURRENT_SENDS setting.
+            rate_limit: The max number of sends per second. If None, the value will be retrieved from the MAIL_MAX_SENDS_PER_SECOND setting. A value of 0 disables rate limiting.
+            max_retries: The max number of times a failed send is retried.
+            backoff: The number of seconds to wait before the first retry. The wait doubles on each subsequent retry.
+            clock: The function used to get the current time in seconds.
+            sleep: The function used to wait for a number of seconds.
+        """
+        # pylint: enable=line-too-long
+        self.send = send
+        self.max_workers = (
+            settings.MAIL_MAX_CONCURRENT_SENDS
+            if max_workers is None
+            else max_workers
+        )
+        self.rate_limit = (
+            settings.MAIL_MAX_SENDS_PER_SECOND
+            if rate_limit is None
+            else rate_limit
+        )
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.clock = clock
+        self.sleep = sleep
+
+        self._rate_limit_lock = threading.Lock()
+        self._next_send_time = 0.0
+
+    def _wait_for_rate_limit(self):
+        if self.rate_limit <= 0:
+            return
+
+        # Reserve the next available send slot and wait for it.
+        with self._rate_limit_lock:
+            now = self.clock()
+            send_time = max(now, self._next_send_time)
+            self._next_send_time = send_time + (1 / self.rate_limit)
+
+        if send_time > now:
+            self.sleep(send_time - now)
+
+    def _send(self, mail: Mail):
+        retries = 0
+        while True:
+            self._wait_for_rate_limit()
+            try:
+                mail.send(self.send)
+                return
+            except Exception:  # pylint: disable=broad-exception-caught
+                if retries >= self.max_retries:
+                    raise
+
+                self.sleep(self.backoff * (2**retries))
+                retries += 1
+
+    def dispatch(
+        self, mails: t.Iterable[t.Tuple[K, Mail]]
+    ) -> t.Iterator[t.Tuple[K, t.Optional[Exception]]]:
+        """Send the mails concurrently.
+
+        The mails are consumed lazily so that at most a bounded number of them
+        are held in memory at once.
+
+        Args:
+            mails: The mails to send, each paired with a key to identify it.
+
+        Returns:
+            An iterator of each mail's key paired with the exception raised if
+            the mail could not be sent, in order of completion.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: t.Dict[Future, K] = {}
+
+            def collect(return_when: str):
+                done, _ = wait(futures, return_when=return_when)
+                for future in done:
+                    yield futures.pop(future), future.exception()
+
+            for key, mail in mails:
+                # Apply backpressure once there are enough sends in flight.
+                if len(futures) >= self.max_workers * 2:
+                    yield from collect(FIRST_COMPLETED)
+
+                futures[executor.submit(self._send, mail)] = key
+
+            if futures:
+                yield from collect(ALL_COMPLETED)
+
+
+@dataclass
+class FakeMailBackend:
+    """A local stand-in for Dotdigital which records the mail it receives.
+
+    Use this in place of send_mail to measure the throughput of sending mail
+    without any network access.
+    """
+
+    latency: float = 0.0  # seconds per send
+    fail_to_addresses: t.Set[str] = field(default_factory=set)
+    sent: t.List[t.Dict[str, t.Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def __call__(self, campaign_id: int, to_addresses: t.List[str], **kwargs):
+        time.sleep(self.latency)
+
+        if self.fail_to_addresses.intersection(to_addresses):
+            raise AssertionError("Failed to send email.")
+
+        with self._lock:
+            self.sent.append(
+                {
+                    "campaign_id": campaign_id,
+                    "to_addresses": to_addresses,
+                    **kwargs,
+                }
+            )
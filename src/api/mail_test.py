@@ -0,0 +1,125 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 13:20:12(+01:00).
+"""
+
+import threading
+import typing as t
+from unittest.mock import Mock
+
+from django.test import SimpleTestCase
+
+from .mail import FakeMailBackend, Mail, MailDispatcher, send_batched_mail
+
+# pylint: disable=missing-class-docstring
+
+
+class TestSendBatchedMail(SimpleTestCase):
+    def test_send_batched_mail(self):
+        """Can send a campaign to many recipients in one call."""
+        send = Mock()
+        to_addresses = [f"user{i}@codeforlife.com" for i in range(10)]
+
+        failed = send_batched_mail(1, to_addresses, send=send)
+
+        assert failed == []
+        send.assert_called_once_with(campaign_id=1, to_addresses=to_addresses)
+
+    def test_send_batched_mail__failures(self):
+        """Failures are isolated and reported per recipient."""
+        invalid_addresses = {"user3@codeforlife.com", "user7@codeforlife.com"}
+
+        def send(campaign_id: int, to_addresses: list):
+            assert campaign_id == 1
+            if invalid_addresses.intersection(to_addresses):
+                raise AssertionError("Failed to send email.")
+
+        to_addresses = [f"user{i}@codeforlife.com" for i in range(10)]
+
+        with self.assertLogs(level="ERROR"):
+            failed = send_batched_mail(1, to_addresses, send=send)
+
+        assert set(failed) == invalid_addresses
+
+
+class TestMailDispatcher(SimpleTestCase):
+    def test_dispatch(self):
+        """Can send many mails concurrently."""
+        max_workers, mail_count = 10, 20
+        # Each send blocks until a full set of sends is in flight at once.
+        barrier = threading.Barrier(max_workers, timeout=5)
+        send = Mock(side_effect=lambda **_: barrier.wait())
+        dispatcher = MailDispatcher(
+            send=send, max_workers=max_workers, rate_limit=0
+        )
+
+        results = dict(
+            dispatcher.dispatch(
+                (i, Mail(campaign_id=1, to_addresses=[f"user{i}@cfl.com"]))
+                for i in range(mail_count)
+            )
+        )
+
+        assert results == {i: None for i in range(mail_count)}
+        assert send.call_count == mail_count
+
+    def test_dispatch__retry(self):
+        """Failed sends are retried before reporting the failure."""
+        send = Mock(side_effect=[AssertionError(), None])
+        sleep = Mock()
+        dispatcher = MailDispatcher(
+            send=send, rate_limit=0, backoff=0.5, sleep=sleep
+        )
+
+        results = list(
+            dispatcher.dispatch(
+                [(1, Mail(campaign_id=1, to_addresses=["user@cfl.com"]))]
+            )
+        )
+
+        assert results == [(1, None)]
+        assert send.call_count == 2
+        sleep.assert_called_once_with(0.5)
+
+    def test_dispatch__failure(self):
+        """Sends that still fail after all retries are reported."""
+        send = FakeMailBackend(fail_to_addresses={"invalid@cfl.com"})
+        dispatcher = MailDispatcher(
+            send=send, rate_limit=0, max_retries=1, backoff=0
+        )
+
+        results = dict(
+            dispatcher.dispatch(
+                [
+                    (1, Mail(campaign_id=1, to_addresses=["valid@cfl.com"])),
+                    (2, Mail(campaign_id=1, to_addresses=["invalid@cfl.com"])),
+                ]
+            )
+        )
+
+        assert results[1] is None
+        assert isinstance(results[2], AssertionError)
+
+    def test_dispatch__rate_limit(self):
+        """Sends are spaced out to respect the rate limit."""
+        send = FakeMailBackend()
+        sleeps: t.List[float] = []
+        dispatcher = MailDispatcher(
+            send=send,
+            max_workers=5,
+            rate_limit=4,
+            # Time stands still so each wait is the full reserved interval.
+            clock=lambda: 0.0,
+            sleep=sleeps.append,
+        )
+
+        list(
+            dispatcher.dispatch(
+                (i, Mail(campaign_id=1, to_addresses=[f"user{i}@cfl.com"]))
+                for i in range(5)
+            )
+        )
+
+        assert len(send.sent) == 5
+        # 5 sends at 4 per second are spaced 250ms apart.
+        assert sorted(sleeps) == [0.25, 0.5, 0.75, 1.0]
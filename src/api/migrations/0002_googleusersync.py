@@ -0,0 +1,50 @@
+# Generated by Django 5.1.15 on 2026-10-18 15:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+        ("user", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GoogleUserSync",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_synced_at",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                (
+                    "last_failed_at",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                ("failure_count", models.PositiveIntegerField(default=0)),
+                ("retry_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="google_sync",
+                        to="user.user",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Google-user sync",
+            },
+        ),
+    ]
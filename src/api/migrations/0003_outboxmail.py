@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-18 16:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_googleusersync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxMail",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("campaign_id", models.PositiveIntegerField()),
+                ("to_addresses", models.JSONField()),
+                (
+                    "personalization_values",
+                    models.JSONField(blank=True, null=True),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("sent_at", models.DateTimeField(blank=True, null=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True, default="")),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("sent_at__isnull", True)),
+                        fields=["id"],
+                        name="outbox_mail__unsent",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.15 on 2026-10-19 02:24
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_outboxmail"),
+        ("common", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TeacherDeletionJob",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=9,
+                    ),
+                ),
+                (
+                    "class_count",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                ("classes_processed", models.PositiveIntegerField(default=0)),
+                (
+                    "student_count",
+                    models.PositiveIntegerField(blank=True, null=True),
+                ),
+                (
+                    "students_processed",
+                    models.PositiveIntegerField(default=0),
+                ),
+                ("error", models.TextField(blank=True, default="")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="deletion_jobs",
+                        to="common.teacher",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Teacher-deletion job",
+            },
+        ),
+    ]
@@ -3,4 +3,8 @@
 Created on 06/02/2024 at 15:13:00(+00:00).
 """
 
+from .google_user_sync import GoogleUserSync
+from .outbox_mail import OutboxMail
 from .school_teacher_invitation import SchoolTeacherInvitation
+from .task_checkpoint import TaskCheckpoint
+from .teacher_deletion_job import TeacherDeletionJob
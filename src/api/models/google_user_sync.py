@@ -0,0 +1,138 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 15:48:30(+01:00).
+"""
+
+import typing as t
+from datetime import timedelta
+
+from codeforlife.user.models import GoogleUser, User
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from django_stubs_ext.db.models import TypedModelMeta
+else:
+    TypedModelMeta = object
+
+
+# pylint: disable-next=missing-class-docstring
+class GoogleUserSyncManager(models.Manager["GoogleUserSync"]):
+    def get_stale_user_ids(self, stale_after: timedelta):
+        """Get the IDs of the Google-users which are due to be synced.
+
+        A Google-user is due to be synced if they've never been synced or their
+        last sync is older than the given age, unless they're backing off after
+        a failed sync.
+
+        Args:
+            stale_after: How long a sync remains fresh for.
+
+        Returns:
+            A queryset of the IDs of the Google-users to sync.
+        """
+        now = timezone.now()
+
+        return (
+            GoogleUser.objects.filter(
+                Q(google_sync__isnull=True)
+                | (
+                    (
+                        Q(google_sync__last_synced_at__isnull=True)
+                        | Q(google_sync__last_synced_at__lte=now - stale_after)
+                    )
+                    & (
+                        Q(google_sync__retry_at__isnull=True)
+                        | Q(google_sync__retry_at__lte=now)
+                    )
+                )
+            )
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def record(
+        self,
+        synced_user_ids: t.Collection[int],
+        failed_user_ids: t.Collection[int],
+    ):
+        """Record the outcome of syncing Google-users.
+
+        Args:
+            synced_user_ids: The IDs of the users that were synced.
+            failed_user_ids: The IDs of the users that failed to sync.
+        """
+        now = timezone.now()
+
+        failure_counts = dict(
+            self.filter(user_id__in=failed_user_ids).values_list(
+                "user_id", "failure_count"
+            )
+        )
+
+        def failed(user_id: int):
+            failure_count = failure_counts.get(user_id, 0) + 1
+            return GoogleUserSync(
+                user_id=user_id,
+                last_failed_at=now,
+                failure_count=failure_count,
+                retry_at=now + GoogleUserSync.get_backoff(failure_count),
+            )
+
+        self.bulk_create(
+            [
+                GoogleUserSync(user_id=user_id, last_synced_at=now)
+                for user_id in synced_user_ids
+            ],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["last_synced_at", "failure_count", "retry_at"],
+        )
+        self.bulk_create(
+            [failed(user_id) for user_id in failed_user_ids],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["last_failed_at", "failure_count", "retry_at"],
+        )
+
+
+class GoogleUserSync(models.Model):
+    """Tracks when a Google-user was last synced with Google."""
+
+    # The wait before retrying after the 1st consecutive failure. The wait is
+    # doubled for each subsequent failure, up to the max.
+    backoff = timedelta(hours=1)
+    max_backoff = timedelta(days=7)
+
+    user = models.OneToOneField(
+        User,
+        related_name="google_sync",
+        on_delete=models.CASCADE,
+    )
+    last_synced_at = models.DateTimeField(null=True, blank=True)
+    last_failed_at = models.DateTimeField(null=True, blank=True)
+    failure_count = models.PositiveIntegerField(default=0)
+    retry_at = models.DateTimeField(null=True, blank=True)
+
+    objects: GoogleUserSyncManager = GoogleUserSyncManager()
+
+    class Meta(TypedModelMeta):
+        verbose_name = "Google-user sync"
+
+    def __str__(self):
+        return f"Google-user sync for user {self.user_id}"
+
+    @classmethod
+    def get_backoff(cls, failure_count: int):
+        """Get how long to wait before retrying a failed sync.
+
+        Args:
+            failure_count: The number of consecutive failed syncs.
+
+        Returns:
+            The time to wait before the next sync.
+        """
+        # NOTE: The exponent is capped to avoid overflowing.
+        exponent = min(failure_count - 1, 16)
+        return min(cls.backoff * (2**exponent), cls.max_backoff)
@@ -0,0 +1,43 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 16:34:12(+01:00).
+"""
+
+import typing as t
+
+from django.db import models
+from django.db.models import Q
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from django_stubs_ext.db.models import TypedModelMeta
+else:
+    TypedModelMeta = object
+
+
+class OutboxMail(models.Model):
+    """A triggered campaign which is waiting to be sent in the background.
+
+    Mail is written to the outbox in the same transaction as the changes which
+    triggered it. It's therefore only sent if the transaction commits, and
+    sending it does not slow down the request.
+    """
+
+    campaign_id = models.PositiveIntegerField()
+    to_addresses = models.JSONField()
+    personalization_values = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, default="")
+
+    class Meta(TypedModelMeta):
+        indexes = [
+            models.Index(
+                fields=["id"],
+                condition=Q(sent_at__isnull=True),
+                name="outbox_mail__unsent",
+            )
+        ]
+
+    def __str__(self):
+        return f"Campaign {self.campaign_id} mail ({self.id})"
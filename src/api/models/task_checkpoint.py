@@ -0,0 +1,88 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 14:10:27(+01:00).
+"""
+
+import logging
+import typing as t
+
+from django.db import models
+from django.db.models.query import QuerySet
+from django.utils import timezone
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from django_stubs_ext.db.models import TypedModelMeta
+else:
+    TypedModelMeta = object
+
+
+# pylint: disable-next=missing-class-docstring,too-few-public-methods
+class TaskCheckpointManager(models.Manager["TaskCheckpoint"]):
+    def iter_chunks(
+        self,
+        task_name: str,
+        get_queryset: t.Callable[[int], QuerySet[t.Any]],
+        chunk_size: int,
+    ):
+        """Iterate over a queryset in chunks, resuming from today's checkpoint.
+
+        The queryset is paginated by ID (keyset pagination) and a checkpoint is
+        saved after each chunk is processed. If the task is interrupted, a rerun
+        on the same day resumes after the last processed chunk instead of
+        starting from the beginning.
+
+        Args:
+            task_name: The name which uniquely identifies the task's run.
+            get_queryset: A callable which receives the last processed ID and
+                returns the queryset of rows after it.
+            chunk_size: The number of rows per chunk.
+
+        Yields:
+            A list of rows. The checkpoint is saved when the next chunk is
+            requested, after the current chunk has been processed.
+        """
+        run_date = timezone.now().date()
+
+        # Only the current run's checkpoint is needed.
+        self.filter(task_name=task_name, run_date__lt=run_date).delete()
+
+        checkpoint, _ = self.get_or_create(
+            task_name=task_name, run_date=run_date
+        )
+        if checkpoint.last_id:
+            logging.info(
+                'Resuming "%s" after id: %d.', task_name, checkpoint.last_id
+            )
+
+        while True:
+            chunk = list(
+                get_queryset(checkpoint.last_id).order_by("id")[:chunk_size]
+            )
+            if not chunk:
+                return
+
+            yield chunk
+
+            row = chunk[-1]
+            checkpoint.last_id = row["id"] if isinstance(row, dict) else row.id
+            checkpoint.save(update_fields=["last_id", "updated_at"])
+
+            if len(chunk) < chunk_size:
+                return
+
+
+class TaskCheckpoint(models.Model):
+    """The progress of a task's run, used to resume the task if interrupted."""
+
+    task_name = models.CharField(max_length=255)
+    run_date = models.DateField()
+    last_id = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects: TaskCheckpointManager = TaskCheckpointManager()
+
+    class Meta(TypedModelMeta):
+        unique_together = ["task_name", "run_date"]
+
+    def __str__(self):
+        return f"{self.task_name} ({self.run_date}): {self.last_id}"
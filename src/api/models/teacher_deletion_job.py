@@ -0,0 +1,78 @@
+# TODO: remove this in new system
+# mypy: disable-error-code="import-untyped"
+"""
+© Ocado Group
+Created on 19/10/2026 at 02:21:34(+01:00).
+"""
+
+import typing as t
+from datetime import timedelta
+from uuid import uuid4
+
+from codeforlife.user.models import Teacher
+from django.db import models
+from django.utils import timezone
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from django_stubs_ext.db.models import TypedModelMeta
+else:
+    TypedModelMeta = object
+
+
+class TeacherDeletionJob(models.Model):
+    """A background job which deletes a teacher's account by anonymizing their
+    classes, the classes' students and then the teacher.
+
+    The job's progress is polled by its ID, which can't be guessed, since the
+    teacher can no longer log in once they're anonymized.
+    """
+
+    # pylint: disable-next=too-many-ancestors
+    class Status(models.TextChoices):
+        """The stage the job is at."""
+
+        PENDING = "pending"
+        RUNNING = "running"
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    # How long an unfinished job can go without progress before its worker is
+    # assumed to have died.
+    stale_after = timedelta(minutes=10)
+
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    teacher = models.ForeignKey(
+        Teacher,
+        on_delete=models.CASCADE,
+        related_name="deletion_jobs",
+    )
+    status = models.CharField(
+        max_length=9, choices=Status.choices, default=Status.PENDING
+    )
+    # The totals are counted once the job starts running.
+    class_count = models.PositiveIntegerField(null=True, blank=True)
+    classes_processed = models.PositiveIntegerField(default=0)
+    student_count = models.PositiveIntegerField(null=True, blank=True)
+    students_processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(TypedModelMeta):
+        verbose_name = "Teacher-deletion job"
+
+    @property
+    def is_stale(self):
+        """Whether the job is unfinished and hasn't progressed recently."""
+        return (
+            self.status
+            in [
+                TeacherDeletionJob.Status.PENDING,
+                TeacherDeletionJob.Status.RUNNING,
+            ]
+            and self.updated_at < timezone.now() - self.stale_after
+        )
+
+    def __str__(self):
+        return f"Teacher-deletion job {self.id} ({self.status})"
@@ -23,6 +23,7 @@ from .teacher import (
     RemoveTeacherFromSchoolSerializer,
     SetSchoolTeacherAdminAccessSerializer,
 )
+from .teacher_deletion_job import TeacherDeletionJobSerializer
 from .user import (
     CreateUserSerializer,
     HandleIndependentUserJoinClassRequestSerializer,
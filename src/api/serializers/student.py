@@ -6,6 +6,7 @@ Created on 29/01/2024 at 10:14:59(+00:00).
 import typing as t
 from itertools import groupby
 
+import pyotp
 from codeforlife.serializers import ModelListSerializer
 from codeforlife.types import DataDict
 from codeforlife.user.models import (
@@ -13,12 +14,19 @@ from codeforlife.user.models import (
     Student,
     StudentUser,
     User,
+    UserProfile,
     user_first_name_validators,
 )
 from codeforlife.user.serializers import StudentSerializer
+from common.models import TotalActivity  # type: ignore[import-untyped]
+from django.db import transaction
+from django.db.models import F
 from django.db.models.functions import Lower
+from django.utils.crypto import get_random_string
 from rest_framework import serializers
 
+from ...data_warehouse.models import Change
+from ..hashers import make_passwords
 from .user import BaseUserSerializer
 
 # pylint: disable=missing-class-docstring
@@ -166,10 +174,26 @@ class BaseStudentPasswordSerializer(BaseStudentSerializer):
 
 
 class CreateStudentListSerializer(BaseStudentListSerializer):
+    @staticmethod
+    def _get_random_usernames(count: int):
+        usernames: t.Set[str] = set()
+        while len(usernames) < count:
+            candidates = {
+                get_random_string(length=30)
+                for _ in range(count - len(usernames))
+            }
+            usernames |= candidates - set(
+                User.objects.filter(username__in=candidates).values_list(
+                    "username", flat=True
+                )
+            )
+
+        return list(usernames)
+
     def create(self, validated_data):
         classes = {
             klass.access_code: klass
-            for klass in Class.objects.filter(
+            for klass in Class.objects.select_related("teacher__school").filter(
                 access_code__in={
                     student_fields["class_field"]["access_code"]
                     for student_fields in validated_data
@@ -177,15 +201,76 @@ class CreateStudentListSerializer(BaseStudentListSerializer):
             )
         }
 
-        # TODO: replace this logic with bulk creates for each object when we
-        #   switch to PostgreSQL.
-        return [
-            StudentUser.objects.create_user(
-                first_name=student_fields["new_user"]["first_name"],
-                klass=classes[student_fields["class_field"]["access_code"]],
-            ).student
-            for student_fields in validated_data
-        ]
+        # pylint: disable=protected-access
+        passwords = [StudentUser._get_random_password() for _ in validated_data]
+        login_ids = [StudentUser._get_random_login_id() for _ in validated_data]
+        # pylint: enable=protected-access
+
+        # Hashing is slow, so hash every password before writing any rows.
+        hashed_passwords = make_passwords(passwords)
+        usernames = self._get_random_usernames(len(validated_data))
+
+        # Does the same as StudentUser.objects.create_user() for each student
+        # but in a fixed number of statements. Bulk creates skip the models'
+        # signals, so the users' OTP secrets are set and their changes are
+        # recorded in the data warehouse's journal here.
+        with transaction.atomic():
+            users = StudentUser.objects.bulk_create(
+                [
+                    StudentUser(
+                        first_name=student_fields["new_user"]["first_name"],
+                        username=username,
+                        password=hashed_password,
+                    )
+                    for student_fields, username, hashed_password in zip(
+                        validated_data, usernames, hashed_passwords
+                    )
+                ]
+            )
+            user_profiles = UserProfile.objects.bulk_create(
+                [
+                    UserProfile(user=user, otp_secret=pyotp.random_base32())
+                    for user in users
+                ]
+            )
+            students = Student.objects.bulk_create(
+                [
+                    Student(
+                        class_field=classes[
+                            student_fields["class_field"]["access_code"]
+                        ],
+                        user=user_profile,
+                        new_user=user_profile.user,
+                        login_id=hashed_login_id,
+                    )
+                    for student_fields, user_profile, hashed_login_id in zip(
+                        validated_data,
+                        user_profiles,
+                        (hashed_login_id for _, hashed_login_id in login_ids),
+                    )
+                ]
+            )
+
+            # TODO: delete this in new data schema
+            TotalActivity.objects.update(
+                student_registrations=F("student_registrations") + len(students)
+            )
+
+            Change.objects.record(
+                Change.Entity.USER, [user.pk for user in users]
+            )
+            Change.objects.record(
+                Change.Entity.STUDENT, [student.pk for student in students]
+            )
+
+        # Return the students' auto-generated passwords to the teacher.
+        # pylint: disable=protected-access
+        for user, password, (login_id, _) in zip(users, passwords, login_ids):
+            user._password = password
+            user._login_id = login_id
+        # pylint: enable=protected-access
+
+        return students
 
 
 class CreateStudentSerializer(BaseStudentPasswordSerializer):
@@ -257,20 +342,36 @@ class ReleaseStudentSerializer(BaseStudentSerializer):
 class TransferStudentListSerializer(BaseStudentListSerializer):
     def update(self, instance, validated_data):
         classes = {
-            data["class_field"]["access_code"]: Class.objects.get(
-                access_code=data["class_field"]["access_code"]
+            klass.access_code: klass
+            for klass in Class.objects.filter(
+                access_code__in={
+                    data["class_field"]["access_code"]
+                    for data in validated_data
+                }
             )
-            for data in validated_data
         }
 
+        users: t.List[User] = []
         for student, data in zip(instance, validated_data):
             student.class_field = classes[data["class_field"]["access_code"]]
-            student.save(update_fields=["class_field"])
 
             user_fields = t.cast(DataDict, data.get("new_user", {}))
             if "first_name" in user_fields:
                 student.new_user.first_name = user_fields["first_name"]
-                student.new_user.save(update_fields=["first_name"])
+                users.append(student.new_user)
+
+        # Bulk updates skip the models' signals, so the changes are recorded
+        # in the data warehouse's journal here.
+        with transaction.atomic():
+            Student.objects.bulk_update(instance, fields=["class_field"])
+            User.objects.bulk_update(users, fields=["first_name"])
+
+            Change.objects.record(
+                Change.Entity.STUDENT, [student.pk for student in instance]
+            )
+            Change.objects.record(
+                Change.Entity.USER, [user.pk for user in users]
+            )
 
         return instance
 
@@ -302,24 +403,41 @@ class TransferStudentSerializer(BaseStudentSerializer):
 
 class ResetStudentListPasswordSerializer(BaseStudentListSerializer):
     def update(self, instance, validated_data):
-        for student, data in zip(instance, validated_data):
-            # TODO: use proxy in new model and replace with student.user
-            student_user = StudentUser(
-                pk=student.new_user.pk,
-                new_student=student,  # type: ignore[misc]
-            )
+        # pylint: disable=protected-access
+        passwords = [
+            t.cast(DataDict, data.get("new_user", {})).get("password")
+            or StudentUser._get_random_password()
+            for data in validated_data
+        ]
 
-            user_fields = t.cast(DataDict, data.get("new_user", {}))
-            student_user.set_password(user_fields.get("password"))
-            student.save(update_fields=["login_id"])
-
-            # Save deletes the raw password.
-            # Need to preserve it and return it to the teacher.
-            # pylint: disable=protected-access
-            password = student.new_user._password
-            student.new_user.save(update_fields=["password"])
+        # Does the same as StudentUser.set_password() for each student but
+        # hashes the passwords concurrently and saves them in bulk.
+        for student, password, hashed_password in zip(
+            instance, passwords, make_passwords(passwords)
+        ):
+            login_id, student.login_id = StudentUser._get_random_login_id()
+            student.new_user.password = hashed_password
+
+            # Need to preserve the raw password and return it to the teacher.
             student.new_user._password = password
-            # pylint: enable=protected-access
+            student.new_user._login_id = login_id
+        # pylint: enable=protected-access
+
+        # Bulk updates skip the models' signals, so the changes are recorded
+        # in the data warehouse's journal here.
+        with transaction.atomic():
+            Student.objects.bulk_update(instance, fields=["login_id"])
+            User.objects.bulk_update(
+                [student.new_user for student in instance], fields=["password"]
+            )
+
+            Change.objects.record(
+                Change.Entity.USER,
+                [student.new_user.pk for student in instance],
+            )
+            Change.objects.record(
+                Change.Entity.STUDENT, [student.pk for student in instance]
+            )
 
         return instance
 
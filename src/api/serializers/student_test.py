@@ -3,6 +3,7 @@
 Created on 30/01/2024 at 19:03:45(+00:00).
 """
 
+import typing as t
 from unittest.mock import patch
 
 from codeforlife.tests import (
@@ -17,14 +18,20 @@ from codeforlife.user.models import (
     User,
 )
 from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
+from ...data_warehouse.models import Change
 from .student import (
     BaseStudentListSerializer,
     BaseStudentPasswordSerializer,
     BaseStudentSerializer,
+    CreateStudentListSerializer,
     CreateStudentSerializer,
     ReleaseStudentSerializer,
+    ResetStudentListPasswordSerializer,
     ResetStudentPasswordSerializer,
+    TransferStudentListSerializer,
     TransferStudentSerializer,
 )
 
@@ -214,6 +221,47 @@ class TestCreateStudentSerializer(ModelSerializerTestCase[User, Student]):
             ]
         )
 
+    def test_create_many__bulk(self):
+        """
+        Many students are created in a fixed number of queries and their
+        auto-generated passwords are returned.
+        """
+        first_names = [f"Bulk{i}" for i in range(10)]
+        Change.objects.all().delete()
+
+        serializer = CreateStudentListSerializer(
+            child=CreateStudentSerializer()
+        )
+        with CaptureQueriesContext(connection) as queries:
+            students = serializer.create(
+                [
+                    {
+                        "new_user": {"first_name": first_name},
+                        "class_field": {"access_code": self.klass.access_code},
+                    }
+                    for first_name in first_names
+                ]
+            )
+
+        assert len(queries) <= 10
+        assert [
+            student.new_user.first_name for student in students
+        ] == first_names
+        for student in students:
+            # pylint: disable=protected-access
+            student_user = StudentUser.objects.get(pk=student.new_user.pk)
+            assert student_user.check_password(student.new_user._password)
+            assert student_user.student.class_field == self.klass
+            assert student_user.student.user.otp_secret
+            assert student.new_user._login_id
+            # pylint: enable=protected-access
+
+        assert set(
+            Change.objects.filter(entity=Change.Entity.STUDENT).values_list(
+                "entity_id", flat=True
+            )
+        ) == {student.pk for student in students}
+
 
 class TestReleaseStudentSerializer(ModelSerializerTestCase[User, Student]):
     model_serializer_class = ReleaseStudentSerializer
@@ -269,6 +317,47 @@ class TestTransferStudentSerializer(ModelSerializerTestCase[User, Student]):
             ],
         )
 
+    def test_update__bulk(self):
+        """
+        The students are transferred in a fixed number of queries, however
+        many students and classes there are.
+        """
+        for i in range(3):
+            StudentUser.objects.create_user(
+                first_name=f"Transfer{i}", klass=self.class_1
+            )
+
+        students = list(self.class_1.students.prefetch_related("new_user"))
+        assert len(students) > 1
+        access_code = self.class_2.access_code
+
+        serializer = t.cast(
+            TransferStudentListSerializer,
+            TransferStudentSerializer(instance=students, many=True),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            serializer.update(
+                students,
+                [
+                    {
+                        "class_field": {"access_code": access_code},
+                        **(
+                            {"new_user": {"first_name": f"Bulk{student.pk}"}}
+                            if i % 2 == 0
+                            else {}
+                        ),
+                    }
+                    for i, student in enumerate(students)
+                ],
+            )
+
+        assert len(queries) <= 7
+        for i, student in enumerate(students):
+            student.refresh_from_db()
+            assert student.class_field == self.class_2
+            if i % 2 == 0:
+                assert student.new_user.first_name == f"Bulk{student.pk}"
+
 
 class TestResetStudentPasswordSerializer(
     ModelSerializerTestCase[User, Student]
@@ -287,7 +376,7 @@ class TestResetStudentPasswordSerializer(
         assert not self.student.new_user.check_password(password)
 
         with patch(
-            "django.contrib.auth.base_user.make_password",
+            "src.api.hashers.make_password",
             return_value=make_password(password),
         ) as user_make_password:
             with patch.object(
@@ -311,3 +400,35 @@ class TestResetStudentPasswordSerializer(
 
                 get_random_login_id.assert_called_once()
             user_make_password.assert_called_once_with(password)
+
+    def test_update_many__random_passwords(self):
+        """
+        The students' passwords are randomly generated if not provided and the
+        raw passwords are returned.
+        """
+        students = list(Student.objects.filter(class_field__isnull=False)[:3])
+        assert len(students) > 1
+        Change.objects.all().delete()
+
+        serializer = t.cast(
+            ResetStudentListPasswordSerializer,
+            ResetStudentPasswordSerializer(instance=students, many=True),
+        )
+        serializer.update(students, [{} for _ in students])
+
+        for student in students:
+            # pylint: disable=protected-access
+            password = student.new_user._password
+            assert password
+            assert student.new_user._login_id
+            # pylint: enable=protected-access
+
+            student_user = StudentUser.objects.get(pk=student.new_user.pk)
+            assert student_user.check_password(password)
+            assert student_user.student.login_id == student.login_id
+
+        assert set(
+            Change.objects.filter(entity=Change.Entity.USER).values_list(
+                "entity_id", flat=True
+            )
+        ) == {student.new_user.pk for student in students}
@@ -0,0 +1,28 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 02:31:07(+01:00).
+"""
+
+from codeforlife.serializers import ModelSerializer
+from codeforlife.user.models import User
+
+from ..models import TeacherDeletionJob
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-many-ancestors
+
+
+class TeacherDeletionJobSerializer(ModelSerializer[User, TeacherDeletionJob]):
+    class Meta:
+        model = TeacherDeletionJob
+        fields = [
+            "id",
+            "status",
+            "class_count",
+            "classes_processed",
+            "student_count",
+            "students_processed",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
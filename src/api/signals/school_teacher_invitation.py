@@ -7,12 +7,12 @@ All signals for the SchoolTeacherInvitation model.
 
 from urllib.parse import urlencode
 
-from codeforlife.mail import send_mail
 from codeforlife.user.models import User
 from django.conf import settings
 from django.db.models import signals
 from django.dispatch import receiver
 
+from ..mail import queue_mail
 from ..models import SchoolTeacherInvitation
 
 # pylint: disable=unused-argument
@@ -37,7 +37,7 @@ def school_teacher_invitation__post_save(
         if User.objects.filter(
             email__iexact=instance.invited_teacher_email
         ).exists():
-            send_mail(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS[
                     "Invite teacher - account exists"
                 ],
@@ -48,7 +48,7 @@ def school_teacher_invitation__post_save(
                 },
             )
         else:
-            send_mail(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS[
                     "Invite teacher - account doesn't exist"
                 ],
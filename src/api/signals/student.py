@@ -5,7 +5,6 @@ Created on 17/06/2024 at 15:02:11(+01:00).
 All signals for the Student model.
 """
 
-from codeforlife.mail import send_mail
 from codeforlife.models.signals import (
     UpdateFields,
     post_save,
@@ -19,6 +18,7 @@ from django.dispatch import receiver
 from django.urls import reverse
 
 from ..auth import email_verification_token_generator
+from ..mail import queue_mail
 
 # pylint: disable=unused-argument
 
@@ -83,7 +83,7 @@ def student__post_save(
         )
 
         # TODO: user student.user.email_user() in new schema.
-        send_mail(
+        queue_mail(
             settings.DOTDIGITAL_CAMPAIGN_IDS["Verify released student email"],
             to_addresses=[instance.new_user.email],
             personalization_values={
@@ -106,7 +106,7 @@ def student__post_save(
 
             if instance.class_field is None:
                 # TODO: user student.user.email_user() in new schema.
-                send_mail(
+                queue_mail(
                     settings.DOTDIGITAL_CAMPAIGN_IDS[
                         "Student join request rejected"
                     ],
@@ -123,7 +123,7 @@ def student__post_save(
             else:
                 # TODO: user student.user.email_user() in new schema.
                 access_code = instance.class_field.access_code
-                send_mail(
+                queue_mail(
                     settings.DOTDIGITAL_CAMPAIGN_IDS[
                         "Student join request accepted"
                     ],
@@ -138,7 +138,7 @@ def student__post_save(
                 )
         else:
             # TODO: user student.user.email_user() in new schema.
-            send_mail(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS[
                     "Student join request notification"
                 ],
@@ -152,7 +152,7 @@ def student__post_save(
                 },
             )
 
-            send_mail(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS["Student join request sent"],
                 to_addresses=[instance.new_user.email],
                 personalization_values={
@@ -29,8 +29,8 @@ class TestStudent(TestCase):
 
         assert student.previous_class_field == klass
 
-    @patch("src.api.signals.student.send_mail")
-    def test_post_save(self, send_mail: Mock):
+    @patch("src.api.signals.student.queue_mail")
+    def test_post_save(self, queue_mail: Mock):
         """Releasing a student from a class sends them an email."""
         student = Student.objects.filter(class_field__isnull=False).first()
         assert student
@@ -55,7 +55,7 @@ class TestStudent(TestCase):
                 student.new_user.pk, student.new_user.email
             )
 
-        send_mail.assert_called_once_with(
+        queue_mail.assert_called_once_with(
             settings.DOTDIGITAL_CAMPAIGN_IDS["Verify released student email"],
             to_addresses=[student.new_user.email],
             personalization_values={
@@ -5,7 +5,6 @@ Created on 20/06/2024 at 15:36:58(+01:00).
 All signals for the Teacher model.
 """
 
-from codeforlife.mail import send_mail
 from codeforlife.models.signals import (
     UpdateFields,
     post_save,
@@ -17,6 +16,8 @@ from codeforlife.user.signals import teacher_receiver
 from django.conf import settings
 from django.db.models import signals
 
+from ..mail import queue_mail
+
 # pylint: disable=unused-argument
 
 
@@ -63,7 +64,7 @@ def teacher__post_save(
             if post_save.check_previous_values(
                 instance, {"is_admin": lambda value: not value}
             ):
-                send_mail(
+                queue_mail(
                     settings.DOTDIGITAL_CAMPAIGN_IDS["Admin given"],
                     to_addresses=[instance.new_user.email],
                     personalization_values={
@@ -76,7 +77,7 @@ def teacher__post_save(
         elif post_save.check_previous_values(
             instance, {"is_admin": lambda value: value}
         ):
-            send_mail(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS["Admin revoked"],
                 to_addresses=[instance.new_user.email],
                 personalization_values={
@@ -92,7 +93,7 @@ def teacher__post_save(
                 instance, "school", School
             )
 
-            send_mail(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS[
                     "Teacher released from school"
                 ],
@@ -6,14 +6,13 @@ All signals for the User model.
 """
 
 import pyotp
-from codeforlife.mail import send_mail
 from codeforlife.models.signals import (
     UpdateFields,
     post_save,
     pre_save,
     update_fields_includes,
 )
-from codeforlife.user.models import StudentUser, TeacherUser, User, UserProfile
+from codeforlife.user.models import StudentUser, User, UserProfile
 from codeforlife.user.signals import user_receiver
 from django.conf import settings
 from django.db.models import signals
@@ -21,6 +20,7 @@ from django.dispatch import receiver
 from django.urls import reverse
 
 from ..auth import email_verification_token_generator
+from ..mail import queue_mail
 
 # pylint: disable=unused-argument
 
@@ -89,9 +89,9 @@ def user__post_save(
                 },
             )
 
-            teacher_user = instance.as_type(TeacherUser)
-            teacher_user.email_user(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS["Verify new user email"],
+                to_addresses=[instance.email],
                 personalization_values={
                     "VERIFICATION_LINK": verify_email_address_link
                 },
@@ -114,7 +114,7 @@ def user__post_save(
                 instance, "email", str
             )
 
-            send_mail(
+            queue_mail(
                 settings.DOTDIGITAL_CAMPAIGN_IDS["Email has changed"],
                 to_addresses=[previous_email],
                 personalization_values={"NEW_EMAIL_ADDRESS": instance.email},
@@ -127,7 +127,7 @@ def user__post_save(
         and (not instance.student or not instance.student.class_field)
         and post_save.previous_values_are_unequal(instance, {"email"})
     ):
-        send_mail(
+        queue_mail(
             settings.DOTDIGITAL_CAMPAIGN_IDS["Account deletion"],
             to_addresses=[instance.email],
         )
@@ -136,7 +136,7 @@ def user__post_save(
 @user_receiver(signals.post_delete)
 def user__post_delete(sender, instance: User, **kwargs):
     """After a user is deleted."""
-    send_mail(
+    queue_mail(
         settings.DOTDIGITAL_CAMPAIGN_IDS["Account deletion"],
         to_addresses=[instance.email],
     )
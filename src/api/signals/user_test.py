@@ -38,8 +38,8 @@ class TestUser(TestCase):
         user.save()
         assert user.username == email
 
-    @patch("src.api.signals.user.send_mail")
-    def test_post_save__email_change_notification(self, send_mail: Mock):
+    @patch("src.api.signals.user.queue_mail")
+    def test_post_save__email_change_notification(self, queue_mail: Mock):
         """Updating the email field sends a verification email."""
         user = TeacherUser.objects.first()
         assert user
@@ -51,7 +51,7 @@ class TestUser(TestCase):
 
         user.save()
 
-        send_mail.assert_has_calls(
+        queue_mail.assert_has_calls(
             [
                 call(
                     settings.DOTDIGITAL_CAMPAIGN_IDS["Email has changed"],
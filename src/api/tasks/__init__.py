@@ -4,6 +4,7 @@ Created on 31/03/2025 at 17:51:31(+01:00).
 """
 
 from .klass import *
+from .mail import *
 from .school import *
 from .teacher import *
 from .user import *
@@ -3,9 +3,12 @@
 Created on 23/10/2025 at 16:38:00(+01:00).
 """
 
-from codeforlife.tasks import DataWarehouseTask
+from datetime import timedelta
+
 from codeforlife.user.models import Class
-from django.db.models import Count, F
+
+from ...data_warehouse.models import HierarchyRollup
+from ...data_warehouse.task import DataWarehouseTask
 
 
 @DataWarehouseTask.shared(
@@ -19,33 +22,25 @@ from django.db.models import Count, F
             "last_login",
             "student_count",
         ],
+        diff=True,
+        full_refresh_interval=timedelta(days=28),
     )
 )
 def students_per_class():
     """
     Collects data about the Class and User tables, and counting how many Student
     rows are related to the Class object. Used to report on metrics like average
-    and max number of students per class.
+    and max number of students per class. Taken from today's hierarchy rollup.
 
     https://console.cloud.google.com/bigquery?tc=europe:6096e7a6-0000-2232-8ae8-f403045cee38&project=decent-digit-629&ws=!1m0
     """
-    return (
-        Class.objects.get_original_queryset()
-        .filter(
-            students__isnull=False,
-            teacher__isnull=False,
-            teacher__new_user__isnull=False,
-        )
-        .values(
-            "id",
-            "name",
-            # TODO: rename column in BQ!!!
-            teacher_is_active=F("teacher__new_user__is_active"),
-            last_login=F("teacher__new_user__last_login"),
-        )
-        .annotate(student_count=Count("students"))
-        .order_by("-student_count")
-    )
+    rollup = HierarchyRollup.objects.get_or_take()
+
+    return rollup.classes.filter(
+        student_count__gt=0,
+        # Only classes whose teacher has a user.
+        teacher_is_active__isnull=False,
+    ).order_by("-student_count")
 
 
 @DataWarehouseTask.shared(
@@ -53,6 +48,8 @@ def students_per_class():
         bq_table_write_mode="overwrite",
         chunk_size=1000,
         fields=["id", "teacher_id", "creation_time", "is_active"],
+        diff=True,
+        full_refresh_interval=timedelta(days=28),
     )
 )
 def common_class():
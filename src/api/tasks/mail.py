@@ -0,0 +1,93 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 16:52:40(+01:00).
+"""
+
+import logging
+from datetime import timedelta
+
+from codeforlife.mail import send_mail
+from codeforlife.tasks import shared_task
+from django.db import transaction
+from django.utils import timezone
+
+from ..mail import Mail, MailDispatcher
+from ..models import OutboxMail
+
+
+@shared_task
+def send_queued_mail(
+    batch_size: int = 100, max_attempts: int = 5, keep_days: int = 30
+):
+    """Send the mail which has been queued in the outbox.
+
+    Each batch is locked while it's being sent so that concurrent runs of this
+    task skip it instead of sending it twice.
+
+    Args:
+        batch_size: How many mails to send per batch.
+        max_attempts: How many runs may attempt to send a mail before it's
+            abandoned.
+        keep_days: How many days sent mail is kept in the outbox for.
+    """
+
+    OutboxMail.objects.filter(
+        sent_at__lt=timezone.now() - timedelta(days=keep_days)
+    ).delete()
+
+    dispatcher = MailDispatcher(send=send_mail)
+    sent_mail_count, failed_mail_count, last_id = 0, 0, 0
+    while True:
+        with transaction.atomic():
+            outbox_mails = {
+                outbox_mail.id: outbox_mail
+                for outbox_mail in OutboxMail.objects.select_for_update(
+                    skip_locked=True
+                )
+                .filter(
+                    id__gt=last_id,
+                    sent_at__isnull=True,
+                    attempts__lt=max_attempts,
+                )
+                .order_by("id")[:batch_size]
+            }
+            if not outbox_mails:
+                break
+
+            for outbox_mail_id, ex in dispatcher.dispatch(
+                (
+                    outbox_mail.id,
+                    Mail(
+                        campaign_id=outbox_mail.campaign_id,
+                        to_addresses=outbox_mail.to_addresses,
+                        personalization_values=(
+                            outbox_mail.personalization_values
+                        ),
+                    ),
+                )
+                for outbox_mail in outbox_mails.values()
+            ):
+                outbox_mail = outbox_mails[outbox_mail_id]
+                outbox_mail.attempts += 1
+                if ex is None:
+                    outbox_mail.sent_at = timezone.now()
+                    sent_mail_count += 1
+                else:
+                    outbox_mail.last_error = str(ex)
+                    failed_mail_count += 1
+                    logging.error(
+                        "Failed to send queued mail with id: %d",
+                        outbox_mail_id,
+                        exc_info=ex,
+                    )
+
+            OutboxMail.objects.bulk_update(
+                outbox_mails.values(),
+                fields=["sent_at", "attempts", "last_error"],
+            )
+
+        last_id = max(outbox_mails)
+
+    logging.info(
+        "Sent %d queued mails. %d failed.", sent_mail_count, failed_mail_count
+    )
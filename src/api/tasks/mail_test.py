@@ -0,0 +1,101 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 17:05:19(+01:00).
+"""
+
+from datetime import timedelta
+from unittest.mock import call, patch
+
+from codeforlife.tests import CeleryTestCase
+from django.db import transaction
+from django.utils import timezone
+
+from ..mail import queue_mail
+from ..models import OutboxMail
+
+# pylint: disable=missing-class-docstring
+
+
+class TestMail(CeleryTestCase):
+    def test_queue_mail__rollback(self):
+        """Mail queued in a transaction which rolls back is never sent."""
+        try:
+            with transaction.atomic():
+                queue_mail(1, to_addresses=["user@codeforlife.com"])
+                raise ValueError()
+        except ValueError:
+            pass
+
+        assert not OutboxMail.objects.exists()
+
+    def test_send_queued_mail(self):
+        """Can send the mail queued in the outbox."""
+        outbox_mails = [
+            queue_mail(
+                1,
+                to_addresses=[f"user{i}@codeforlife.com"],
+                personalization_values={"FIRST_NAME": f"User {i}"},
+            )
+            for i in range(3)
+        ]
+
+        with patch("src.api.tasks.mail.send_mail") as send_mail:
+            self.apply_task(
+                "src.api.tasks.mail.send_queued_mail",
+                kwargs={"batch_size": 2},
+            )
+
+            send_mail.assert_has_calls(
+                [
+                    call(
+                        campaign_id=outbox_mail.campaign_id,
+                        to_addresses=outbox_mail.to_addresses,
+                        personalization_values=(
+                            outbox_mail.personalization_values
+                        ),
+                    )
+                    for outbox_mail in outbox_mails
+                ],
+                any_order=True,
+            )
+
+        assert not OutboxMail.objects.filter(sent_at__isnull=True).exists()
+
+        # Sent mail is not sent again.
+        with patch("src.api.tasks.mail.send_mail") as send_mail:
+            self.apply_task("src.api.tasks.mail.send_queued_mail")
+
+            send_mail.assert_not_called()
+
+    def test_send_queued_mail__failure(self):
+        """Mail which fails to send is retried in later runs until abandoned."""
+        outbox_mail = queue_mail(1, to_addresses=["user@codeforlife.com"])
+
+        def send_queued_mail(mail_sent: bool):
+            with patch(
+                "src.api.tasks.mail.send_mail", side_effect=AssertionError()
+            ) as send_mail, patch("src.api.mail.time.sleep"):
+                self.apply_task(
+                    "src.api.tasks.mail.send_queued_mail",
+                    kwargs={"max_attempts": 2},
+                )
+
+                assert send_mail.called == mail_sent
+
+        send_queued_mail(mail_sent=True)
+        send_queued_mail(mail_sent=True)
+        send_queued_mail(mail_sent=False)
+
+        outbox_mail.refresh_from_db()
+        assert outbox_mail.sent_at is None
+        assert outbox_mail.attempts == 2
+
+    def test_send_queued_mail__cleanup(self):
+        """Old sent mail is deleted from the outbox."""
+        outbox_mail = queue_mail(1, to_addresses=["user@codeforlife.com"])
+        outbox_mail.sent_at = timezone.now() - timedelta(days=31)
+        outbox_mail.save()
+
+        self.apply_task("src.api.tasks.mail.send_queued_mail")
+
+        assert not OutboxMail.objects.filter(id=outbox_mail.id).exists()
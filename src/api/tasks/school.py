@@ -3,9 +3,13 @@
 Created on 23/10/2025 at 17:13:48(+01:00).
 """
 
-from codeforlife.tasks import DataWarehouseTask
+from datetime import timedelta
+
 from codeforlife.user.models import School
-from django.db.models import Count
+from django.db.models import Count, Sum
+
+from ...data_warehouse.models import HierarchyRollup
+from ...data_warehouse.task import DataWarehouseTask
 
 
 @DataWarehouseTask.shared(
@@ -13,6 +17,8 @@ from django.db.models import Count
         bq_table_write_mode="overwrite",
         chunk_size=1000,
         fields=["id", "country", "creation_time", "is_active", "county"],
+        diff=True,
+        full_refresh_interval=timedelta(days=28),
     )
 )
 def common_school():
@@ -30,25 +36,56 @@ def common_school():
         bq_table_write_mode="overwrite",
         chunk_size=1000,
         fields=["id", "name", "country", "teacher_count"],
+        diff=True,
+        full_refresh_interval=timedelta(days=28),
     )
 )
 def teachers_per_school():
     """
     Collects data about the School table, and counting how many Teacher rows are
     related to the School object. Used to report on metrics like average and max
-    number of teachers per school.
+    number of teachers per school. Taken from today's hierarchy rollup.
 
     https://console.cloud.google.com/bigquery?tc=europe:608bfedc-0000-2064-9e7f-94eb2c139c38&project=decent-digit-629&ws=!1m0
     """
+    rollup = HierarchyRollup.objects.get_or_take()
+
     return (
         School.objects.get_original_queryset()
-        .filter(teacher_school__isnull=False)
+        .filter(teacher_rollups__rollup=rollup)
         .values("id", "name", "country")
-        .annotate(teacher_count=Count("teacher_school"))
+        .annotate(teacher_count=Count("teacher_rollups"))
         .order_by("-teacher_count")
     )
 
 
+@DataWarehouseTask.shared(
+    DataWarehouseTask.Settings(
+        bq_table_write_mode="overwrite",
+        chunk_size=1000,
+        fields=["id", "name", "country", "student_count"],
+        diff=True,
+        full_refresh_interval=timedelta(days=28),
+    )
+)
+def students_per_school():
+    """
+    Collects data about the School table, and counting how many Student rows are
+    related to the School object through its teachers' classes. Used to report
+    on metrics like average and max number of students per school. Taken from
+    today's hierarchy rollup.
+    """
+    rollup = HierarchyRollup.objects.get_or_take()
+
+    return (
+        School.objects.get_original_queryset()
+        .filter(teacher_rollups__rollup=rollup)
+        .values("id", "name", "country")
+        .annotate(student_count=Sum("teacher_rollups__student_count"))
+        .order_by("-student_count")
+    )
+
+
 @DataWarehouseTask.shared(
     DataWarehouseTask.Settings(
         bq_table_write_mode="overwrite",
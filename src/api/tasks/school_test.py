@@ -5,7 +5,12 @@ Created on 23/10/2025 at 17:13:51(+01:00).
 
 from codeforlife.tests import CeleryTestCase
 
-from .school import active_gb_schools, common_school, teachers_per_school
+from .school import (
+    active_gb_schools,
+    common_school,
+    students_per_school,
+    teachers_per_school,
+)
 
 # pylint: disable=missing-class-docstring
 
@@ -21,6 +26,10 @@ class TestSchool(CeleryTestCase):
         """Assert the queryset returns the expected fields."""
         self.assert_data_warehouse_task(task=teachers_per_school)
 
+    def test_students_per_school(self):
+        """Assert the queryset returns the expected fields."""
+        self.assert_data_warehouse_task(task=students_per_school)
+
     def test_active_gb_schools(self):
         """Assert the queryset returns the expected fields."""
         self.assert_data_warehouse_task(task=active_gb_schools)
@@ -3,9 +3,80 @@
 Created on 31/03/2025 at 18:06:49(+01:00).
 """
 
-from codeforlife.tasks import DataWarehouseTask
-from codeforlife.user.models import Teacher
-from django.db.models import Count, F
+from codeforlife.tasks import shared_task
+from codeforlife.user.models import StudentUser, TeacherUser
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ...data_warehouse.models import HierarchyRollup
+from ...data_warehouse.task import DataWarehouseTask
+from ..anonymization import anonymize_class
+from ..models import TeacherDeletionJob
+
+
+@shared_task
+def delete_teacher(job_id: str):
+    """Delete a teacher's account in the background by anonymizing their
+    classes, the classes' students and then the teacher.
+
+    Each class is anonymized in its own transaction, along with the job's
+    progress. If the job fails, a rerun continues with the classes which have
+    not been anonymized yet.
+
+    Args:
+        job_id: The ID of the teacher-deletion job.
+    """
+    job = TeacherDeletionJob.objects.select_related("teacher").get(id=job_id)
+    if job.status == TeacherDeletionJob.Status.SUCCEEDED:
+        return
+
+    teacher = job.teacher
+    classes = list(teacher.class_teacher.all())
+
+    job.status = TeacherDeletionJob.Status.RUNNING
+    job.class_count = job.classes_processed + len(classes)
+    job.student_count = (
+        job.students_processed
+        + StudentUser.objects.filter(
+            new_student__class_field__in=classes
+        ).count()
+    )
+    job.error = ""
+    job.save(
+        update_fields=[
+            "status",
+            "class_count",
+            "student_count",
+            "error",
+            "updated_at",
+        ]
+    )
+
+    try:
+        for klass in classes:
+            with transaction.atomic():
+                job.students_processed += anonymize_class(klass)
+                job.classes_processed += 1
+                job.save(
+                    update_fields=[
+                        "classes_processed",
+                        "students_processed",
+                        "updated_at",
+                    ]
+                )
+
+        TeacherUser.objects.get(id=teacher.new_user_id).anonymize()
+    except Exception as ex:
+        job.status = TeacherDeletionJob.Status.FAILED
+        job.error = repr(ex)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        raise
+
+    job.status = TeacherDeletionJob.Status.SUCCEEDED
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "updated_at"])
 
 
 @DataWarehouseTask.shared(
@@ -20,18 +91,19 @@ def classes_per_teacher():
     """
     Collects data about the Teacher and User tables, and counting how many Class
     rows are related to the Teacher object. Used to report on metrics like
-    average and max number of classes per teacher.
+    average and max number of classes per teacher. Taken from today's hierarchy
+    rollup.
 
     https://console.cloud.google.com/bigquery?tc=europe:608c84a6-0000-2064-9e7f-94eb2c139c38&project=decent-digit-629&ws=!1m5!1m4!1m3!1sdecent-digit-629!2sbquxjob_58c2d693_19a112df8a4!3sEU
     """
+    rollup = HierarchyRollup.objects.get_or_take()
+
     return (
-        Teacher.objects.get_original_queryset()
-        .filter(class_teacher__isnull=False, new_user__isnull=False)
-        .values(
-            teacher_id=F("id"),
-            is_active=F("new_user__is_active"),
-            last_login=F("new_user__last_login"),
+        rollup.teachers.filter(
+            class_count__gt=0,
+            # Only teachers with a user.
+            is_active__isnull=False,
         )
-        .annotate(class_count=Count("class_teacher"))
+        .values("is_active", "last_login", "class_count", teacher_id=F("id"))
         .order_by("-class_count")
     )
@@ -3,8 +3,12 @@
 Created on 23/10/2025 at 14:29:26(+01:00).
 """
 
+from unittest.mock import patch
+
 from codeforlife.tests import CeleryTestCase
+from codeforlife.user.models import Class, StudentUser, Teacher, TeacherUser
 
+from ..models import TeacherDeletionJob
 from .teacher import classes_per_teacher
 
 # pylint: disable=missing-class-docstring
@@ -16,3 +20,62 @@ class TestTeacher(CeleryTestCase):
     def test_classes_per_teacher(self):
         """Assert the queryset returns the expected fields."""
         self.assert_data_warehouse_task(task=classes_per_teacher)
+
+    def test_delete_teacher(self):
+        """The teacher, their classes and their students are anonymized and
+        the job's progress is recorded."""
+        teacher = Teacher.objects.filter(class_teacher__isnull=False).first()
+        assert teacher
+        class_count = Class.objects.filter(teacher=teacher).count()
+        student_count = StudentUser.objects.filter(
+            new_student__class_field__teacher=teacher
+        ).count()
+        job = TeacherDeletionJob.objects.create(teacher=teacher)
+
+        self.apply_task(
+            "src.api.tasks.teacher.delete_teacher",
+            kwargs={"job_id": str(job.id)},
+            throw=True,
+        )
+
+        job.refresh_from_db()
+        assert job.status == TeacherDeletionJob.Status.SUCCEEDED
+        assert job.finished_at is not None
+        assert job.class_count == job.classes_processed == class_count
+        assert job.student_count == job.students_processed == student_count
+        assert not Class.objects.filter(teacher=teacher).exists()
+        assert not TeacherUser.objects.filter(id=teacher.new_user_id).exists()
+
+    def test_delete_teacher__rerun(self):
+        """A failed job continues with the classes which weren't anonymized."""
+        teacher = Teacher.objects.filter(class_teacher__isnull=False).first()
+        assert teacher
+        class_count = Class.objects.filter(teacher=teacher).count()
+        job = TeacherDeletionJob.objects.create(teacher=teacher)
+
+        with patch.object(
+            TeacherUser, "anonymize", side_effect=ValueError("Failed.")
+        ):
+            with self.assertRaises(ValueError):
+                self.apply_task(
+                    "src.api.tasks.teacher.delete_teacher",
+                    kwargs={"job_id": str(job.id)},
+                    throw=True,
+                )
+
+        job.refresh_from_db()
+        assert job.status == TeacherDeletionJob.Status.FAILED
+        assert "Failed." in job.error
+        assert job.classes_processed == class_count
+
+        self.apply_task(
+            "src.api.tasks.teacher.delete_teacher",
+            kwargs={"job_id": str(job.id)},
+            throw=True,
+        )
+
+        job.refresh_from_db()
+        assert job.status == TeacherDeletionJob.Status.SUCCEEDED
+        assert job.error == ""
+        assert job.class_count == job.classes_processed == class_count
+        assert not TeacherUser.objects.filter(id=teacher.new_user_id).exists()
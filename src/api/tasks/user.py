@@ -4,27 +4,41 @@ Created on 31/03/2025 at 18:06:49(+01:00).
 """
 
 import logging
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
+from itertools import batched
 
 from codeforlife.mail import send_mail
-from codeforlife.tasks import DataWarehouseTask, shared_task
+from codeforlife.tasks import shared_task
 from codeforlife.user.models import GoogleUser, User
 from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.base.base import BaseDatabaseWrapper
 from django.db.models import Case, CharField, F, Q, Value, When
+from django.db.models.query import QuerySet
 from django.urls import reverse
 from django.utils import timezone
 
+from ...data_warehouse.models import Change
+from ...data_warehouse.task import DataWarehouseTask
+from ..anonymization import anonymize_users
 from ..auth import email_verification_token_generator
+from ..mail import Mail, MailDispatcher, send_batched_mail
+from ..models import GoogleUserSync, TaskCheckpoint
 
 
 @shared_task
-def send_inactivity_email_reminder(days: int, campaign_name: str):
+def send_inactivity_email_reminder(
+    days: int, campaign_name: str, batch_size: int = 500
+):
     """Send email reminders to teacher- and independent-users who haven't been
     active in a while.
 
     Args:
         days: How many days the user has been inactive for.
         campaign_name: The name of the email campaign to send them.
+        batch_size: How many users to remind in a single campaign call.
     """
 
     now = timezone.now()
@@ -54,18 +68,27 @@ def send_inactivity_email_reminder(days: int, campaign_name: str):
 
     if user_count > 0:
         sent_email_count = 0
-        for email in user_queryset.values_list("email", flat=True).iterator(
-            chunk_size=500
+        for batch in TaskCheckpoint.objects.iter_chunks(
+            task_name=f"send_inactivity_email_reminder:{days}",
+            get_queryset=lambda last_id: user_queryset.filter(
+                id__gt=last_id
+            ).values("id", "email"),
+            chunk_size=batch_size,
         ):
-            try:
-                send_mail(
-                    campaign_id=settings.DOTDIGITAL_CAMPAIGN_IDS[campaign_name],
-                    to_addresses=[email],
+            user_ids = {fields["email"]: fields["id"] for fields in batch}
+
+            failed_emails = send_batched_mail(
+                campaign_id=settings.DOTDIGITAL_CAMPAIGN_IDS[campaign_name],
+                to_addresses=list(user_ids),
+                send=send_mail,
+            )
+            for email in failed_emails:
+                logging.error(
+                    "Failed to remind inactive user with id: %d",
+                    user_ids[email],
                 )
 
-                sent_email_count += 1
-            except Exception as ex:  # pylint: disable=broad-exception-caught
-                logging.exception(ex)
+            sent_email_count += len(user_ids) - len(failed_emails)
 
         logging.info(
             "Reminded %d/%d inactive users.", sent_email_count, user_count
@@ -109,37 +132,53 @@ def send_verify_email_reminder(days: int, campaign_name: str):
 
     teacher_queryset, indy_queryset = _get_unverified_users(days, same_day=True)
 
-    user_queryset = teacher_queryset.union(indy_queryset)
-    user_count = user_queryset.count()
+    user_count = teacher_queryset.union(indy_queryset).count()
 
     logging.info("%d emails unverified.", user_count)
 
     if user_count > 0:
-        sent_email_count = 0
-        for user_fields in user_queryset.values("id", "email").iterator(
-            chunk_size=500
-        ):
-            url = settings.SERVICE_BASE_URL + reverse(
-                "user-verify-email-address",
-                kwargs={
-                    "pk": user_fields["id"],
-                    "token": email_verification_token_generator.make_token(
-                        user_fields["id"], user_fields["email"]
-                    ),
-                },
-            )
 
-            try:
-                send_mail(
+        def get_mails(chunk: t.List[t.Dict[str, t.Any]]):
+            for user_fields in chunk:
+                url = settings.SERVICE_BASE_URL + reverse(
+                    "user-verify-email-address",
+                    kwargs={
+                        "pk": user_fields["id"],
+                        "token": email_verification_token_generator.make_token(
+                            user_fields["id"], user_fields["email"]
+                        ),
+                    },
+                )
+
+                yield user_fields["id"], Mail(
                     campaign_id=settings.DOTDIGITAL_CAMPAIGN_IDS[campaign_name],
                     to_addresses=[user_fields["email"]],
                     personalization_values={"VERIFICATION_LINK": url},
                 )
 
-                sent_email_count += 1
-            # pylint: disable-next=broad-exception-caught
-            except Exception as ex:
-                logging.exception(ex)
+        def get_user_queryset(last_id: int):
+            return (
+                teacher_queryset.filter(id__gt=last_id)
+                .union(indy_queryset.filter(id__gt=last_id))
+                .values("id", "email")
+            )
+
+        dispatcher = MailDispatcher(send=send_mail)
+        sent_email_count = 0
+        for chunk in TaskCheckpoint.objects.iter_chunks(
+            task_name=f"send_verify_email_reminder:{days}",
+            get_queryset=get_user_queryset,
+            chunk_size=500,
+        ):
+            for user_id, ex in dispatcher.dispatch(get_mails(chunk)):
+                if ex is None:
+                    sent_email_count += 1
+                else:
+                    logging.error(
+                        "Failed to remind user with id: %d",
+                        user_id,
+                        exc_info=ex,
+                    )
 
         logging.info("Sent %d/%d emails.", sent_email_count, user_count)
 
@@ -148,28 +187,42 @@ def send_verify_email_reminder(days: int, campaign_name: str):
 def anonymize_unverified_emails():
     """Anonymize all users who have not verified their email address."""
 
-    user_queryset = User.objects.filter(is_active=True)
-    user_count = user_queryset.count()
-
     teacher_queryset, indy_queryset = _get_unverified_users(
         days=19, same_day=False
     )
-    teacher_count = teacher_queryset.count()
-    indy_count = indy_queryset.count()
 
-    for user in teacher_queryset.union(indy_queryset).iterator(chunk_size=100):
-        try:
-            user.anonymize()
-        # pylint: disable-next=broad-exception-caught
-        except Exception as ex:
-            logging.error("Failed to anonymise user with id: %d", user.id)
-            logging.exception(ex)
+    def anonymize(task_name: str, user_queryset: QuerySet[User]):
+        count = 0
+        for chunk in TaskCheckpoint.objects.iter_chunks(
+            task_name=task_name,
+            get_queryset=lambda last_id: user_queryset.filter(
+                id__gt=last_id
+            ).values("id"),
+            chunk_size=1000,
+        ):
+            user_ids = [user_fields["id"] for user_fields in chunk]
+            try:
+                count += anonymize_users(user_ids)
+            # pylint: disable-next=broad-exception-caught
+            except Exception as ex:
+                logging.error(
+                    "Failed to anonymise users with ids: %d-%d",
+                    user_ids[0],
+                    user_ids[-1],
+                )
+                logging.exception(ex)
 
-    logging.info(
-        "%d unverified users anonymised.",
-        user_count - user_queryset.count(),
+        return count
+
+    teacher_count = anonymize(
+        "anonymize_unverified_emails:teachers", teacher_queryset
+    )
+    indy_count = anonymize(
+        "anonymize_unverified_emails:independents", indy_queryset
     )
 
+    logging.info("%d unverified users anonymised.", teacher_count + indy_count)
+
     # Use data warehouse in new system.
     # pylint: disable-next=import-outside-toplevel
     from common.models import (  # type: ignore[import-untyped]
@@ -177,12 +230,18 @@ def anonymize_unverified_emails():
         TotalActivity,
     )
 
-    activity_today = DailyActivity.objects.get_or_create(
-        date=timezone.now().date()
-    )[0]
-    activity_today.anonymised_unverified_teachers = teacher_count
-    activity_today.anonymised_unverified_independents = indy_count
-    activity_today.save()
+    # Increment today's counts as a resumed run only counts the users it
+    # anonymised itself.
+    today = timezone.now().date()
+    DailyActivity.objects.get_or_create(date=today)
+    DailyActivity.objects.filter(date=today).update(
+        anonymised_unverified_teachers=F("anonymised_unverified_teachers")
+        + teacher_count,
+        anonymised_unverified_independents=F(
+            "anonymised_unverified_independents"
+        )
+        + indy_count,
+    )
     TotalActivity.objects.update(
         anonymised_unverified_teachers=F("anonymised_unverified_teachers")
         + teacher_count,
@@ -194,23 +253,73 @@ def anonymize_unverified_emails():
 
 
 @shared_task
-def sync_google_users():
-    """Sync all users have linked their account with Google."""
-    for user_id in GoogleUser.objects.values_list("id", flat=True).iterator(
-        chunk_size=2000
-    ):
+def sync_google_users(stale_after_days: int = 7, max_workers: int = 10):
+    """Sync the users who have linked their account with Google and haven't
+    been synced recently.
+
+    Args:
+        stale_after_days: How many days a user's last sync remains fresh for.
+        max_workers: The max number of users to sync concurrently.
+    """
+
+    # Each thread has its own database connection, which is reused for every
+    # user it syncs and closed once every user is synced.
+    thread_connections: t.List[BaseDatabaseWrapper] = []
+
+    def init_thread():
+        thread_connection = connections[DEFAULT_DB_ALIAS]
+        thread_connection.inc_thread_sharing()  # Allow closing it later.
+        thread_connections.append(thread_connection)
+
+    def sync(user_id: int):
         try:
             GoogleUser.objects.sync(id=user_id)
+            return None
         # pylint: disable-next=broad-exception-caught
         except Exception as ex:
             logging.error("Failed to sync Google-user with id: %d", user_id)
             logging.exception(ex)
+            return ex
+
+    user_ids = GoogleUserSync.objects.get_stale_user_ids(
+        stale_after=timedelta(days=stale_after_days)
+    )
+
+    synced_user_count, failed_user_count = 0, 0
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max_workers, initializer=init_thread
+        ) as executor:
+            for chunk in batched(user_ids.iterator(chunk_size=2000), 2000):
+                synced_user_ids: t.List[int] = []
+                failed_user_ids: t.List[int] = []
+                for user_id, ex in zip(chunk, executor.map(sync, chunk)):
+                    (synced_user_ids if ex is None else failed_user_ids).append(
+                        user_id
+                    )
+
+                GoogleUserSync.objects.record(synced_user_ids, failed_user_ids)
+                synced_user_count += len(synced_user_ids)
+                failed_user_count += len(failed_user_ids)
+    finally:
+        for thread_connection in thread_connections:
+            thread_connection.close()
+            thread_connection.dec_thread_sharing()
+
+    logging.info(
+        "Synced %d Google-users. %d failed.",
+        synced_user_count,
+        failed_user_count,
+    )
 
 
 @DataWarehouseTask.shared(
     DataWarehouseTask.Settings(
-        bq_table_write_mode="overwrite",
+        bq_table_write_mode="append",
         chunk_size=1000,
+        incremental=True,
+        full_refresh_interval=timedelta(days=28),
+        heavy=True,
         fields=[
             "id",  # Adding ID. TODO: use server-side tagging for user logins.
             "user_id",
@@ -237,8 +346,11 @@ def teacher_logins():
 
 @DataWarehouseTask.shared(
     DataWarehouseTask.Settings(
-        bq_table_write_mode="overwrite",
+        bq_table_write_mode="append",
         chunk_size=1000,
+        incremental=True,
+        full_refresh_interval=timedelta(days=28),
+        heavy=True,
         fields=[
             "id",  # Adding ID. TODO: use server-side tagging for user logins.
             "user_id",
@@ -264,8 +376,11 @@ def independents_login():
 
 @DataWarehouseTask.shared(
     DataWarehouseTask.Settings(
-        bq_table_write_mode="overwrite",
+        bq_table_write_mode="append",
         chunk_size=1000,
+        incremental=True,
+        full_refresh_interval=timedelta(days=28),
+        heavy=True,
         fields=[
             "id",  # Adding ID. TODO: use server-side tagging for user logins.
             "user_id",
@@ -326,6 +441,14 @@ def total_registrations():
         chunk_size=1000,
         fields=["date", "login_share_type", "login_shares"],
         id_field="date",  # uniquely identifies each row
+        unpivot=DataWarehouseTask.Unpivot(
+            name_field="login_share_type",
+            value_field="login_shares",
+            columns={
+                "csv": "csv_click_count",
+                "login_cards": "login_cards_click_count",
+            },
+        ),
     )
 )
 def login_shares():
@@ -339,19 +462,7 @@ def login_shares():
     # pylint: disable-next=import-outside-toplevel
     from common.models import DailyActivity  # type: ignore[import-untyped]
 
-    qs_csv = DailyActivity.objects.values(
-        "date",
-        login_share_type=Value("csv", output_field=CharField()),
-        login_shares=F("csv_click_count"),
-    )
-
-    qs_login_cards = DailyActivity.objects.values(
-        "date",
-        login_share_type=Value("login_cards", output_field=CharField()),
-        login_shares=F("login_cards_click_count"),
-    )
-
-    return qs_csv.union(qs_login_cards, all=True)
+    return DailyActivity.objects.all()
 
 
 @DataWarehouseTask.shared(
@@ -386,6 +497,14 @@ def total_unverified_anonymisations():
         chunk_size=1000,
         fields=["date", "user_type", "anonymisations"],
         id_field="date",
+        unpivot=DataWarehouseTask.Unpivot(
+            name_field="user_type",
+            value_field="anonymisations",
+            columns={
+                "teacher": "anonymised_unverified_teachers",
+                "independent": "anonymised_unverified_independents",
+            },
+        ),
     )
 )
 def daily_unverified_anonymisations():
@@ -400,19 +519,7 @@ def daily_unverified_anonymisations():
 
     min_date = date(year=2023, month=9, day=19)
 
-    qs_teachers = DailyActivity.objects.filter(date__gt=min_date).values(
-        "date",
-        user_type=Value("teacher", output_field=CharField()),
-        anonymisations=F("anonymised_unverified_teachers"),
-    )
-
-    qs_independents = DailyActivity.objects.filter(date__gt=min_date).values(
-        "date",
-        user_type=Value("independent", output_field=CharField()),
-        anonymisations=F("anonymised_unverified_independents"),
-    )
-
-    return qs_teachers.union(qs_independents, all=True)
+    return DailyActivity.objects.filter(date__gt=min_date)
 
 
 @DataWarehouseTask.shared(
@@ -421,6 +528,17 @@ def daily_unverified_anonymisations():
         chunk_size=1000,
         fields=["date", "reset_type", "resets"],
         id_field="date",
+        unpivot=DataWarehouseTask.Unpivot(
+            name_field="reset_type",
+            value_field="resets",
+            columns={
+                "teacher_lockout_resets": "teacher_lockout_resets",
+                "indy_lockout_reset": "indy_lockout_resets",
+                "school_student_lockout_resets": (
+                    "school_student_lockout_resets"
+                ),
+            },
+        ),
     )
 )
 def user_lockout_resets():
@@ -436,35 +554,7 @@ def user_lockout_resets():
 
     min_date = date(year=2023, month=1, day=19)
 
-    qs_teacher_lockout_resets = DailyActivity.objects.filter(
-        date__gt=min_date
-    ).values(
-        "date",
-        reset_type=Value("teacher_lockout_resets", output_field=CharField()),
-        resets=F("teacher_lockout_resets"),
-    )
-
-    qs_indy_lockout_reset = DailyActivity.objects.filter(
-        date__gt=min_date
-    ).values(
-        "date",
-        reset_type=Value("indy_lockout_reset", output_field=CharField()),
-        resets=F("indy_lockout_resets"),
-    )
-
-    qs_school_student_lockout_resets = DailyActivity.objects.filter(
-        date__gt=min_date
-    ).values(
-        "date",
-        reset_type=Value(
-            "school_student_lockout_resets", output_field=CharField()
-        ),
-        resets=F("school_student_lockout_resets"),
-    )
-
-    return qs_teacher_lockout_resets.union(
-        qs_indy_lockout_reset, qs_school_student_lockout_resets, all=True
-    )
+    return DailyActivity.objects.filter(date__gt=min_date)
 
 
 @DataWarehouseTask.shared(
@@ -483,6 +573,14 @@ def user_lockout_resets():
             "last_login",
             "date_joined",
         ],
+        partitions=4,
+        upsert={
+            Change.Entity.USER: "id",
+            Change.Entity.TEACHER: "new_teacher__id",
+            Change.Entity.STUDENT: "new_student__id",
+        },
+        full_refresh_interval=timedelta(days=28),
+        staging=DataWarehouseTask.Staging(),
     )
 )
 def user_teacher_student_1():
@@ -3,6 +3,7 @@
 Created on 31/03/2025 at 18:31:33(+01:00).
 """
 
+import typing as t
 from datetime import timedelta
 from unittest.mock import call, patch
 
@@ -18,10 +19,14 @@ from codeforlife.user.models import (
     User,
     UserProfile,
 )
+from common.models import DailyActivity  # type: ignore[import-untyped]
 from django.conf import settings
+from django.db.models.query import QuerySet
 from django.urls import reverse
 from django.utils import timezone
 
+from ...data_warehouse.task import DataWarehouseTask
+from ..models import GoogleUserSync, TaskCheckpoint
 from .user import (
     daily_unverified_anonymisations,
     independents_login,
@@ -35,6 +40,7 @@ from .user import (
 )
 
 # pylint: disable=missing-class-docstring
+# pylint: disable=too-many-public-methods
 
 
 class TestUser(CeleryTestCase):
@@ -64,19 +70,14 @@ class TestUser(CeleryTestCase):
                 )
 
                 if mail_sent:
-                    send_mail_mock.assert_has_calls(
-                        [
-                            call(
-                                campaign_id=(
-                                    settings.DOTDIGITAL_CAMPAIGN_IDS[
-                                        campaign_name
-                                    ]
-                                ),
-                                to_addresses=[user.email],
-                            )
-                            for user in teacher_users + indy_users
-                        ],
-                        any_order=True,
+                    # All users are reminded in a single batch.
+                    send_mail_mock.assert_called_once()
+                    _, kwargs = send_mail_mock.call_args
+                    assert kwargs["campaign_id"] == (
+                        settings.DOTDIGITAL_CAMPAIGN_IDS[campaign_name]
+                    )
+                    assert sorted(kwargs["to_addresses"]) == sorted(
+                        user.email for user in teacher_users + indy_users
                     )
                 else:
                     send_mail_mock.assert_not_called()
@@ -105,6 +106,42 @@ class TestUser(CeleryTestCase):
             campaign_name="Inactive users on website - final reminder",
         )
 
+    def test_send_inactivity_email_reminder__resume(self):
+        """Resuming an interrupted run skips the users already reminded."""
+        days = 730
+        date_joined = timezone.now() - timedelta(days, hours=12)
+
+        TeacherUser.objects.update(date_joined=date_joined, last_login=None)
+        IndependentUser.objects.update(date_joined=date_joined, last_login=None)
+
+        users = [*TeacherUser.objects.all(), *IndependentUser.objects.all()]
+        users.sort(key=lambda user: user.id)
+        assert len(users) > 1
+        reminded_users, remaining_users = users[:1], users[1:]
+
+        TaskCheckpoint.objects.create(
+            task_name=f"send_inactivity_email_reminder:{days}",
+            run_date=timezone.now().date(),
+            last_id=reminded_users[-1].id,
+        )
+
+        with patch("src.api.tasks.user.send_mail") as send_mail_mock:
+            self.apply_task(
+                "src.api.tasks.user.send_inactivity_email_reminder",
+                kwargs={
+                    "days": days,
+                    "campaign_name": (
+                        "Inactive users on website - first reminder"
+                    ),
+                },
+            )
+
+            assert sorted(
+                email
+                for _, kwargs in send_mail_mock.call_args_list
+                for email in kwargs["to_addresses"]
+            ) == sorted(user.email for user in remaining_users)
+
     def send_verify_email_reminder(self, days: int, campaign_name: str):
         """Test a verify email reminder is sent under conditions."""
 
@@ -263,6 +300,34 @@ class TestUser(CeleryTestCase):
         test(days=19, is_verified=True, is_anonymized=False)
         test(days=20, is_verified=False, is_anonymized=True)
 
+    def test_anonymize_users_with_unverified_emails__daily_activity(self):
+        """Each run adds its anonymisations to today's activity."""
+        # Simulate an earlier run today, which was interrupted and resumed.
+        daily_activity = DailyActivity.objects.create(
+            date=timezone.now().date(),
+            anonymised_unverified_teachers=2,
+            anonymised_unverified_independents=3,
+        )
+
+        user = User.objects.create(
+            first_name="Unverified",
+            last_name="Teacher",
+            username="unverified.teacher@codeforlife.com",
+            email="unverified.teacher@codeforlife.com",
+            date_joined=timezone.now() - timedelta(days=19, hours=12),
+        )
+        Teacher.objects.create(
+            user=UserProfile.objects.create(user=user, is_verified=False),
+            new_user=user,
+            school=School.objects.get(name="School 1"),
+        )
+
+        self.apply_task("src.api.tasks.user.anonymize_unverified_emails")
+
+        daily_activity.refresh_from_db()
+        assert daily_activity.anonymised_unverified_teachers == 3
+        assert daily_activity.anonymised_unverified_independents == 3
+
     def test_sync_google_users(self):
         """Can sync all Google-users."""
         with patch.object(GoogleUser.objects, "sync") as sync:
@@ -274,9 +339,99 @@ class TestUser(CeleryTestCase):
                     for user_id in GoogleUser.objects.values_list(
                         "id", flat=True
                     )
-                ]
+                ],
+                any_order=True,
+            )
+
+    def test_sync_google_users__connections(self):
+        """Each thread's database connection is closed once, after every user
+        is synced."""
+        with patch.object(GoogleUser.objects, "sync"), patch(
+            "src.api.tasks.user.connections"
+        ) as connections:
+            self.apply_task(
+                "src.api.tasks.user.sync_google_users",
+                kwargs={"max_workers": 2},
             )
 
+        thread_count = connections.__getitem__.call_count
+        assert 1 <= thread_count <= 2
+        thread_connection = connections.__getitem__.return_value
+        assert thread_connection.close.call_count == thread_count
+        assert thread_connection.dec_thread_sharing.call_count == thread_count
+
+    def test_sync_google_users__stale(self):
+        """Only Google-users which haven't been synced recently are synced."""
+        for i in range(2):
+            user = User.objects.create(
+                username=f"google.user{i}@codeforlife.com",
+                email=f"google.user{i}@codeforlife.com",
+            )
+            UserProfile.objects.create(
+                user=user,
+                google_refresh_token="example",
+                google_sub=str(user.id),
+            )
+
+        user_ids = list(GoogleUser.objects.values_list("id", flat=True))
+        assert len(user_ids) > 1
+        stale_user_id, fresh_user_ids = user_ids[0], user_ids[1:]
+
+        now = timezone.now()
+        GoogleUserSync.objects.create(
+            user_id=stale_user_id, last_synced_at=now - timedelta(days=8)
+        )
+        GoogleUserSync.objects.bulk_create(
+            [
+                GoogleUserSync(user_id=user_id, last_synced_at=now)
+                for user_id in fresh_user_ids
+            ]
+        )
+
+        with patch.object(GoogleUser.objects, "sync") as sync:
+            self.apply_task(
+                "src.api.tasks.user.sync_google_users",
+                kwargs={"stale_after_days": 7},
+            )
+
+            sync.assert_called_once_with(id=stale_user_id)
+
+        google_sync = GoogleUserSync.objects.get(user_id=stale_user_id)
+        assert google_sync.last_synced_at is not None
+        assert google_sync.last_synced_at > now
+
+    def test_sync_google_users__backoff(self):
+        """Google-users which failed to sync are retried after a backoff."""
+        user_ids = list(GoogleUser.objects.values_list("id", flat=True))
+
+        def sync_google_users(synced_user_ids: t.List[int]):
+            with patch.object(
+                GoogleUser.objects, "sync", side_effect=ValueError()
+            ) as sync:
+                self.apply_task("src.api.tasks.user.sync_google_users")
+
+                assert sorted(
+                    kwargs["id"] for _, kwargs in sync.call_args_list
+                ) == sorted(synced_user_ids)
+
+        sync_google_users(synced_user_ids=user_ids)
+
+        for google_sync in GoogleUserSync.objects.filter(user_id__in=user_ids):
+            assert google_sync.last_synced_at is None
+            assert google_sync.failure_count == 1
+            assert google_sync.last_failed_at is not None
+            assert google_sync.retry_at == (
+                google_sync.last_failed_at + GoogleUserSync.backoff
+            )
+
+        # Users are not retried during their backoff.
+        sync_google_users(synced_user_ids=[])
+
+        # Users are retried after their backoff.
+        GoogleUserSync.objects.update(retry_at=timezone.now())
+        sync_google_users(synced_user_ids=user_ids)
+        assert not GoogleUserSync.objects.exclude(failure_count=2).exists()
+
     # data warehouse tasks
 
     def test_teacher_logins(self):
@@ -295,21 +450,72 @@ class TestUser(CeleryTestCase):
         """Assert the queryset returns the expected fields."""
         self.assert_data_warehouse_task(task=total_registrations)
 
+    def _test_unpivot(
+        self,
+        task: DataWarehouseTask,
+        rows: t.Dict[str, t.Tuple[str, int]],
+    ):
+        """Assert each daily activity is unpivoted into one row per column.
+
+        Args:
+            task: The task which unpivots the daily activities.
+            rows: The expected rows' names, each paired with the column the
+                row's value is from.
+        """
+        self.assertIsInstance(task.get_queryset(), QuerySet)
+
+        daily_activity_date = timezone.now().date() + timedelta(days=1)
+        daily_activity = DailyActivity.objects.create(
+            date=daily_activity_date,
+            **dict(rows.values()),
+        )
+
+        assert [
+            row
+            for row in task.iter_rows(task.get_queryset())
+            if row[0] == daily_activity_date
+        ] == [
+            (daily_activity.date, name, value)
+            for name, (_, value) in rows.items()
+        ]
+
     def test_login_shares(self):
-        """Assert the queryset returns the expected fields."""
-        self.assert_data_warehouse_task(task=login_shares)
+        """Each daily activity is unpivoted into one row per share type."""
+        self._test_unpivot(
+            task=login_shares,
+            rows={
+                "csv": ("csv_click_count", 1),
+                "login_cards": ("login_cards_click_count", 2),
+            },
+        )
 
     def test_total_unverified_anonymisations(self):
         """Assert the queryset returns the expected fields."""
         self.assert_data_warehouse_task(task=total_unverified_anonymisations)
 
     def test_daily_unverified_anonymisations(self):
-        """Assert the queryset returns the expected fields."""
-        self.assert_data_warehouse_task(task=daily_unverified_anonymisations)
+        """Each daily activity is unpivoted into one row per user type."""
+        self._test_unpivot(
+            task=daily_unverified_anonymisations,
+            rows={
+                "teacher": ("anonymised_unverified_teachers", 1),
+                "independent": ("anonymised_unverified_independents", 2),
+            },
+        )
 
     def test_user_lockout_resets(self):
-        """Assert the queryset returns the expected fields."""
-        self.assert_data_warehouse_task(task=user_lockout_resets)
+        """Each daily activity is unpivoted into one row per reset type."""
+        self._test_unpivot(
+            task=user_lockout_resets,
+            rows={
+                "teacher_lockout_resets": ("teacher_lockout_resets", 1),
+                "indy_lockout_reset": ("indy_lockout_resets", 2),
+                "school_student_lockout_resets": (
+                    "school_student_lockout_resets",
+                    3,
+                ),
+            },
+        )
 
     def test_user_teacher_student_1(self):
         """Assert the queryset returns the expected fields."""
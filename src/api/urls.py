@@ -12,6 +12,7 @@ from .views import (
     SchoolTeacherInvitationViewSet,
     SchoolViewSet,
     StudentViewSet,
+    TeacherDeletionJobViewSet,
     TeacherViewSet,
     UserViewSet,
 )
@@ -47,6 +48,11 @@ router.register(
     StudentViewSet,
     basename="student",
 )
+router.register(
+    "users/teachers/deletion-jobs",
+    TeacherDeletionJobViewSet,
+    basename="teacher-deletion-job",
+)
 router.register(
     "users/teachers",
     TeacherViewSet,
@@ -10,4 +10,5 @@ from .school import SchoolViewSet
 from .school_teacher_invitation import SchoolTeacherInvitationViewSet
 from .student import StudentViewSet
 from .teacher import TeacherViewSet
+from .teacher_deletion_job import TeacherDeletionJobViewSet
 from .user import UserViewSet
@@ -3,13 +3,15 @@
 Created on 23/01/2024 at 17:53:50(+00:00).
 """
 
+import logging
+
 from codeforlife.permissions import AllowNone
 from codeforlife.response import Response
-from codeforlife.user.models import Class, StudentUser, Teacher
 from codeforlife.user.permissions import IsTeacher
 from codeforlife.user.views import SchoolViewSet as _SchoolViewSet
 from rest_framework import status
 
+from ..anonymization import anonymize_school
 from ..serializers import SchoolSerializer
 
 
@@ -35,19 +37,7 @@ class SchoolViewSet(_SchoolViewSet):
     def destroy(self, request, *args, **kwargs):
         school = self.get_object()
 
-        for klass in Class.objects.filter(teacher__school=school):
-            for student_user in StudentUser.objects.filter(
-                new_student__class_field=klass
-            ):
-                student_user.anonymize()
-
-            klass.anonymise()
-
-        Teacher.objects.filter(school=school).update(
-            school=None,
-            is_admin=False,
-        )
-
-        school.anonymise()
+        counts = anonymize_school(school)
+        logging.info("Anonymized school %d: %s.", school.id, counts)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
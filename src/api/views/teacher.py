@@ -6,25 +6,25 @@ Created on 18/03/2024 at 16:11:19(+00:00).
 from codeforlife.permissions import AllowAny
 from codeforlife.user.models import (
     AdminSchoolTeacher,
-    Class,
     SchoolTeacher,
-    StudentUser,
     Teacher,
-    TeacherUser,
     User,
     teacher_as_type,
 )
 from codeforlife.user.permissions import IsTeacher
 from codeforlife.views import ModelViewSet
+from django.db import transaction
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 
+from ..models import TeacherDeletionJob
 from ..serializers import (
     CreateTeacherSerializer,
     RemoveTeacherFromSchoolSerializer,
     SetSchoolTeacherAdminAccessSerializer,
 )
+from ..tasks import delete_teacher
 
 
 # pylint: disable-next=missing-class-docstring,too-many-ancestors
@@ -118,18 +118,27 @@ class TeacherViewSet(ModelViewSet[User, Teacher]):
             ):
                 return Response(status=status.HTTP_409_CONFLICT)
 
-        klass: Class  # TODO: delete in new data schema
-        for klass in teacher.class_teacher.all():
-            for student_user in StudentUser.objects.filter(
-                new_student__class_field=klass
-            ):
-                student_user.anonymize()
-
-            klass.anonymise()
-
-        TeacherUser.objects.get(id=teacher.new_user_id).anonymize()
-
-        return Response(status=status.HTTP_204_NO_CONTENT)
+        # Anonymizing the classes and their students can take a while, so it's
+        # done in the background. Reuse the teacher's unfinished job, if any,
+        # and queue it again if its worker seems to have died.
+        job = teacher.deletion_jobs.filter(
+            status__in=[
+                TeacherDeletionJob.Status.PENDING,
+                TeacherDeletionJob.Status.RUNNING,
+            ]
+        ).first()
+        if job is None or job.is_stale:
+            if job is None:
+                job = TeacherDeletionJob.objects.create(teacher=teacher)
+            else:
+                job.save(update_fields=["updated_at"])
+
+            job_id = str(job.id)
+            transaction.on_commit(lambda: delete_teacher.delay(job_id))
+
+        return Response(
+            {"job_id": str(job.id)}, status=status.HTTP_202_ACCEPTED
+        )
 
     remove_from_school = ModelViewSet.update_action("remove_from_school")
     set_admin_access = ModelViewSet.update_action("set_admin_access")
@@ -0,0 +1,32 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 02:33:48(+01:00).
+"""
+
+from codeforlife.permissions import AllowAny, AllowNone
+from codeforlife.user.models import User
+from codeforlife.views import ModelViewSet
+
+from ..models import TeacherDeletionJob
+from ..serializers import TeacherDeletionJobSerializer
+
+
+# pylint: disable-next=missing-class-docstring,too-many-ancestors
+class TeacherDeletionJobViewSet(ModelViewSet[User, TeacherDeletionJob]):
+    request_user_class = User
+    model_class = TeacherDeletionJob
+    serializer_class = TeacherDeletionJobSerializer
+    http_method_names = ["get"]
+
+    # pylint: disable-next=missing-function-docstring
+    def get_permissions(self):
+        # NOTE: The teacher is logged out once they're anonymized, so a job is
+        # retrieved by its unguessable ID instead.
+        if self.action == "retrieve":
+            return [AllowAny()]
+
+        return [AllowNone()]
+
+    # pylint: disable-next=missing-function-docstring
+    def get_queryset(self):
+        return TeacherDeletionJob.objects.all()
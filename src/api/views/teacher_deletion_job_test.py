@@ -0,0 +1,49 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 02:36:25(+01:00).
+"""
+
+from codeforlife.permissions import AllowAny, AllowNone
+from codeforlife.tests import ModelViewSetTestCase
+from codeforlife.user.models import Teacher, User
+
+from ..models import TeacherDeletionJob
+from .teacher_deletion_job import TeacherDeletionJobViewSet
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-many-ancestors
+
+
+class TestTeacherDeletionJobViewSet(
+    ModelViewSetTestCase[User, TeacherDeletionJob]
+):
+    basename = "teacher-deletion-job"
+    model_view_set_class = TeacherDeletionJobViewSet
+    fixtures = ["school_1"]
+
+    def setUp(self):
+        teacher = Teacher.objects.filter(class_teacher__isnull=False).first()
+        assert teacher
+        self.job = TeacherDeletionJob.objects.create(teacher=teacher)
+
+    # test: get permissions
+
+    def test_get_permissions__retrieve(self):
+        """Anyone can retrieve a teacher-deletion job by its ID."""
+        self.assert_get_permissions(
+            permissions=[AllowAny()],
+            action="retrieve",
+        )
+
+    def test_get_permissions__list(self):
+        """No one can list teacher-deletion jobs."""
+        self.assert_get_permissions(
+            permissions=[AllowNone()],
+            action="list",
+        )
+
+    # test: actions
+
+    def test_retrieve(self):
+        """Can successfully retrieve a teacher-deletion job's progress."""
+        self.client.retrieve(model=self.job)
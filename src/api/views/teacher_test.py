@@ -4,6 +4,7 @@ Created on 22/03/2024 at 13:48:22(+00:00).
 """
 
 import typing as t
+from datetime import timedelta
 from unittest.mock import Mock, patch
 
 from codeforlife.permissions import AllowAny
@@ -21,13 +22,16 @@ from codeforlife.user.models import (
 from codeforlife.user.permissions import IsTeacher
 from django.contrib.auth.hashers import make_password
 from django.db.models.query import QuerySet
+from django.utils import timezone
 from rest_framework import status
 
+from ..models import TeacherDeletionJob
 from ..serializers import (
     CreateTeacherSerializer,
     RemoveTeacherFromSchoolSerializer,
     SetSchoolTeacherAdminAccessSerializer,
 )
+from ..tasks import delete_teacher
 from .teacher import TeacherViewSet
 
 # pylint: disable=missing-class-docstring
@@ -250,14 +254,31 @@ class TestTeacherViewSet(ModelViewSetTestCase[User, Teacher]):
     def _test_destroy(
         self,
         user: TeacherUser,
-        status_code_assertion: int = status.HTTP_204_NO_CONTENT,
+        status_code_assertion: int = status.HTTP_202_ACCEPTED,
     ):
         self.client.login_as(user)
-        self.client.destroy(
-            user.teacher,
-            status_code_assertion=status_code_assertion,
-            make_assertions=False,
-        )
+        with patch.object(
+            delete_teacher, "delay", side_effect=delete_teacher
+        ) as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.destroy(
+                    user.teacher,
+                    status_code_assertion=status_code_assertion,
+                    make_assertions=False,
+                )
+
+        if status_code_assertion != status.HTTP_202_ACCEPTED:
+            delay.assert_not_called()
+            return
+
+        job_id = response.json()["job_id"]
+        delay.assert_called_once_with(job_id)
+
+        job = TeacherDeletionJob.objects.get(id=job_id)
+        assert job.teacher == user.teacher
+        assert job.status == TeacherDeletionJob.Status.SUCCEEDED
+        assert job.classes_processed == job.class_count
+        assert job.students_processed == job.student_count
 
     def test_destroy(self):
         """Class-teachers can anonymize themselves and their classes."""
@@ -295,6 +316,48 @@ class TestTeacherViewSet(ModelViewSetTestCase[User, Teacher]):
         assert user.teacher.school.name != school_name
         assert not user.teacher.school.is_active
 
+    def test_destroy__pending_job(self):
+        """Destroying a teacher again reuses their unfinished job."""
+        user = self.non_admin_school_1_teacher_user
+        job = TeacherDeletionJob.objects.create(teacher=user.teacher)
+
+        self.client.login_as(user)
+        with patch.object(delete_teacher, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.destroy(
+                    user.teacher,
+                    status_code_assertion=status.HTTP_202_ACCEPTED,
+                    make_assertions=False,
+                )
+
+        assert response.json() == {"job_id": str(job.id)}
+        delay.assert_not_called()
+
+    def test_destroy__stale_job(self):
+        """Destroying a teacher again requeues their unfinished job if it
+        hasn't progressed recently."""
+        user = self.non_admin_school_1_teacher_user
+        job = TeacherDeletionJob.objects.create(
+            teacher=user.teacher, status=TeacherDeletionJob.Status.RUNNING
+        )
+        TeacherDeletionJob.objects.filter(id=job.id).update(
+            updated_at=timezone.now()
+            - TeacherDeletionJob.stale_after
+            - timedelta(minutes=1)
+        )
+
+        self.client.login_as(user)
+        with patch.object(delete_teacher, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.destroy(
+                    user.teacher,
+                    status_code_assertion=status.HTTP_202_ACCEPTED,
+                    make_assertions=False,
+                )
+
+        assert response.json() == {"job_id": str(job.id)}
+        delay.assert_called_once_with(str(job.id))
+
     def test_destroy__last_admin_teacher(self):
         """
         School-teacher-users cannot anonymize themselves if they are the last
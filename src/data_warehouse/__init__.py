@@ -0,0 +1,4 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 17:31:04(+01:00).
+"""
@@ -0,0 +1,16 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 17:31:04(+01:00).
+"""
+
+from django.apps import AppConfig
+
+
+# pylint: disable-next=missing-class-docstring
+class DataWarehouseConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "src.data_warehouse"
+
+    def ready(self):
+        # pylint: disable-next=import-outside-toplevel,unused-import
+        from . import signals
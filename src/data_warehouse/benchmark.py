@@ -0,0 +1,411 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 19:20:41(+01:00).
+
+Measures how the data warehouse tasks perform as the data grows.
+"""
+
+import gzip
+import random
+import string
+import time
+import tracemalloc
+import typing as t
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from pathlib import Path
+from uuid import uuid4
+
+from codeforlife.user.models import User
+from common.models import (  # type: ignore[import-untyped]
+    Class,
+    DailyActivity,
+    School,
+    Student,
+    Teacher,
+    TotalActivity,
+    UserProfile,
+    UserSession,
+)
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from ..rapid_router.models import Attempt, Level
+from .local import LocalBucket
+from .task import DataWarehouseTask, get_tasks
+
+COUNTRIES = ["GB", "US", "IN", "FR", "DE", "ES", "NG", "AU", "CA", "IE"]
+
+
+# pylint: disable-next=too-many-arguments,too-many-locals,too-many-statements
+def seed(
+    users: int,
+    sessions_per_user: int = 3,
+    attempts_per_student: int = 5,
+    days: int = 365,
+    batch_size: int = 5000,
+    random_seed: int = 0,
+):
+    """Seed the database with synthetic schools, teachers, classes, students,
+    sessions and attempts.
+
+    About 4% of the users are teachers and 4% are independents. The rest are
+    students, spread across 2 classes per teacher and 5 teachers per school.
+    The rows are inserted in batches so memory stays bounded at any scale.
+
+    Args:
+        users: The number of users to seed.
+        sessions_per_user: The number of sessions to seed per user.
+        attempts_per_student: The number of attempts to seed per student.
+        days: How many days back the seeded activity spans.
+        batch_size: The number of users to insert per batch.
+        random_seed: The seed of the random data, for repeatable runs.
+
+    Returns:
+        The number of rows seeded per model.
+    """
+    rng = random.Random(random_seed)
+    now = timezone.now()
+    tag = uuid4().hex[:8]  # Allows the database to be seeded more than once.
+
+    teacher_count = max(1, users // 25)
+    independent_count = max(1, users // 25)
+    student_count = max(0, users - teacher_count - independent_count)
+    school_count = max(1, teacher_count // 5)
+
+    counts: t.Dict[str, int] = {}
+
+    def count(name: str, objs: t.Sized):
+        counts[name] = counts.get(name, 0) + len(objs)
+
+    def random_datetime():
+        return now - timedelta(seconds=rng.randint(0, days * 24 * 60 * 60))
+
+    def create_users(role: str, start: int, size: int):
+        user_objs = User.objects.bulk_create(
+            [
+                User(
+                    username=f"benchmark_{tag}_{role}_{i}",
+                    email=f"benchmark_{tag}_{role}_{i}@example.com",
+                    first_name=f"{role.title()} {i}",
+                    password="!",  # unusable password
+                    date_joined=random_datetime(),
+                    last_login=random_datetime(),
+                )
+                for i in range(start, start + size)
+            ]
+        )
+        user_profiles = UserProfile.objects.bulk_create(
+            [
+                UserProfile(user=user, is_verified=rng.random() < 0.8)
+                for user in user_objs
+            ]
+        )
+        count("users", user_objs)
+
+        return user_objs, user_profiles
+
+    def create_sessions(
+        user_objs: t.List[User],
+        school_ids: t.List[t.Optional[int]],
+        class_ids: t.List[t.Optional[int]],
+    ):
+        sessions = UserSession.objects.bulk_create(
+            [
+                UserSession(
+                    user=user,
+                    login_time=random_datetime(),
+                    school_id=school_id,
+                    class_field_id=class_id,
+                )
+                for user, school_id, class_id in zip(
+                    user_objs, school_ids, class_ids
+                )
+                for _ in range(sessions_per_user)
+            ]
+        )
+        count("user_sessions", sessions)
+
+    schools = School.objects.bulk_create(
+        [
+            School(
+                name=f"Benchmark school {tag} {i}",
+                country=rng.choice(COUNTRIES),
+                creation_time=random_datetime(),
+            )
+            for i in range(school_count)
+        ],
+        batch_size=batch_size,
+    )
+    count("schools", schools)
+
+    # Teachers and their classes.
+    class_ids: t.List[int] = []
+    for start in range(0, teacher_count, batch_size):
+        size = min(batch_size, teacher_count - start)
+        with transaction.atomic():
+            user_objs, user_profiles = create_users("teacher", start, size)
+            teachers = Teacher.objects.bulk_create(
+                [
+                    Teacher(
+                        user=user_profile,
+                        new_user=user,
+                        school=rng.choice(schools),
+                    )
+                    for user, user_profile in zip(user_objs, user_profiles)
+                ]
+            )
+            count("teachers", teachers)
+
+            classes = Class.objects.bulk_create(
+                [
+                    Class(
+                        name=f"Class {i}",
+                        teacher=teacher,
+                        access_code="".join(
+                            rng.choices(string.ascii_uppercase, k=5)
+                        ),
+                        creation_time=random_datetime(),
+                    )
+                    for teacher in teachers
+                    for i in range(2)
+                ]
+            )
+            class_ids.extend(klass.id for klass in classes)
+            count("classes", classes)
+
+            create_sessions(
+                user_objs,
+                school_ids=[teacher.school_id for teacher in teachers],
+                class_ids=[None] * size,
+            )
+
+    level_ids = list(
+        Level.objects.filter(default=True).values_list("id", flat=True)
+    )
+
+    # Independents, then students.
+    for role, role_count, get_class_id in (
+        ("independent", independent_count, lambda: None),
+        ("student", student_count, lambda: rng.choice(class_ids)),
+    ):
+        for start in range(0, role_count, batch_size):
+            size = min(batch_size, role_count - start)
+            with transaction.atomic():
+                user_objs, user_profiles = create_users(role, start, size)
+                students = Student.objects.bulk_create(
+                    [
+                        Student(
+                            user=user_profile,
+                            new_user=user,
+                            class_field_id=get_class_id(),
+                        )
+                        for user, user_profile in zip(user_objs, user_profiles)
+                    ]
+                )
+                count("students", students)
+
+                create_sessions(
+                    user_objs,
+                    school_ids=[None] * size,
+                    class_ids=[student.class_field_id for student in students],
+                )
+
+                if level_ids:
+                    attempts = Attempt.objects.bulk_create(
+                        [
+                            Attempt(
+                                level_id=rng.choice(level_ids),
+                                student=student,
+                                finish_time=random_datetime(),
+                                score=rng.randint(0, 20),
+                                is_best_attempt=rng.random() < 0.2,
+                            )
+                            for student in students
+                            for _ in range(attempts_per_student)
+                        ]
+                    )
+                    count("attempts", attempts)
+
+    # One row of activity per day.
+    existing_dates = set(
+        DailyActivity.objects.filter(
+            date__gt=now.date() - timedelta(days=days)
+        ).values_list("date", flat=True)
+    )
+    daily_activities = DailyActivity.objects.bulk_create(
+        [
+            DailyActivity(
+                date=activity_date,
+                **{
+                    field: rng.randint(0, 100)
+                    for field in (
+                        "csv_click_count",
+                        "login_cards_click_count",
+                        "level_control_submits",
+                        "teacher_lockout_resets",
+                        "indy_lockout_resets",
+                        "school_student_lockout_resets",
+                        "anonymised_unverified_teachers",
+                        "anonymised_unverified_independents",
+                    )
+                },
+            )
+            for activity_date in (
+                now.date() - timedelta(days=i) for i in range(days)
+            )
+            if activity_date not in existing_dates
+        ],
+        batch_size=batch_size,
+    )
+    count("daily_activities", daily_activities)
+
+    if not TotalActivity.objects.exists():
+        TotalActivity.objects.create()
+
+    return counts
+
+
+def count_rows(path: Path):
+    """Count the rows in an uploaded CSV or staged NDJSON file.
+
+    Args:
+        path: The path of the file.
+
+    Returns:
+        The number of rows in the file, excluding any header.
+    """
+    if path.name.endswith(".ndjson.gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return sum(1 for _ in file)
+
+    return len(path.read_text(encoding="utf-8").splitlines()) - 1
+
+
+def benchmark_task(
+    task: DataWarehouseTask,
+    bucket_path: Path,
+    trace_memory: bool = True,
+    upload_latency: float = 0.0,
+    pipeline_depth: t.Optional[int] = None,
+):
+    # pylint: disable=line-too-long
+    """Run a task's export into a local bucket and measure it.
+
+    Incremental tasks are fully refreshed so every task exports its whole
+    table. The export is rolled back, as in a dry run, so the database is left
+    unchanged. Partitioned tasks are therefore exported in a single thread.
+
+    Args:
+        task: The task to benchmark.
+        bucket_path: The directory of the local bucket to export into.
+        trace_memory: Whether to measure the peak memory. Tracing memory slows down the export.
+        upload_latency: The number of seconds each upload is delayed by, to simulate uploading to GCS.
+        pipeline_depth: The max number of files waiting to be uploaded while the next is read. If None, the task's own depth is used.
+
+    Returns:
+        The measurements of the task's export.
+    """
+    # pylint: enable=line-too-long
+    bucket = LocalBucket(bucket_path, upload_latency=upload_latency)
+    timestamp = task.to_timestamp(datetime.now(dt_timezone.utc))
+
+    if pipeline_depth is None:
+        pipeline_depth = task.pipeline_depth
+
+    task.local_bucket = bucket
+    task.pipeline_depth = pipeline_depth
+    task.dry_run = True  # Other threads can't share the transaction.
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                start = time.perf_counter()
+                # pylint: disable-next=protected-access
+                task._save_query_set_as_csvs_in_gcs_bucket(
+                    task, timestamp, **{task.full_refresh_key: True}
+                )
+                wall_time = time.perf_counter() - start
+
+                # Roll back the watermarks, row hashes and snapshots saved by
+                # the export so the next real export is unaffected.
+                transaction.set_rollback(True)
+
+        peak_memory = (
+            tracemalloc.get_traced_memory()[1] if trace_memory else None
+        )
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        task.local_bucket = None
+        del task.pipeline_depth  # Fall back to the class's depth.
+        del task.dry_run
+
+    # Exclude the manifests of staged files.
+    blobs = [
+        blob
+        for blob in bucket.list_blobs()
+        if not blob.name.split("/")[0].endswith("__manifest")
+    ]
+    rows = sum(count_rows(blob.path) for blob in blobs)
+
+    return {
+        "task": task.name,
+        "bq_table_name": task.settings.bq_table_name,
+        "rows": rows,
+        "chunks": len(blobs),
+        "bytes": sum(blob.path.stat().st_size for blob in blobs),
+        "wall_time": wall_time,
+        "rows_per_second": rows / wall_time if wall_time else None,
+        "query_count": len(queries),
+        "peak_memory": peak_memory,
+        "pipeline_depth": pipeline_depth,
+    }
+
+
+def benchmark(
+    bucket_path: Path,
+    bq_table_names: t.Optional[t.Collection[str]] = None,
+    trace_memory: bool = True,
+    upload_latency: float = 0.0,
+    pipeline_depth: t.Optional[int] = None,
+):
+    # pylint: disable=line-too-long
+    """Benchmark the data warehouse tasks.
+
+    Args:
+        bucket_path: The directory in which each task's local bucket is made.
+        bq_table_names: The tables of the tasks to benchmark. If None, every task is benchmarked.
+        trace_memory: Whether to measure each task's peak memory.
+        upload_latency: The number of seconds each upload is delayed by, to simulate uploading to GCS.
+        pipeline_depth: The max number of files waiting to be uploaded while the next is read. If None, each task's own depth is used.
+
+    Returns:
+        A machine-readable report of each task's measurements.
+    """
+    # pylint: enable=line-too-long
+    tasks = [
+        task
+        for task in get_tasks()
+        if bq_table_names is None
+        or task.settings.bq_table_name in bq_table_names
+    ]
+
+    return {
+        "created_at": timezone.now().isoformat(),
+        "database": connection.vendor,
+        "users": User.objects.count(),
+        "upload_latency": upload_latency,
+        "tasks": [
+            benchmark_task(
+                task,
+                bucket_path / task.settings.bq_table_name,
+                trace_memory=trace_memory,
+                upload_latency=upload_latency,
+                pipeline_depth=pipeline_depth,
+            )
+            for task in tasks
+        ],
+    }
@@ -0,0 +1,90 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 20:03:26(+01:00).
+"""
+
+import tempfile
+from pathlib import Path
+
+from codeforlife.tests import TestCase
+from codeforlife.user.models import School
+
+from .benchmark import benchmark, get_tasks, seed
+from .models import Watermark
+
+# pylint: disable=missing-class-docstring
+
+
+class TestBenchmark(TestCase):
+    def test_seed(self):
+        """Users are seeded at the requested scale, split by user type."""
+        counts = seed(users=100, sessions_per_user=2, days=10)
+
+        assert counts["users"] == 100
+        assert counts["teachers"] == 4
+        assert counts["students"] == 96
+        assert counts["schools"] == 1
+        assert counts["classes"] == 8
+        assert counts["user_sessions"] == 200
+
+    def test_get_tasks(self):
+        """Every data warehouse task is found."""
+        bq_table_names = [task.settings.bq_table_name for task in get_tasks()]
+
+        assert "common_school" in bq_table_names
+        assert "rapid_router_attempts" in bq_table_names
+
+    def test_benchmark(self):
+        """Each task's export is measured."""
+        seed(users=50, days=10)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report = benchmark(
+                bucket_path=Path(temp_dir), bq_table_names=["common_school"]
+            )
+
+        assert len(report["tasks"]) == 1
+        result = report["tasks"][0]
+        assert result["bq_table_name"] == "common_school"
+        assert result["rows"] == School.objects.get_original_queryset().count()
+        assert result["query_count"] > 0
+        assert result["wall_time"] > 0
+        assert result["peak_memory"] > 0
+
+    def test_benchmark__pipeline_depth(self):
+        """Pipelining the uploads exports the same rows as uploading inline."""
+        seed(users=50, days=10)
+
+        results = []
+        for pipeline_depth in [0, 2]:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                report = benchmark(
+                    bucket_path=Path(temp_dir),
+                    bq_table_names=["common_school"],
+                    trace_memory=False,
+                    upload_latency=0.01,
+                    pipeline_depth=pipeline_depth,
+                )
+
+            assert report["upload_latency"] == 0.01
+            (result,) = report["tasks"]
+            assert result["pipeline_depth"] == pipeline_depth
+            results.append(result)
+
+        assert results[0]["rows"] == results[1]["rows"]
+        assert results[0]["chunks"] == results[1]["chunks"]
+
+    def test_benchmark__rolled_back(self):
+        """The export's changes to the database are rolled back."""
+        seed(users=50, days=10)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            benchmark(
+                bucket_path=Path(temp_dir),
+                bq_table_names=["rapid_router_attempts"],
+                trace_memory=False,
+            )
+
+        assert not Watermark.objects.filter(
+            bq_table_name="rapid_router_attempts"
+        ).exists()
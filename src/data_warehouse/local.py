@@ -0,0 +1,315 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 19:02:15(+01:00).
+
+Local stand-ins for the GCS bucket, so tasks can be run without a warehouse.
+"""
+
+import csv
+import gzip
+import io
+import json
+import re
+import shutil
+import sqlite3
+import time
+import typing as t
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+# The blobs accept the same arguments as GCS's blobs, even if they're unused.
+# pylint: disable=unused-argument
+
+
+class LocalBlob:
+    """A file in a local bucket."""
+
+    def __init__(self, bucket: "LocalBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+
+    @property
+    def path(self):
+        """The path of the blob's file."""
+        return self.bucket.path / self.name
+
+    def upload_from_string(
+        self, data: str, content_type: t.Optional[str] = None
+    ):
+        """Write the data to the blob's file."""
+        time.sleep(self.bucket.upload_latency)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(data, encoding="utf-8")
+
+    def upload_from_file(
+        self, file_obj: t.IO[bytes], content_type: t.Optional[str] = None
+    ):
+        """Copy the file's contents to the blob's file."""
+        time.sleep(self.bucket.upload_latency)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("wb") as blob_file:
+            shutil.copyfileobj(file_obj, blob_file)
+
+    def delete(self):
+        """Delete the blob's file."""
+        self.path.unlink(missing_ok=True)
+
+
+class LocalBucket:
+    """A directory of files which quacks like a GCS bucket.
+
+    The blobs are saved as files so they can be written from other threads,
+    e.g. when a task's partitions are exported concurrently. Each upload can be
+    delayed to simulate the network latency of GCS.
+    """
+
+    def __init__(self, path: t.Union[str, Path], upload_latency: float = 0.0):
+        self.path = Path(path)
+        self.upload_latency = upload_latency  # seconds per upload
+
+    def blob(self, name: str):
+        """Get a blob in this bucket by its name."""
+        return LocalBlob(self, name)
+
+    def list_blobs(self, prefix: str = ""):
+        """List the blobs whose names start with the prefix, sorted by name."""
+        if not self.path.exists():
+            return []
+
+        return [
+            self.blob(name)
+            for name in sorted(
+                path.relative_to(self.path).as_posix()
+                for path in self.path.rglob("*")
+                if path.is_file()
+            )
+            if name.startswith(prefix)
+        ]
+
+
+class SqliteBlob:
+    """A blob in a SQLite bucket."""
+
+    def __init__(self, bucket: "SqliteBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+
+    def upload_from_string(
+        self, data: str, content_type: t.Optional[str] = None
+    ):
+        """Save the data as the blob's content."""
+        self.bucket.save(self.name, data.encode())
+
+    def upload_from_file(
+        self, file_obj: t.IO[bytes], content_type: t.Optional[str] = None
+    ):
+        """Save the file's contents as the blob's content."""
+        self.bucket.save(self.name, file_obj.read())
+
+    def download_as_bytes(self):
+        """Get the blob's content."""
+        with self.bucket.connect() as connection:
+            (content,) = connection.execute(
+                "SELECT content FROM blobs WHERE name = ?", (self.name,)
+            ).fetchone()
+
+        return t.cast(bytes, content)
+
+    def delete(self):
+        """Delete the blob and the rows loaded from it."""
+        self.bucket.delete(self.name)
+
+
+class SqliteBucket:
+    """A SQLite database which quacks like a GCS bucket. Used for dry runs.
+
+    Each chunk's rows are also loaded into a table named after its BigQuery
+    table, with the chunk's blob name and write-mode, so what a task exported
+    can be checked with SQL. How long each chunk took to save, and when, is
+    recorded in the chunk_timings table.
+
+    A connection is opened per operation so the bucket can be written to from
+    other threads.
+    """
+
+    # E.g. "user__append/2025-01-01_00:00:00__1_1000.csv"
+    CHUNK_NAME_PATTERN = re.compile(
+        r"^(?P<bq_table_name>.+)__(?P<bq_table_write_mode>[a-z]+)/"
+        r"(?P<timestamp>[^/]+)__(?P<obj_i_start>\d+)_(?P<obj_i_end>\d+)"
+        r"\.(?P<file_extension>csv|ndjson\.gz)$"
+    )
+
+    def __init__(self, path: t.Union[str, Path], upload_latency: float = 0.0):
+        self.path = Path(path)
+        self.upload_latency = upload_latency  # seconds per upload
+
+        with self.connect() as connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS blobs (
+                    name TEXT PRIMARY KEY,
+                    content BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS chunk_timings (
+                    blob_name TEXT NOT NULL,
+                    bq_table_name TEXT NOT NULL,
+                    bq_table_write_mode TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    bytes INTEGER NOT NULL,
+                    started_at REAL NOT NULL,
+                    duration REAL NOT NULL
+                );
+                """
+            )
+
+    @contextmanager
+    def connect(self):
+        """Open a connection which commits on success and is then closed."""
+        with closing(sqlite3.connect(self.path, timeout=60)) as connection:
+            with connection:
+                yield connection
+
+    def blob(self, name: str):
+        """Get a blob in this bucket by its name."""
+        return SqliteBlob(self, name)
+
+    def list_blobs(self, prefix: str = ""):
+        """List the blobs whose names start with the prefix, sorted by name."""
+        with self.connect() as connection:
+            names = connection.execute(
+                "SELECT name FROM blobs WHERE substr(name, 1, ?) = ?"
+                " ORDER BY name",
+                (len(prefix), prefix),
+            ).fetchall()
+
+        return [self.blob(name) for (name,) in names]
+
+    @staticmethod
+    def _read_rows(file_extension: str, content: bytes):
+        if file_extension == "csv":
+            csv_reader = csv.reader(io.StringIO(content.decode()))
+            fields = next(csv_reader)
+            return fields, list(csv_reader)
+
+        lines = gzip.decompress(content).decode().splitlines()
+        objs = [json.loads(line) for line in lines]
+        fields = list(objs[0]) if objs else []
+        return fields, [[obj[field] for field in fields] for obj in objs]
+
+    def save(self, name: str, content: bytes):
+        """Save a blob's content, replacing any with the same name. If the blob
+        is a chunk, its rows are loaded and its timing is recorded.
+
+        Args:
+            name: The name of the blob.
+            content: The content of the blob.
+        """
+        started_at = time.time()
+        start = time.perf_counter()
+        time.sleep(self.upload_latency)
+
+        self.delete(name)
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT INTO blobs (name, content) VALUES (?, ?)",
+                (name, content),
+            )
+
+            match = self.CHUNK_NAME_PATTERN.match(name)
+            if match is None:
+                return
+
+            bq_table_name = match["bq_table_name"]
+            bq_table_write_mode = match["bq_table_write_mode"]
+            fields, rows = self._read_rows(match["file_extension"], content)
+            if rows:
+                columns = ", ".join(
+                    f'"{column}"'
+                    for column in ["_blob_name", "_write_mode", *fields]
+                )
+                connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{bq_table_name}" ({columns})'
+                )
+                connection.executemany(
+                    f'INSERT INTO "{bq_table_name}" ({columns})'
+                    f" VALUES ({', '.join('?' * (len(fields) + 2))})",
+                    [[name, bq_table_write_mode, *row] for row in rows],
+                )
+
+            connection.execute(
+                "INSERT INTO chunk_timings VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    bq_table_name,
+                    bq_table_write_mode,
+                    len(rows),
+                    len(content),
+                    started_at,
+                    time.perf_counter() - start,
+                ),
+            )
+
+    def delete(self, name: str):
+        """Delete a blob and the rows loaded from it.
+
+        Args:
+            name: The name of the blob.
+        """
+        with self.connect() as connection:
+            connection.execute("DELETE FROM blobs WHERE name = ?", (name,))
+
+            match = self.CHUNK_NAME_PATTERN.match(name)
+            if (
+                match is not None
+                and connection.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                    (match["bq_table_name"],),
+                ).fetchone()
+            ):
+                connection.execute(
+                    f'DELETE FROM "{match["bq_table_name"]}"'
+                    " WHERE _blob_name = ?",
+                    (name,),
+                )
+
+    def summarize(self):
+        """Summarize the chunks saved for each BigQuery table.
+
+        Returns:
+            The chunks, rows, bytes and save time of each BigQuery table.
+        """
+        with self.connect() as connection:
+            summaries = connection.execute(
+                """
+                SELECT
+                    bq_table_name,
+                    COUNT(*),
+                    SUM(rows),
+                    SUM(bytes),
+                    SUM(duration),
+                    MAX(started_at + duration) - MIN(started_at)
+                FROM chunk_timings
+                GROUP BY bq_table_name
+                ORDER BY bq_table_name
+                """
+            ).fetchall()
+
+        return [
+            {
+                "bq_table_name": bq_table_name,
+                "chunks": chunks,
+                "rows": rows,
+                "bytes": size,
+                "save_time": save_time,
+                "wall_time": wall_time,
+                "rows_per_second": rows / wall_time if wall_time else None,
+            }
+            for (
+                bq_table_name,
+                chunks,
+                rows,
+                size,
+                save_time,
+                wall_time,
+            ) in summaries
+        ]
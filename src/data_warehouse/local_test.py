@@ -0,0 +1,95 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 20:11:52(+01:00).
+"""
+
+import gzip
+import io
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from .local import LocalBucket, SqliteBucket
+
+# pylint: disable=missing-class-docstring
+
+
+class TestLocalBucket(SimpleTestCase):
+    def test_blobs(self):
+        """Blobs can be uploaded, listed by prefix and deleted."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bucket = LocalBucket(temp_dir)
+            for blob_name in ["a__append/1.csv", "a__append/2.csv", "b/1.csv"]:
+                bucket.blob(blob_name).upload_from_string("id\n1")
+
+            blobs = bucket.list_blobs(prefix="a__append/")
+            assert [blob.name for blob in blobs] == [
+                "a__append/1.csv",
+                "a__append/2.csv",
+            ]
+            assert blobs[0].path.read_text(encoding="utf-8") == "id\n1"
+
+            blobs[0].delete()
+            assert [blob.name for blob in bucket.list_blobs()] == [
+                "a__append/2.csv",
+                "b/1.csv",
+            ]
+
+    def test_upload_from_file(self):
+        """A blob can be uploaded from a binary file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            blob = LocalBucket(temp_dir).blob("a__append/1.ndjson.gz")
+            blob.upload_from_file(io.BytesIO(b"\x1f\x8b"))
+
+            assert blob.path.read_bytes() == b"\x1f\x8b"
+
+
+class TestSqliteBucket(SimpleTestCase):
+    def test_blobs(self):
+        """Blobs can be uploaded, listed by prefix and deleted, and the rows of
+        each chunk are loaded into its table and timed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bucket = SqliteBucket(Path(temp_dir) / "warehouse.sqlite3")
+            csv_blob = bucket.blob(
+                "user__overwrite/2025-01-01_00:00:00__1_2.csv"
+            )
+            csv_blob.upload_from_string("first_name,id\nA,1\nB,2")
+            ndjson = gzip.compress(b'{"first_name": "C", "id": 3}\n')
+            bucket.blob(
+                "user__upsert/2025-01-01_00:00:00__1_1.ndjson.gz"
+            ).upload_from_file(io.BytesIO(ndjson))
+            bucket.blob(
+                "user__upsert__manifest/2025-01-01_00:00:00.json"
+            ).upload_from_string("{}")
+
+            blobs = bucket.list_blobs(prefix="user__upsert/")
+            assert [blob.name for blob in blobs] == [
+                "user__upsert/2025-01-01_00:00:00__1_1.ndjson.gz"
+            ]
+            assert blobs[0].download_as_bytes() == ndjson
+
+            def select_rows():
+                connection = sqlite3.connect(bucket.path)
+                try:
+                    return connection.execute(
+                        'SELECT _write_mode, first_name, id FROM "user"'
+                        " ORDER BY first_name"
+                    ).fetchall()
+                finally:
+                    connection.close()
+
+            assert select_rows() == [
+                ("overwrite", "A", "1"),
+                ("overwrite", "B", "2"),
+                ("upsert", "C", 3),
+            ]
+
+            csv_blob.delete()
+            assert select_rows() == [("upsert", "C", 3)]
+
+            (summary,) = bucket.summarize()
+            assert summary["bq_table_name"] == "user"
+            assert summary["chunks"] == 2
+            assert summary["rows"] == 3
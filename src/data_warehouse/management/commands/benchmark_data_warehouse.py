@@ -0,0 +1,102 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 19:48:03(+01:00).
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from ...benchmark import benchmark, seed
+
+
+def scale(value: str):
+    """Parse a number of users, e.g. "10k" or "1M"."""
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1:].lower(), 1)
+    if multiplier != 1:
+        value = value[:-1]
+
+    try:
+        return int(value) * multiplier
+    except ValueError as ex:
+        raise CommandError(f'Invalid scale "{value}".') from ex
+
+
+# pylint: disable-next=missing-class-docstring
+class Command(BaseCommand):
+    help = (
+        "Benchmark the data warehouse tasks by exporting each task's queryset"
+        " into a local bucket. Reports each task's rows/sec, query count, peak"
+        " memory and wall time as JSON."
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            "--seed",
+            type=scale,
+            default=0,
+            help='Seed this many synthetic users first, e.g. "10k" or "1M".',
+        )
+        parser.add_argument(
+            "--table",
+            action="append",
+            dest="bq_table_names",
+            help="Only benchmark the task of this table. Can be repeated.",
+        )
+        parser.add_argument(
+            "--output",
+            type=Path,
+            help="Write the report to this file instead of stdout.",
+        )
+        parser.add_argument(
+            "--bucket-dir",
+            type=Path,
+            help="Keep the exported CSVs in this directory.",
+        )
+        parser.add_argument(
+            "--no-trace-memory",
+            action="store_false",
+            dest="trace_memory",
+            help="Don't measure peak memory, which slows down the exports.",
+        )
+        parser.add_argument(
+            "--upload-latency",
+            type=float,
+            default=0.0,
+            help="Delay each upload by this many seconds to simulate GCS.",
+        )
+        parser.add_argument(
+            "--pipeline-depth",
+            type=int,
+            help=(
+                "The max number of files waiting to be uploaded while the next"
+                " is read. 0 uploads each file before reading the next."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            if settings.ENV != "local":
+                raise CommandError("Can only seed a local database.")
+
+            self.stderr.write(f"Seeding {options['seed']} users...")
+            counts = seed(users=options["seed"])
+            self.stderr.write(f"Seeded {json.dumps(counts)}.")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report = benchmark(
+                bucket_path=options["bucket_dir"] or Path(temp_dir),
+                bq_table_names=options["bq_table_names"],
+                trace_memory=options["trace_memory"],
+                upload_latency=options["upload_latency"],
+                pipeline_depth=options["pipeline_depth"],
+            )
+
+        report_json = json.dumps(report, indent=2)
+        if options["output"]:
+            options["output"].write_text(report_json, encoding="utf-8")
+        else:
+            self.stdout.write(report_json)
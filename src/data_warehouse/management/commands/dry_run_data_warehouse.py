@@ -0,0 +1,67 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 01:48:26(+01:00).
+"""
+
+import json
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from ...local import SqliteBucket
+from ...task import get_tasks
+
+
+# pylint: disable-next=missing-class-docstring
+class Command(BaseCommand):
+    help = (
+        "Dry run the data warehouse tasks by exporting each task's queryset"
+        " into a SQLite database instead of GCS. Every change the exports make"
+        " to this database, e.g. to the watermarks, is rolled back. Reports"
+        " each table's chunks, rows and timings as JSON."
+    )
+
+    def add_arguments(self, parser: CommandParser):
+        parser.add_argument(
+            "--output",
+            type=Path,
+            default=Path("data_warehouse.sqlite3"),
+            help="The SQLite database to export into. Replaced if it exists.",
+        )
+        parser.add_argument(
+            "--table",
+            action="append",
+            dest="bq_table_names",
+            help="Only dry run the task of this table. Can be repeated.",
+        )
+        parser.add_argument(
+            "--full-refresh",
+            action="store_true",
+            help="Export the whole of every incremental table.",
+        )
+
+    def handle(self, *args, **options):
+        path: Path = options["output"]
+        path.unlink(missing_ok=True)
+
+        for task in get_tasks():
+            if (
+                options["bq_table_names"] is not None
+                and task.settings.bq_table_name not in options["bq_table_names"]
+            ):
+                continue
+
+            self.stderr.write(f"Dry running {task.settings.bq_table_name}...")
+            # pylint: disable-next=protected-access
+            task._save_query_set_as_csvs_in_gcs_bucket(
+                task,
+                task.to_timestamp(datetime.now(dt_timezone.utc)),
+                **{
+                    task.dry_run_key: path,
+                    task.full_refresh_key: options["full_refresh"],
+                },
+            )
+
+        self.stdout.write(json.dumps(SqliteBucket(path).summarize(), indent=2))
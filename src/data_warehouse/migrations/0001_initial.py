@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Watermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "bq_table_name",
+                    models.CharField(max_length=255, unique=True),
+                ),
+                ("last_id", models.PositiveBigIntegerField(default=0)),
+                (
+                    "last_full_refresh_at",
+                    models.DateTimeField(blank=True, null=True),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
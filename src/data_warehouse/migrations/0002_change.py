@@ -0,0 +1,51 @@
+# Generated by Django 5.1.15 on 2026-10-18 20:36
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_warehouse", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Change",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "entity",
+                    models.CharField(
+                        choices=[
+                            ("user", "User"),
+                            ("teacher", "Teacher"),
+                            ("student", "Student"),
+                            ("class", "Class"),
+                            ("school", "School"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("entity_id", models.PositiveBigIntegerField()),
+                (
+                    "changed_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["entity", "id"], name="change__entity")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_warehouse", "0002_change"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RowHash",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bq_table_name", models.CharField(max_length=255)),
+                ("row_id", models.PositiveBigIntegerField()),
+                ("row_hash", models.BigIntegerField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("bq_table_name", "row_id"),
+                        name="row_hash__bq_table_name__row_id",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.15 on 2026-10-18 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_warehouse", "0003_rowhash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="KpiSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+                ("teacher_registrations", models.PositiveIntegerField()),
+                ("student_registrations", models.PositiveIntegerField()),
+                ("independent_registrations", models.PositiveIntegerField()),
+                (
+                    "anonymised_unverified_teachers",
+                    models.PositiveIntegerField(),
+                ),
+                (
+                    "anonymised_unverified_independents",
+                    models.PositiveIntegerField(),
+                ),
+                ("teacher_levels", models.PositiveIntegerField()),
+                ("school_student_levels", models.PositiveIntegerField()),
+                ("independent_student_levels", models.PositiveIntegerField()),
+                ("unallocated_users", models.PositiveIntegerField()),
+                ("total_games_created", models.PositiveIntegerField()),
+                ("shared_levels_played", models.PositiveIntegerField()),
+                ("total_levels_shared", models.PositiveIntegerField()),
+            ],
+        ),
+    ]
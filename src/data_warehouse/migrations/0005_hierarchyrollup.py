@@ -0,0 +1,94 @@
+# Generated by Django 5.1.15 on 2026-10-18 23:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+        ("data_warehouse", "0004_kpisnapshot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HierarchyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TeacherRollup",
+            fields=[
+                (
+                    "id",
+                    models.PositiveBigIntegerField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                ("is_active", models.BooleanField(null=True)),
+                ("last_login", models.DateTimeField(null=True)),
+                ("class_count", models.PositiveIntegerField()),
+                ("student_count", models.PositiveIntegerField()),
+                (
+                    "rollup",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="teachers",
+                        to="data_warehouse.hierarchyrollup",
+                    ),
+                ),
+                (
+                    "school",
+                    models.ForeignKey(
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="teacher_rollups",
+                        to="common.school",
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ClassRollup",
+            fields=[
+                (
+                    "id",
+                    models.PositiveBigIntegerField(
+                        primary_key=True, serialize=False
+                    ),
+                ),
+                ("name", models.CharField(max_length=200)),
+                ("teacher_is_active", models.BooleanField(null=True)),
+                ("last_login", models.DateTimeField(null=True)),
+                ("student_count", models.PositiveIntegerField()),
+                (
+                    "rollup",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="classes",
+                        to="data_warehouse.hierarchyrollup",
+                    ),
+                ),
+                (
+                    "teacher",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="classes",
+                        to="data_warehouse.teacherrollup",
+                    ),
+                ),
+            ],
+        ),
+    ]
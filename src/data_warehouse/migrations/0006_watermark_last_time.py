@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_warehouse", "0005_hierarchyrollup"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="watermark",
+            name="last_time",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 23:51
+
+from django.db import migrations
+
+INDEX_NAME = "game_attempt__finish_time__id"
+
+
+def create_index(apps, schema_editor):
+    """Index the attempts by when they finished, for their keyset export.
+
+    The attempts are owned by the game app so the index is created here. On
+    PostgreSQL, the index is created concurrently to avoid locking the table.
+    """
+    # pylint: disable-next=protected-access
+    db_table = apps.get_model("game", "Attempt")._meta.db_table
+    is_postgres = schema_editor.connection.vendor == "postgresql"
+    schema_editor.execute(
+        f"CREATE INDEX {'CONCURRENTLY ' if is_postgres else ''}"
+        f"IF NOT EXISTS {INDEX_NAME}"
+        f" ON {schema_editor.quote_name(db_table)} (finish_time, id)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    """Drop the index of the attempts by when they finished."""
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    atomic = False  # Indexes can't be created concurrently in a transaction.
+
+    dependencies = [
+        ("data_warehouse", "0006_watermark_last_time"),
+        ("game", "0055_support_multiple_attempts"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_warehouse", "0007_attempt_finish_time_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bq_table_name", models.CharField(max_length=255)),
+                ("started_at", models.DateTimeField()),
+                ("duration", models.DurationField()),
+                (
+                    "rows",
+                    models.PositiveBigIntegerField(blank=True, null=True),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                        ],
+                        max_length=9,
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["bq_table_name", "started_at"],
+                        name="task_run__bq_table_name",
+                    )
+                ],
+            },
+        ),
+    ]
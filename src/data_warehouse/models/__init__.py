@@ -0,0 +1,11 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 17:33:26(+01:00).
+"""
+
+from .change import Change
+from .hierarchy_rollup import ClassRollup, HierarchyRollup, TeacherRollup
+from .kpi_snapshot import KpiSnapshot
+from .row_hash import RowHash
+from .task_run import TaskRun
+from .watermark import Watermark
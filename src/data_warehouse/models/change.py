@@ -0,0 +1,64 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 20:34:18(+01:00).
+"""
+
+import typing as t
+
+from django.db import models
+from django.utils import timezone
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from django_stubs_ext.db.models import TypedModelMeta
+else:
+    TypedModelMeta = object
+
+
+# pylint: disable-next=missing-class-docstring,too-few-public-methods
+class ChangeManager(models.Manager["Change"]):
+    def record(self, entity: "Change.Entity", entity_ids: t.Iterable[int]):
+        """Record that the entities with the given IDs have changed.
+
+        Args:
+            entity: The type of entity which changed.
+            entity_ids: The IDs of the entities which changed.
+
+        Returns:
+            The recorded changes.
+        """
+        return self.bulk_create(
+            [
+                Change(entity=entity, entity_id=entity_id)
+                for entity_id in set(entity_ids)
+            ]
+        )
+
+
+class Change(models.Model):
+    """A journal entry recording that an entity was created, updated or
+    deleted. Used to only export the rows which changed since the last export.
+    """
+
+    # pylint: disable-next=too-many-ancestors
+    class Entity(models.TextChoices):
+        """The types of entities whose changes are recorded."""
+
+        USER = "user"
+        TEACHER = "teacher"
+        STUDENT = "student"
+        CLASS = "class"
+        SCHOOL = "school"
+
+    entity = models.CharField(max_length=10, choices=Entity.choices)
+    entity_id = models.PositiveBigIntegerField()
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    objects: ChangeManager = ChangeManager()
+
+    class Meta(TypedModelMeta):
+        indexes = [
+            models.Index(fields=["entity", "id"], name="change__entity"),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.entity_id} changed at {self.changed_at}"
@@ -0,0 +1,175 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 23:05:27(+01:00).
+"""
+
+import typing as t
+from datetime import date
+from itertools import groupby
+
+from common.models import School, Teacher  # type: ignore[import-untyped]
+from django.db import models, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+
+# pylint: disable-next=missing-class-docstring
+class HierarchyRollupManager(models.Manager["HierarchyRollup"]):
+    def take(
+        self, rollup_date: t.Optional[date] = None, batch_size: int = 1000
+    ):
+        """Roll up the School->Teacher->Class->Student hierarchy, replacing
+        any previous rollup.
+
+        The hierarchy is walked in a single scan, grouping each teacher's
+        classes by their students. Every count is derived from that scan.
+
+        Args:
+            rollup_date: The date of the rollup. Defaults to today.
+            batch_size: The number of rows to insert per batch.
+
+        Returns:
+            The rollup.
+        """
+        rows = (
+            Teacher.objects.get_original_queryset()
+            .values(
+                "id",
+                "school_id",
+                "new_user__is_active",
+                "new_user__last_login",
+                "class_teacher__id",
+                "class_teacher__name",
+            )
+            .annotate(student_count=Count("class_teacher__students"))
+            .order_by("id", "class_teacher__id")
+        )
+
+        with transaction.atomic():
+            self.all().delete()
+            rollup = self.create(date=rollup_date or timezone.now().date())
+
+            class_rollups: t.List[ClassRollup] = []
+            teacher_rollups: t.List[TeacherRollup] = []
+
+            def flush(force: bool = False):
+                # The teachers are inserted before the classes referencing them.
+                if force or len(teacher_rollups) >= batch_size:
+                    TeacherRollup.objects.bulk_create(teacher_rollups)
+                    teacher_rollups.clear()
+                    ClassRollup.objects.bulk_create(class_rollups)
+                    class_rollups.clear()
+
+            for teacher_id, grouped_rows in groupby(
+                rows.iterator(chunk_size=batch_size), key=lambda row: row["id"]
+            ):
+                teacher_rows = list(grouped_rows)
+                teacher_row = teacher_rows[0]
+                classes = [
+                    row
+                    for row in teacher_rows
+                    if row["class_teacher__id"] is not None
+                ]
+
+                class_rollups.extend(
+                    ClassRollup(
+                        id=row["class_teacher__id"],
+                        rollup=rollup,
+                        name=row["class_teacher__name"],
+                        teacher_id=teacher_id,
+                        teacher_is_active=row["new_user__is_active"],
+                        last_login=row["new_user__last_login"],
+                        student_count=row["student_count"],
+                    )
+                    for row in classes
+                )
+                teacher_rollups.append(
+                    TeacherRollup(
+                        id=teacher_id,
+                        rollup=rollup,
+                        school_id=teacher_row["school_id"],
+                        is_active=teacher_row["new_user__is_active"],
+                        last_login=teacher_row["new_user__last_login"],
+                        class_count=len(classes),
+                        student_count=sum(
+                            row["student_count"] for row in classes
+                        ),
+                    )
+                )
+                flush()
+
+            flush(force=True)
+
+        return rollup
+
+    def get_or_take(self, rollup_date: t.Optional[date] = None):
+        """Get the rollup taken on a date, or take it.
+
+        Args:
+            rollup_date: The date of the rollup. Defaults to today.
+
+        Returns:
+            The rollup.
+        """
+        rollup_date = rollup_date or timezone.now().date()
+        rollup = self.filter(date=rollup_date).first()
+        return rollup or self.take(rollup_date)
+
+
+class HierarchyRollup(models.Model):
+    """A rollup of the counts in the School->Teacher->Class->Student hierarchy.
+
+    Only the latest rollup is kept. It's shared by the exports of the counts so
+    the hierarchy is only walked once per day.
+    """
+
+    date = models.DateField(unique=True)
+
+    objects: HierarchyRollupManager = HierarchyRollupManager()
+
+    def __str__(self):
+        return f"Hierarchy rolled up on {self.date}"
+
+
+class TeacherRollup(models.Model):
+    """A teacher's counts in a hierarchy rollup."""
+
+    id = models.PositiveBigIntegerField(primary_key=True)  # the teacher's ID
+    rollup = models.ForeignKey(
+        HierarchyRollup, related_name="teachers", on_delete=models.CASCADE
+    )
+    school = models.ForeignKey(
+        School,
+        related_name="teacher_rollups",
+        null=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+    )
+    # The teacher's user's fields. None if the teacher has no user.
+    is_active = models.BooleanField(null=True)
+    last_login = models.DateTimeField(null=True)
+    class_count = models.PositiveIntegerField()
+    student_count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"Teacher {self.id}"
+
+
+class ClassRollup(models.Model):
+    """A class's counts in a hierarchy rollup."""
+
+    id = models.PositiveBigIntegerField(primary_key=True)  # the class's ID
+    rollup = models.ForeignKey(
+        HierarchyRollup, related_name="classes", on_delete=models.CASCADE
+    )
+    name = models.CharField(max_length=200)
+    teacher = models.ForeignKey(
+        TeacherRollup, related_name="classes", on_delete=models.CASCADE
+    )
+    # The teacher's user's fields. None if the teacher has no user.
+    teacher_is_active = models.BooleanField(null=True)
+    last_login = models.DateTimeField(null=True)
+    student_count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"Class {self.id}"
@@ -0,0 +1,58 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 23:21:48(+01:00).
+"""
+
+from codeforlife.tests import TestCase
+from codeforlife.user.models import Class, School, Teacher
+from django.db.models import Count
+
+from .hierarchy_rollup import HierarchyRollup
+
+# pylint: disable=missing-class-docstring
+
+
+class TestHierarchyRollup(TestCase):
+    fixtures = ["school_1"]
+
+    def test_take(self):
+        """The rollup's counts match counting each level of the hierarchy
+        separately."""
+        rollup = HierarchyRollup.objects.take()
+
+        assert {
+            klass.id: klass.student_count for klass in rollup.classes.all()
+        } == dict(
+            Class.objects.get_original_queryset()
+            .filter(teacher__isnull=False)
+            .annotate(student_count=Count("students"))
+            .values_list("id", "student_count")
+        )
+
+        assert {
+            teacher.id: teacher.class_count for teacher in rollup.teachers.all()
+        } == dict(
+            Teacher.objects.get_original_queryset()
+            .annotate(class_count=Count("class_teacher"))
+            .values_list("id", "class_count")
+        )
+
+        assert dict(
+            School.objects.get_original_queryset()
+            .filter(teacher_rollups__rollup=rollup)
+            .annotate(teacher_count=Count("teacher_rollups"))
+            .values_list("id", "teacher_count")
+        ) == dict(
+            School.objects.get_original_queryset()
+            .filter(teacher_school__isnull=False)
+            .annotate(teacher_count=Count("teacher_school"))
+            .values_list("id", "teacher_count")
+        )
+
+    def test_take__replaces_previous_rollup(self):
+        """Only the latest rollup is kept."""
+        HierarchyRollup.objects.take()
+        rollup = HierarchyRollup.objects.take()
+
+        assert list(HierarchyRollup.objects.all()) == [rollup]
+        assert HierarchyRollup.objects.get_or_take() == rollup
@@ -0,0 +1,133 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 22:31:40(+01:00).
+"""
+
+import typing as t
+from datetime import date
+
+from common.models import TotalActivity  # type: ignore[import-untyped]
+from django.db import models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from ...rapid_router.models import Attempt, Level
+
+
+# pylint: disable-next=missing-class-docstring
+class KpiSnapshotManager(models.Manager["KpiSnapshot"]):
+    def take(self, snapshot_date: t.Optional[date] = None):
+        """Take a snapshot of the KPIs, replacing any taken on the same date.
+
+        Each source table's metrics are computed in a single query.
+
+        Args:
+            snapshot_date: The date of the snapshot. Defaults to today.
+
+        Returns:
+            The snapshot.
+        """
+        metrics: t.Dict[str, int] = dict.fromkeys(KpiSnapshot.METRICS, 0)
+
+        metrics.update(
+            TotalActivity.objects.values(
+                "teacher_registrations",
+                "student_registrations",
+                "independent_registrations",
+                "anonymised_unverified_teachers",
+                "anonymised_unverified_independents",
+            ).first()
+            or {}
+        )
+
+        student_filter = Q(owner__student__isnull=False)
+        metrics.update(
+            Level.objects.filter(
+                episode_id__isnull=True, owner__isnull=False
+            ).aggregate(
+                teacher_levels=Count(
+                    "id", filter=Q(owner__teacher__isnull=False)
+                ),
+                school_student_levels=Count(
+                    "id",
+                    filter=(
+                        student_filter
+                        & Q(owner__student__class_field_id__isnull=False)
+                    ),
+                ),
+                independent_student_levels=Count(
+                    "id",
+                    filter=(
+                        student_filter
+                        & Q(owner__student__class_field_id__isnull=True)
+                    ),
+                ),
+                unallocated_users=Count(
+                    "id",
+                    filter=(
+                        Q(owner__student__isnull=True)
+                        & Q(owner__teacher__isnull=True)
+                    ),
+                ),
+                total_games_created=Count("id"),
+            )
+        )
+
+        metrics.update(
+            Attempt.objects.filter(level__owner__isnull=False).aggregate(
+                shared_levels_played=Count("level_id", distinct=True)
+            )
+        )
+
+        metrics.update(
+            Level.shared_with.through.objects.aggregate(
+                total_levels_shared=Count("level_id", distinct=True)
+            )
+        )
+
+        snapshot, _ = self.update_or_create(
+            date=snapshot_date or timezone.now().date(), defaults=metrics
+        )
+        return snapshot
+
+
+class KpiSnapshot(models.Model):
+    """A daily snapshot of the scalar KPIs, kept to report on their history."""
+
+    METRICS = [
+        "teacher_registrations",
+        "student_registrations",
+        "independent_registrations",
+        "anonymised_unverified_teachers",
+        "anonymised_unverified_independents",
+        "teacher_levels",
+        "school_student_levels",
+        "independent_student_levels",
+        "unallocated_users",
+        "total_games_created",
+        "shared_levels_played",
+        "total_levels_shared",
+    ]
+
+    date = models.DateField(unique=True)
+
+    # Registrations and anonymisations.
+    teacher_registrations = models.PositiveIntegerField()
+    student_registrations = models.PositiveIntegerField()
+    independent_registrations = models.PositiveIntegerField()
+    anonymised_unverified_teachers = models.PositiveIntegerField()
+    anonymised_unverified_independents = models.PositiveIntegerField()
+
+    # Custom levels.
+    teacher_levels = models.PositiveIntegerField()
+    school_student_levels = models.PositiveIntegerField()
+    independent_student_levels = models.PositiveIntegerField()
+    unallocated_users = models.PositiveIntegerField()
+    total_games_created = models.PositiveIntegerField()
+    shared_levels_played = models.PositiveIntegerField()
+    total_levels_shared = models.PositiveIntegerField()
+
+    objects: KpiSnapshotManager = KpiSnapshotManager()
+
+    def __str__(self):
+        return f"KPIs on {self.date}"
@@ -0,0 +1,36 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 21:40:12(+01:00).
+"""
+
+import typing as t
+
+from django.db import models
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from django_stubs_ext.db.models import TypedModelMeta
+else:
+    TypedModelMeta = object
+
+
+class RowHash(models.Model):
+    """The hash of a row which was last exported to a BigQuery table.
+
+    Comparing a row's hash to the hash of its last export shows whether the
+    row was inserted or changed since. Rows without a new hash were deleted.
+    """
+
+    bq_table_name = models.CharField(max_length=255)
+    row_id = models.PositiveBigIntegerField()
+    row_hash = models.BigIntegerField()
+
+    class Meta(TypedModelMeta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bq_table_name", "row_id"],
+                name="row_hash__bq_table_name__row_id",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bq_table_name}: {self.row_id}"
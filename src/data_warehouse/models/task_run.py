@@ -0,0 +1,71 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 00:41:07(+01:00).
+"""
+
+import typing as t
+from datetime import timedelta
+
+from django.db import models
+from django.db.models import Avg
+from django.utils import timezone
+
+if t.TYPE_CHECKING:  # pragma: no cover
+    from django_stubs_ext.db.models import TypedModelMeta
+else:
+    TypedModelMeta = object
+
+
+# pylint: disable-next=missing-class-docstring,too-few-public-methods
+class TaskRunManager(models.Manager["TaskRun"]):
+    def get_average_durations(self, period: timedelta = timedelta(days=28)):
+        """Get the average duration of each table's successful runs.
+
+        Args:
+            period: How far back the runs are averaged over.
+
+        Returns:
+            The average duration of each table's runs, by the table's name.
+        """
+        return dict(
+            self.filter(
+                status=TaskRun.Status.SUCCEEDED,
+                started_at__gte=timezone.now() - period,
+            )
+            .values("bq_table_name")
+            .annotate(average_duration=Avg("duration"))
+            .values_list("bq_table_name", "average_duration")
+        )
+
+
+class TaskRun(models.Model):
+    """A run of a data warehouse task by the scheduler. Used to estimate how
+    long each task takes so the longest are started first.
+    """
+
+    # pylint: disable-next=too-many-ancestors
+    class Status(models.TextChoices):
+        """How the run ended."""
+
+        SUCCEEDED = "succeeded"
+        FAILED = "failed"
+
+    bq_table_name = models.CharField(max_length=255)
+    started_at = models.DateTimeField()
+    duration = models.DurationField()
+    rows = models.PositiveBigIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=9, choices=Status.choices)
+    error = models.TextField(blank=True)
+
+    objects: TaskRunManager = TaskRunManager()
+
+    class Meta(TypedModelMeta):
+        indexes = [
+            models.Index(
+                fields=["bq_table_name", "started_at"],
+                name="task_run__bq_table_name",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.bq_table_name} {self.status} at {self.started_at}"
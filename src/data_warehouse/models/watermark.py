@@ -0,0 +1,47 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 17:33:26(+01:00).
+"""
+
+import typing as t
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+class Watermark(models.Model):
+    """The high-water mark of a BigQuery table which is exported incrementally.
+
+    Only the rows with an ID greater than the last exported ID need to be
+    appended to the table on the next export. If the table is appended by time,
+    only the rows after the last exported time and ID are. For upserted tables,
+    the last ID is the ID of the last change exported.
+    """
+
+    bq_table_name = models.CharField(max_length=255, unique=True)
+    last_id = models.PositiveBigIntegerField(default=0)
+    last_time = models.DateTimeField(null=True, blank=True)
+    last_full_refresh_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.bq_table_name}: {self.last_id}"
+
+    def is_full_refresh_due(self, interval: t.Optional[timedelta]):
+        """Check whether the whole table needs to be exported again.
+
+        Args:
+            interval: How often the whole table is exported. If None, the
+                whole table is only exported on the first export.
+
+        Returns:
+            A flag designating whether the whole table needs to be exported.
+        """
+        if self.last_full_refresh_at is None:
+            return True
+
+        return (
+            interval is not None
+            and timezone.now() - self.last_full_refresh_at >= interval
+        )
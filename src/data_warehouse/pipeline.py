@@ -0,0 +1,87 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 00:12:36(+01:00).
+
+Overlaps reading rows from the database with uploading them.
+"""
+
+import queue
+import threading
+import typing as t
+
+T = t.TypeVar("T")
+
+_DONE = object()  # Signals the consumer that no more items will be put.
+
+
+class Pipeline(t.Generic[T]):
+    """Consumes items in a background thread while the caller produces more.
+
+    The items are passed through a bounded queue, so a producer that's faster
+    than the consumer is blocked until there's room (backpressure). The first
+    error raised by the consumer is re-raised in the producer's thread, and the
+    remaining items are discarded.
+
+    The producer stays in the caller's thread because database connections
+    are per thread. For example:
+
+    with Pipeline(upload) as pipeline:
+        for chunk in read_chunks():
+            pipeline.put(chunk)
+    """
+
+    def __init__(self, consume: t.Callable[[T], t.Any], max_pending: int = 2):
+        """Create a pipeline.
+
+        Args:
+            consume: Called in the background thread with each item.
+            max_pending: The max number of items waiting to be consumed.
+        """
+        self.consume = consume
+        self._queue: "queue.Queue[t.Any]" = queue.Queue(maxsize=max_pending)
+        self._error: t.Optional[BaseException] = None
+        self._cancelled = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+
+            # After an error or cancellation, items are drained unconsumed so
+            # the producer is never blocked.
+            if self._error is None and not self._cancelled:
+                try:
+                    self.consume(item)
+                except BaseException as ex:  # pylint: disable=broad-except
+                    self._error = ex
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def put(self, item: T):
+        """Put an item to be consumed, blocking while the queue is full.
+
+        Args:
+            item: The item to consume.
+
+        Raises:
+            BaseException: The error raised by the consumer, if any.
+        """
+        self._raise_error()
+        self._queue.put(item)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # If the producer failed, don't consume what's left.
+        self._cancelled = exc_type is not None
+        self._queue.put(_DONE)
+        self._thread.join()
+
+        if exc_type is None:
+            self._raise_error()
@@ -0,0 +1,82 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 00:20:05(+01:00).
+"""
+
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from .pipeline import Pipeline
+
+# pylint: disable=missing-class-docstring
+
+
+class TestPipeline(SimpleTestCase):
+    def test_consume(self):
+        """Every item is consumed in order in another thread."""
+        consumed = []
+        thread_ids = set()
+
+        def consume(item: int):
+            consumed.append(item)
+            thread_ids.add(threading.get_ident())
+
+        with Pipeline(consume) as pipeline:
+            for item in range(10):
+                pipeline.put(item)
+
+        assert consumed == list(range(10))
+        assert thread_ids and threading.get_ident() not in thread_ids
+
+    def test_backpressure(self):
+        """The producer is blocked while the queue is full."""
+        release = threading.Event()
+        pipeline: Pipeline[int] = Pipeline(
+            lambda item: release.wait(), max_pending=1
+        )
+
+        with pipeline:
+            pipeline.put(1)  # consumed, blocking the consumer
+            time.sleep(0.05)
+            pipeline.put(2)  # pending
+
+            put_3 = threading.Thread(target=pipeline.put, args=(3,))
+            put_3.start()
+            put_3.join(timeout=0.1)
+            assert put_3.is_alive()  # blocked by backpressure
+
+            release.set()
+            put_3.join()
+
+    def test_consumer_error(self):
+        """The consumer's error is raised in the producer's thread."""
+
+        def consume(item: int):
+            if item == 2:
+                raise ValueError(item)
+
+        with self.assertRaises(ValueError):
+            with Pipeline(consume) as pipeline:
+                for item in range(100):
+                    pipeline.put(item)
+
+    def test_producer_error(self):
+        """The remaining items are discarded if the producer fails."""
+        consumed = []
+        release = threading.Event()
+
+        def consume(item: int):
+            release.wait()
+            consumed.append(item)
+
+        with self.assertRaises(ValueError):
+            with Pipeline(consume, max_pending=5) as pipeline:
+                for item in range(3):
+                    pipeline.put(item)
+                # Unblock the consumer once the producer has failed.
+                threading.Timer(0.05, release.set).start()
+                raise ValueError()
+
+        assert len(consumed) <= 1
@@ -0,0 +1,202 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 00:52:19(+01:00).
+
+Runs the data warehouse tasks a few at a time, sharing the primary database.
+"""
+
+import logging
+import time
+import typing as t
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .models import HierarchyRollup, TaskRun
+from .task import DataWarehouseTask, get_tasks
+
+
+class Scheduler:
+    """Runs the data warehouse tasks with a bounded number at once.
+
+    The tasks are started longest-first by their average duration over their
+    recent runs, so the longest tasks don't start last and hold up the whole
+    run. Tasks which haven't run recently are started first since their
+    duration is unknown.
+
+    Heavy tasks, which scan a large table, are staggered so no 2 run at once.
+    Once the run's time limit is reached, no more tasks are started.
+    """
+
+    def __init__(
+        self,
+        tasks: t.Optional[t.Iterable[DataWarehouseTask]] = None,
+        max_concurrency: t.Optional[int] = None,
+        time_limit: t.Optional[timedelta] = None,
+    ):
+        # pylint: disable=line-too-long
+        """Create a scheduler.
+
+        Args:
+            tasks: The tasks to run. If None, every data warehouse task is run.
+            max_concurrency: The max number of tasks running at once. If None, the value will be retrieved from the DATA_WAREHOUSE_MAX_CONCURRENT_TASKS setting.
+            time_limit: How long after the run starts no more tasks are started. If None, the value will be retrieved from the DATA_WAREHOUSE_RUN_TIME_LIMIT setting.
+        """
+        # pylint: enable=line-too-long
+        self.tasks = get_tasks() if tasks is None else list(tasks)
+        self.max_concurrency = (
+            settings.DATA_WAREHOUSE_MAX_CONCURRENT_TASKS
+            if max_concurrency is None
+            else max_concurrency
+        )
+        if self.max_concurrency < 1:
+            raise ValueError("The max concurrency must be >= 1.")
+        self.time_limit = (
+            timedelta(seconds=settings.DATA_WAREHOUSE_RUN_TIME_LIMIT)
+            if time_limit is None
+            else time_limit
+        )
+
+    def order(self):
+        """Order the tasks longest-first by their average duration.
+
+        Returns:
+            The tasks in the order they're started.
+        """
+        average_durations = TaskRun.objects.get_average_durations()
+
+        return sorted(
+            self.tasks,
+            key=lambda task: average_durations.get(
+                task.settings.bq_table_name, timedelta.max
+            ),
+            reverse=True,
+        )
+
+    def _get_startable_tasks(
+        self,
+        pending: t.List[DataWarehouseTask],
+        running: t.List[DataWarehouseTask],
+    ):
+        startable: t.List[DataWarehouseTask] = []
+        for task in pending:
+            active = running + startable
+            if len(active) >= self.max_concurrency:
+                break
+
+            # Skip heavy tasks while another is running, to stagger the scans.
+            if task.settings.heavy and any(
+                active_task.settings.heavy for active_task in active
+            ):
+                continue
+
+            startable.append(task)
+
+        return startable
+
+    @staticmethod
+    def _run_task(task: DataWarehouseTask):
+        """Run a task. Called in a worker thread.
+
+        The task is applied through Celery so it's retried as it would be by a
+        worker, resuming from the timestamp of its first run.
+
+        Returns:
+            The task's run, which is saved by the caller.
+        """
+        task_run = TaskRun(
+            bq_table_name=task.settings.bq_table_name,
+            started_at=timezone.now(),
+        )
+        since = task.to_timestamp(datetime.now(dt_timezone.utc))
+        start = time.perf_counter()
+        try:
+            task.apply(throw=True)
+            task_run.rows = task.count_uploaded_objects(
+                since, until=task.to_timestamp(datetime.now(dt_timezone.utc))
+            )
+            task_run.status = TaskRun.Status.SUCCEEDED
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            logging.exception(ex)
+            task_run.status = TaskRun.Status.FAILED
+            task_run.error = repr(ex)
+        finally:
+            task_run.duration = timedelta(seconds=time.perf_counter() - start)
+            connections.close_all()
+
+        return task_run
+
+    def run(self):
+        """Run every task, recording each run's duration and rows.
+
+        Returns:
+            A summary of the run.
+        """
+        started_at = timezone.now()
+        start = time.perf_counter()
+        deadline = start + self.time_limit.total_seconds()
+
+        # Take the day's shared rollup up front so the tasks which read it
+        # don't race to take it.
+        HierarchyRollup.objects.get_or_take()
+
+        pending = self.order()
+        task_runs: t.List[TaskRun] = []
+        skipped: t.List[str] = []
+
+        running: t.Dict[Future, DataWarehouseTask] = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while pending or running:
+                # Leave the running tasks to finish but start no more.
+                if pending and time.perf_counter() >= deadline:
+                    logging.warning(
+                        "Out of time. Skipping %d tasks.", len(pending)
+                    )
+                    skipped += [task.settings.bq_table_name for task in pending]
+                    pending.clear()
+
+                for task in self._get_startable_tasks(
+                    pending, list(running.values())
+                ):
+                    logging.info("Starting %s.", task.settings.bq_table_name)
+                    pending.remove(task)
+                    running[executor.submit(self._run_task, task)] = task
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del running[future]
+                    task_run = future.result()
+                    task_run.save()
+                    task_runs.append(task_run)
+
+        return {
+            "started_at": started_at.isoformat(),
+            "wall_time": time.perf_counter() - start,
+            "max_concurrency": self.max_concurrency,
+            "succeeded": sum(
+                task_run.status == TaskRun.Status.SUCCEEDED
+                for task_run in task_runs
+            ),
+            "failed": sum(
+                task_run.status == TaskRun.Status.FAILED
+                for task_run in task_runs
+            ),
+            "skipped": skipped,
+            "rows": sum(task_run.rows or 0 for task_run in task_runs),
+            # In order of completion.
+            "tasks": [
+                {
+                    "bq_table_name": task_run.bq_table_name,
+                    "status": task_run.status,
+                    "started_at": task_run.started_at.isoformat(),
+                    "duration": task_run.duration.total_seconds(),
+                    "rows": task_run.rows,
+                    "error": task_run.error,
+                }
+                for task_run in task_runs
+            ],
+        }
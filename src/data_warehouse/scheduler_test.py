@@ -0,0 +1,196 @@
+"""
+© Ocado Group
+Created on 19/10/2026 at 01:14:52(+01:00).
+"""
+
+import threading
+import time
+import typing as t
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from codeforlife.tests import TestCase
+from django.utils import timezone
+
+from .models import TaskRun
+from .scheduler import Scheduler
+from .task import DataWarehouseTask
+
+# pylint: disable=missing-class-docstring
+
+
+class FakeTask:
+    """Stands in for a data warehouse task, tracking which tasks overlap."""
+
+    # pylint: disable-next=too-many-arguments
+    def __init__(
+        self,
+        tracker: "Tracker",
+        bq_table_name: str,
+        heavy: bool = False,
+        partitions: int = 1,
+        rows: int = 10,
+        error: t.Optional[Exception] = None,
+    ):
+        self.tracker = tracker
+        self.settings = SimpleNamespace(
+            bq_table_name=bq_table_name, heavy=heavy, partitions=partitions
+        )
+        self.rows = rows
+        self.error = error
+
+    to_timestamp = staticmethod(DataWarehouseTask.to_timestamp)
+
+    def apply(self, throw: bool = False):
+        """Run the task in the current thread."""
+        assert throw
+        with self.tracker.track(self):
+            time.sleep(0.02)
+            if self.error is not None:
+                raise self.error
+
+    def count_uploaded_objects(self, since: str, until: str):
+        """Count the objects uploaded within a span of timestamps."""
+        assert since <= until
+        return self.rows
+
+
+class Tracker:
+    """Records which tasks were running at the same time."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running: t.List[FakeTask] = []
+        self.started: t.List[str] = []
+        self.overlaps: t.List[t.List[FakeTask]] = []
+        self.threads: t.Dict[str, threading.Thread] = {}
+
+    @contextmanager
+    def track(self, task: FakeTask):
+        """Track a task while it runs."""
+        with self.lock:
+            self.running.append(task)
+            bq_table_name = task.settings.bq_table_name
+            self.started.append(bq_table_name)
+            self.threads[bq_table_name] = threading.current_thread()
+            self.overlaps.append(list(self.running))
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.running.remove(task)
+
+
+class TestScheduler(TestCase):
+    def setUp(self):
+        self.tracker = Tracker()
+
+    def _task(self, bq_table_name: str, **kwargs):
+        return t.cast(
+            DataWarehouseTask, FakeTask(self.tracker, bq_table_name, **kwargs)
+        )
+
+    def test_init__max_concurrency_lt_1(self):
+        """The max concurrency must be >= 1."""
+        with self.assertRaises(ValueError):
+            Scheduler(tasks=[], max_concurrency=0)
+
+    def test_order(self):
+        """The tasks are ordered longest-first and unknown tasks first."""
+        now = timezone.now()
+        TaskRun.objects.bulk_create(
+            [
+                TaskRun(
+                    bq_table_name=bq_table_name,
+                    started_at=now - timedelta(days=days),
+                    duration=timedelta(seconds=seconds),
+                    status=status,
+                )
+                for bq_table_name, days, seconds, status in [
+                    ("short", 1, 10, TaskRun.Status.SUCCEEDED),
+                    ("long", 1, 50, TaskRun.Status.SUCCEEDED),
+                    ("long", 2, 70, TaskRun.Status.SUCCEEDED),
+                    ("long", 3, 1000, TaskRun.Status.FAILED),
+                    ("stale", 60, 1000, TaskRun.Status.SUCCEEDED),
+                ]
+            ]
+        )
+
+        scheduler = Scheduler(
+            tasks=[
+                self._task("short"),
+                self._task("stale"),
+                self._task("long"),
+                self._task("unknown"),
+            ],
+            max_concurrency=1,
+        )
+
+        assert [task.settings.bq_table_name for task in scheduler.order()] == [
+            "stale",
+            "unknown",
+            "long",
+            "short",
+        ]
+
+    def test_run(self):
+        """At most the max concurrency of tasks run at once, heavy tasks never
+        overlap, every task runs on a worker thread and every run is
+        recorded."""
+        tasks = [
+            self._task("heavy_1", heavy=True),
+            self._task("heavy_2", heavy=True),
+            self._task("partitioned", partitions=4),
+            self._task("light_1"),
+            self._task("light_2"),
+            self._task("failing", error=ValueError("Failed.")),
+        ]
+
+        summary = Scheduler(tasks=tasks, max_concurrency=2).run()
+
+        assert sorted(self.tracker.started) == sorted(
+            task.settings.bq_table_name for task in tasks
+        )
+        for overlap in self.tracker.overlaps:
+            assert len(overlap) <= 2
+            assert sum(task.settings.heavy for task in overlap) <= 1
+
+        assert all(
+            thread is not threading.main_thread()
+            for thread in self.tracker.threads.values()
+        )
+
+        assert summary["max_concurrency"] == 2
+        assert summary["succeeded"] == 5
+        assert summary["failed"] == 1
+        assert summary["skipped"] == []
+        assert summary["rows"] == 50
+        assert len(summary["tasks"]) == 6
+
+        failed_run = TaskRun.objects.get(bq_table_name="failing")
+        assert failed_run.status == TaskRun.Status.FAILED
+        assert "Failed." in failed_run.error
+        assert (
+            TaskRun.objects.filter(status=TaskRun.Status.SUCCEEDED).count() == 5
+        )
+
+    def test_run__time_limit(self):
+        """No more tasks are started once the time limit is reached, but the
+        running tasks are left to finish."""
+        tasks = [self._task("task_1"), self._task("task_2")]
+
+        # The time limit is reached as soon as the 1st task starts.
+        with patch(
+            "src.data_warehouse.scheduler.time.perf_counter",
+            side_effect=lambda: 1.0 if self.tracker.started else 0.0,
+        ):
+            summary = Scheduler(
+                tasks=tasks, max_concurrency=1, time_limit=timedelta(seconds=1)
+            ).run()
+
+        assert self.tracker.started == ["task_1"]
+        assert summary["succeeded"] == 1
+        assert summary["skipped"] == ["task_2"]
+        assert TaskRun.objects.get().bq_table_name == "task_1"
@@ -0,0 +1,61 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 20:41:09(+01:00).
+
+Records the changes of the entities exported to the data warehouse.
+"""
+
+from codeforlife.models.signals import model_receiver
+from codeforlife.user.models import Class, School, Student, UserProfile
+from codeforlife.user.signals import teacher_receiver, user_receiver
+from django.db.models import signals
+
+from .models import Change
+
+# pylint: disable=unused-argument
+
+class_receiver = model_receiver(Class)
+school_receiver = model_receiver(School)
+student_receiver = model_receiver(Student)
+user_profile_receiver = model_receiver(UserProfile)
+
+
+@user_receiver(signals.post_save)
+@user_receiver(signals.post_delete)
+def user__changed(sender, instance, **kwargs):
+    """After a user is saved or deleted."""
+    Change.objects.record(Change.Entity.USER, [instance.pk])
+
+
+@user_profile_receiver(signals.post_save)
+def user_profile__changed(sender, instance: UserProfile, **kwargs):
+    """After a user's profile is saved."""
+    Change.objects.record(Change.Entity.USER, [instance.user_id])
+
+
+@teacher_receiver(signals.post_save)
+@teacher_receiver(signals.post_delete)
+def teacher__changed(sender, instance, **kwargs):
+    """After a teacher is saved or deleted."""
+    Change.objects.record(Change.Entity.TEACHER, [instance.pk])
+
+
+@student_receiver(signals.post_save)
+@student_receiver(signals.post_delete)
+def student__changed(sender, instance: Student, **kwargs):
+    """After a student is saved or deleted."""
+    Change.objects.record(Change.Entity.STUDENT, [instance.pk])
+
+
+@class_receiver(signals.post_save)
+@class_receiver(signals.post_delete)
+def class__changed(sender, instance: Class, **kwargs):
+    """After a class is saved or deleted."""
+    Change.objects.record(Change.Entity.CLASS, [instance.pk])
+
+
+@school_receiver(signals.post_save)
+@school_receiver(signals.post_delete)
+def school__changed(sender, instance: School, **kwargs):
+    """After a school is saved or deleted."""
+    Change.objects.record(Change.Entity.SCHOOL, [instance.pk])
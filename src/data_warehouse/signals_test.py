@@ -0,0 +1,51 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 21:10:37(+01:00).
+"""
+
+from codeforlife.tests import TestCase
+from codeforlife.user.models import Class, School, Teacher, User
+
+from .models import Change
+
+# pylint: disable=missing-class-docstring
+
+
+class TestSignals(TestCase):
+    fixtures = ["school_1"]
+
+    def _assert_changed(self, entity: Change.Entity, entity_id: int):
+        assert Change.objects.filter(
+            entity=entity, entity_id=entity_id
+        ).exists()
+
+    def test_user(self):
+        """Saving and deleting a user records a change."""
+        user = User.objects.create(username="signals_user")
+        self._assert_changed(Change.Entity.USER, user.id)
+
+        Change.objects.all().delete()
+        user_id = user.id
+        user.delete()
+        self._assert_changed(Change.Entity.USER, user_id)
+
+    def test_teacher(self):
+        """Saving a teacher records a change."""
+        teacher = Teacher.objects.filter(school__isnull=False).first()
+        assert teacher
+        teacher.save()
+        self._assert_changed(Change.Entity.TEACHER, teacher.id)
+
+    def test_class(self):
+        """Saving a class records a change."""
+        klass = Class.objects.first()
+        assert klass
+        klass.save()
+        self._assert_changed(Change.Entity.CLASS, klass.id)
+
+    def test_school(self):
+        """Saving a school records a change."""
+        school = School.objects.first()
+        assert school
+        school.save()
+        self._assert_changed(Change.Entity.SCHOOL, school.id)
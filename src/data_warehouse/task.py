@@ -0,0 +1,1389 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 17:42:50(+01:00).
+
+Our extensions of codeforlife's data warehouse task.
+"""
+
+# pylint: disable=too-many-lines
+
+import gzip
+import hashlib
+import json
+import logging
+import tempfile
+import typing as t
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from itertools import batched, count, islice
+from math import ceil
+from pathlib import Path
+
+from celery import current_app
+from codeforlife.tasks import DataWarehouseTask as _DataWarehouseTask
+from django.core.exceptions import ValidationError
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min, Q
+from django.db.models.query import QuerySet
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+from google.cloud import storage as gcs  # type: ignore[import-untyped]
+
+from .local import LocalBucket, SqliteBucket
+from .models import Change, RowHash, Watermark
+from .pipeline import Pipeline
+
+
+# pylint: disable-next=abstract-method
+class DataWarehouseTask(_DataWarehouseTask):
+    """A task that saves a queryset as CSV files in the GCS bucket.
+
+    Unlike codeforlife's task, a table may be exported incrementally. Only the
+    rows added since the last export are appended to the table, and the whole
+    table is periodically overwritten to repair any drift. A table may also be
+    split into ranges of IDs which are exported concurrently, or unpivoted so
+    many rows are produced from each row in a single scan of the table.
+    Overwritten tables may instead only upsert the rows whose entities changed
+    since the last export, as recorded in the journal of changes, or diff each
+    row's hash against its last export to upload only what changed. The rows
+    may also be staged as compressed NDJSON files, each holding many chunks,
+    which are listed in a manifest so they're loaded in one batched job.
+    """
+
+    # The task's keyword argument used to force a full refresh.
+    full_refresh_key = "full_refresh"
+
+    # The task's keyword argument used to dry run the export into the SQLite
+    # database at the given path.
+    dry_run_key = "dry_run"
+
+    # Upserted and deleted rows are uploaded separately from the overwritten
+    # rows so the BigQuery table can merge them on the ID field.
+    BqTableWriteMode: t.TypeAlias = t.Literal[
+        "overwrite", "append", "upsert", "delete"
+    ]
+
+    @dataclass
+    class ChunkMetadata:
+        """All of the metadata used to track a chunk."""
+
+        bq_table_name: str  # the name of the BigQuery table
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode"
+        timestamp: str  # when the task was first run
+        obj_i_start: int  # object index span start
+        obj_i_end: int  # object index span end
+        file_extension: str = "csv"  # the format of the chunk's file
+
+        def to_blob_name(self):
+            """Convert this chunk metadata into a blob name."""
+
+            # E.g. "user__append/2025-01-01_00:00:00__1_1000.ndjson.gz"
+            return (
+                f"{self.bq_table_name}__{self.bq_table_write_mode}/"
+                f"{self.timestamp}__{self.obj_i_start}_{self.obj_i_end}"
+                f".{self.file_extension}"
+            )
+
+        @classmethod
+        def from_blob_name(cls, blob_name: str):
+            """Extract the chunk metadata from a blob name."""
+
+            # E.g. "user__append/2025-01-01_00:00:00__1_1000.ndjson.gz"
+            # "user__append", "2025-01-01_00:00:00__1_1000.ndjson.gz"
+            dir_name, file_name = blob_name.split("/")
+            # "user", "append"
+            bq_table_name, bq_table_write_mode = dir_name.rsplit(
+                "__", maxsplit=1
+            )
+            assert bq_table_write_mode in t.get_args(
+                DataWarehouseTask.BqTableWriteMode
+            )
+            # "2025-01-01_00:00:00__1_1000", "ndjson.gz"
+            file_name, file_extension = file_name.split(".", maxsplit=1)
+            # "2025-01-01_00:00:00", "1_1000"
+            timestamp, obj_i_span = file_name.split("__")
+            # "1", "1000"
+            obj_i_start, obj_i_end = obj_i_span.split("_")
+
+            return cls(
+                bq_table_name=bq_table_name,
+                bq_table_write_mode=t.cast(
+                    DataWarehouseTask.BqTableWriteMode, bq_table_write_mode
+                ),
+                timestamp=timestamp,
+                obj_i_start=int(obj_i_start),
+                obj_i_end=int(obj_i_end),
+                file_extension=file_extension,
+            )
+
+    @dataclass(frozen=True)
+    class Staging:
+        """Stages the rows as gzip-compressed NDJSON files instead of CSVs.
+
+        Each file holds many chunks and is streamed into a buffer which is
+        spooled to disk once it outgrows the max memory size, so the memory
+        used stays bounded however large the files are.
+        """
+
+        chunks_per_file: int = 100  # the number of chunks in each file
+        max_memory_size: int = 8 * 1024 * 1024  # bytes buffered in memory
+
+    @dataclass(frozen=True)
+    class Unpivot:
+        """Turns each of a row's columns into its own row.
+
+        For example, unpivoting the columns "a" and "b" of the row
+        `{"date": d, "a": 1, "b": 2}` produces the rows
+        `{"date": d, "name": "a", "value": 1}` and
+        `{"date": d, "name": "b", "value": 2}`.
+        """
+
+        name_field: str  # the field containing each column's name
+        value_field: str  # the field containing each column's value
+        columns: t.Dict[str, str]  # the name of each column to unpivot
+
+    # pylint: disable-next=too-many-instance-attributes
+    class Settings(_DataWarehouseTask.Settings):
+        """The settings for a data warehouse task."""
+
+        # pylint: disable-next=too-many-arguments,too-many-branches
+        def __init__(
+            self,
+            bq_table_write_mode: "_DataWarehouseTask.BqTableWriteMode",
+            chunk_size: int,
+            fields: t.List[str],
+            incremental: bool = False,
+            incremental_time_field: t.Optional[str] = None,
+            incremental_time_delay: timedelta = timedelta(),
+            full_refresh_interval: t.Optional[timedelta] = None,
+            partitions: int = 1,
+            unpivot: t.Optional["DataWarehouseTask.Unpivot"] = None,
+            upsert: t.Optional[t.Dict[Change.Entity, str]] = None,
+            diff: bool = False,
+            staging: t.Optional["DataWarehouseTask.Staging"] = None,
+            heavy: bool = False,
+            **kwargs,
+        ):
+            # pylint: disable=line-too-long
+            """Create the settings for a data warehouse task.
+
+            Args:
+                bq_table_write_mode: The BigQuery table's write-mode.
+                chunk_size: The number of objects/rows per CSV. Must be a multiple of 10.
+                fields: The [Django model] fields to include in the CSV.
+                incremental: Whether to only append the rows with an ID greater than the last exported ID. The ID field's values must only ever increase. Requires the append write-mode.
+                incremental_time_field: The field of when each row was added. If set, the rows are appended in order of this field then the ID field, after the last exported pair of values, so the ID field's values need not only increase. The field's values must never change once set. Requires incremental.
+                incremental_time_delay: How long after the current time a row must have been added before it's appended. Leaves time for the rows added just before the export to be committed.
+                full_refresh_interval: How often the whole table is exported again, overwriting the table. If None, the whole table is only exported on the first run or when the task is called with full_refresh=True.
+                partitions: The number of disjoint ranges of IDs to export concurrently, each in its own thread. The ID field must be an integer.
+                unpivot: Turns each of the queryset's rows into one row per unpivoted column, in a single scan of the table. The name and value fields are not fields of the queryset.
+                upsert: Only export the rows related to the entities which changed since the last export. Maps each type of entity to the lookup of its ID in the queryset. Requires the overwrite write-mode.
+                diff: Only export the rows whose hash differs from the hash of their last export, and the IDs of the rows deleted since. The ID field must be an integer. Requires the overwrite write-mode.
+                staging: Stage the rows as compressed NDJSON files, each holding many chunks, and list them in a manifest to be loaded in one job. If None, each chunk is uploaded as a CSV.
+                heavy: Whether the task scans a large table, e.g. UserSession or Attempt. The scheduler never runs 2 heavy tasks at once.
+            """
+            # pylint: enable=line-too-long
+            kwargs.setdefault("base", DataWarehouseTask)
+
+            super().__init__(bq_table_write_mode, chunk_size, fields, **kwargs)
+
+            if incremental and bq_table_write_mode != "append":
+                raise ValidationError(
+                    "An incremental table's write-mode must be append.",
+                    code="incremental_not_append",
+                )
+            if upsert is not None:
+                if bq_table_write_mode != "overwrite":
+                    raise ValidationError(
+                        "An upserted table's write-mode must be overwrite.",
+                        code="upsert_not_overwrite",
+                    )
+                if not upsert:
+                    raise ValidationError(
+                        "Must upsert the changes of at least 1 entity.",
+                        code="upsert_no_entities",
+                    )
+            if diff:
+                if bq_table_write_mode != "overwrite":
+                    raise ValidationError(
+                        "A diffed table's write-mode must be overwrite.",
+                        code="diff_not_overwrite",
+                    )
+                if upsert is not None:
+                    raise ValidationError(
+                        "A table cannot be both diffed and upserted.",
+                        code="diff_upserted",
+                    )
+                if unpivot is not None or partitions > 1:
+                    raise ValidationError(
+                        "Diffed tables cannot be unpivoted or partitioned.",
+                        code="diff_unpivoted_or_partitioned",
+                    )
+            if staging is not None and staging.chunks_per_file < 1:
+                raise ValidationError(
+                    "A staged file must hold at least 1 chunk.",
+                    code="staging_chunks_per_file_lt_1",
+                )
+            if incremental_time_field is not None and not incremental:
+                raise ValidationError(
+                    "Only incremental tables can be ordered by time.",
+                    code="incremental_time_field_not_incremental",
+                )
+            if incremental_time_delay < timedelta():
+                raise ValidationError(
+                    "The incremental time delay must be >= 0.",
+                    code="incremental_time_delay_lt_0",
+                )
+            if full_refresh_interval is not None:
+                if not incremental and upsert is None and not diff:
+                    raise ValidationError(
+                        "Only incremental, upserted or diffed tables can be"
+                        " fully refreshed.",
+                        code="full_refresh_interval_not_incremental",
+                    )
+                if full_refresh_interval <= timedelta():
+                    raise ValidationError(
+                        "The full refresh interval must be > 0.",
+                        code="full_refresh_interval_lte_0",
+                    )
+
+            if partitions < 1:
+                raise ValidationError(
+                    "The number of partitions must be >= 1.",
+                    code="partitions_lt_1",
+                )
+
+            if unpivot is not None:
+                if not unpivot.columns:
+                    raise ValidationError(
+                        "Must unpivot at least 1 column.",
+                        code="unpivot_no_columns",
+                    )
+                if (
+                    unpivot.name_field not in fields
+                    or unpivot.value_field not in fields
+                ):
+                    raise ValidationError(
+                        "The unpivot's name and value fields must be fields.",
+                        code="unpivot_fields_missing",
+                    )
+                if partitions > 1:
+                    raise ValidationError(
+                        "Unpivoted tables cannot be partitioned.",
+                        code="unpivot_partitioned",
+                    )
+
+            self._incremental = incremental
+            self._incremental_time_field = incremental_time_field
+            self._incremental_time_delay = incremental_time_delay
+            self._full_refresh_interval = full_refresh_interval
+            self._partitions = partitions
+            self._unpivot = unpivot
+            self._upsert = upsert
+            self._diff = diff
+            self._staging = staging
+            self._heavy = heavy
+
+        @property
+        def incremental(self):
+            """Whether to only append the rows added since the last export."""
+            return self._incremental
+
+        @property
+        def incremental_time_field(self):
+            """The field of when each row was added, if appended by time."""
+            return self._incremental_time_field
+
+        @property
+        def incremental_time_delay(self):
+            """How long ago a row must have been added to be appended."""
+            return self._incremental_time_delay
+
+        @property
+        def full_refresh_interval(self):
+            """How often the whole table is exported again."""
+            return self._full_refresh_interval
+
+        @property
+        def partitions(self):
+            """The number of disjoint ranges of IDs to export concurrently."""
+            return self._partitions
+
+        @property
+        def unpivot(self):
+            """How to turn each of the queryset's columns into its own row."""
+            return self._unpivot
+
+        @property
+        def upsert(self):
+            """The lookup of each changed entity's ID in the queryset."""
+            return self._upsert
+
+        @property
+        def diff(self):
+            """Whether to only export the rows which changed."""
+            return self._diff
+
+        @property
+        def staging(self):
+            """How to stage the rows as compressed files, if at all."""
+            return self._staging
+
+        @property
+        def heavy(self):
+            """Whether the task scans a large table."""
+            return self._heavy
+
+    settings: Settings
+
+    # If set, the CSVs are saved in this local bucket instead of GCS.
+    local_bucket: t.Optional[t.Union[LocalBucket, SqliteBucket]] = None
+
+    # Whether the current export is a dry run, which is rolled back.
+    dry_run: bool = False
+
+    # The max number of files waiting to be uploaded while the next is read
+    # from the database. If 0, each file is uploaded before the next is read.
+    pipeline_depth: int = 2
+
+    @dataclass(frozen=True)
+    class Partition:
+        """A disjoint range of IDs which is exported in its own thread."""
+
+        id_start: int  # the first ID in the range
+        id_end: int  # the last ID in the range
+        obj_i_start: int  # the index of the partition's first object
+        obj_i_end: int  # the index of the partition's last object
+
+    def _get_gcs_bucket(self):
+        if self.local_bucket is not None:
+            return t.cast(gcs.Bucket, self.local_bucket)
+
+        return super()._get_gcs_bucket()
+
+    def _list_uploaded_chunks(
+        self,
+        bucket: gcs.Bucket,
+        timestamp: str,
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode",
+    ):
+        """List the chunks uploaded for the current timestamp.
+
+        Overwritten tables also delete the blobs from previous timestamps.
+
+        Args:
+            bucket: The GCS bucket.
+            timestamp: When the task first ran.
+            bq_table_write_mode: The write-mode of the BigQuery table.
+
+        Returns:
+            The metadata of the chunks uploaded for the current timestamp.
+        """
+        # Appended, upserted and deleted rows only need the blobs from the
+        # current timestamp.
+        only_list_blobs_from_current_timestamp = bq_table_write_mode in (
+            "append",
+            "upsert",
+            "delete",
+        )
+
+        chunks: t.List[DataWarehouseTask.ChunkMetadata] = []
+        blob_dir_name = f"{self.settings.bq_table_name}__{bq_table_write_mode}/"
+        for blob in t.cast(
+            t.Iterator[gcs.Blob],
+            bucket.list_blobs(
+                prefix=blob_dir_name
+                + (timestamp if only_list_blobs_from_current_timestamp else "")
+            ),
+        ):
+            blob_name = t.cast(str, blob.name)
+            if only_list_blobs_from_current_timestamp or blob_name.startswith(
+                blob_dir_name + timestamp
+            ):
+                chunks.append(self.ChunkMetadata.from_blob_name(blob_name))
+            else:
+                logging.info('Deleting blob "%s".', blob_name)
+                blob.delete()
+
+        return chunks
+
+    def project(self, queryset: QuerySet[t.Any]):
+        """Project a queryset to only the columns which are saved.
+
+        Model instances are never built for the saved rows. Only the fields'
+        columns are selected and each row is a plain tuple. Related objects
+        are not selected or prefetched as they would never be read.
+
+        Args:
+            queryset: The queryset to project.
+
+        Returns:
+            The projected queryset, whose rows are tuples of the fields'
+            values or, if unpivoted, of the source columns' values.
+        """
+        fields = self.settings.fields
+        unpivot = self.settings.unpivot
+        if unpivot is not None:
+            fields = [
+                field
+                for field in fields
+                if field not in (unpivot.name_field, unpivot.value_field)
+            ] + list(unpivot.columns.values())
+
+        if queryset.query.select_related:
+            queryset = queryset.select_related(None)
+        if not queryset.query.combinator:
+            queryset = queryset.prefetch_related(None)
+
+        return queryset.values_list(*fields)
+
+    def iter_rows(self, queryset: QuerySet[t.Any]):
+        """Iterate over the rows to save, one tuple of values per object.
+
+        The rows are streamed over a server-side cursor (where the database
+        supports it) in chunks, without caching, to avoid OOM errors. The order
+        of the values in each tuple is determined by the order of the fields.
+
+        Args:
+            queryset: The queryset to save.
+
+        Returns:
+            An iterator of the rows' values.
+        """
+        rows = t.cast(
+            t.Iterator[t.Tuple[t.Any, ...]],
+            self.project(queryset).iterator(
+                chunk_size=self.settings.chunk_size
+            ),
+        )
+
+        unpivot = self.settings.unpivot
+        if unpivot is None:
+            return rows
+
+        def unpivot_rows():
+            fields = [
+                field
+                for field in self.settings.fields
+                if field not in (unpivot.name_field, unpivot.value_field)
+            ]
+
+            for values in rows:
+                row = dict(zip(fields, values))
+                for name, value in zip(unpivot.columns, values[len(fields) :]):
+                    row[unpivot.name_field] = name
+                    row[unpivot.value_field] = value
+                    yield tuple(row[field] for field in self.settings.fields)
+
+        return unpivot_rows()
+
+    @contextmanager
+    def _uploader(self, upload: t.Callable[[t.Any], t.Any]):
+        """Upload files in the background while the next is read from the
+        database, unless the pipeline's depth is 0.
+
+        Args:
+            upload: Uploads a file.
+
+        Yields:
+            A function which queues a file to be uploaded.
+        """
+        if self.pipeline_depth < 1:
+            yield upload
+            return
+
+        with Pipeline(upload, max_pending=self.pipeline_depth) as pipeline:
+            yield pipeline.put
+
+    # pylint: disable-next=too-many-arguments
+    def _upload_csvs(
+        self,
+        bucket: gcs.Bucket,
+        timestamp: str,
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode",
+        rows: t.Iterator[t.Tuple[t.Any, ...]],
+        obj_i_start: int,
+    ):
+        """Upload ordered rows as CSVs, one CSV per chunk of objects.
+
+        If the rows are staged, they're uploaded as compressed NDJSON files
+        instead, each holding many chunks.
+
+        Args:
+            bucket: The GCS bucket.
+            timestamp: When the task first ran.
+            bq_table_write_mode: The write-mode of the BigQuery table.
+            rows: The ordered rows to upload.
+            obj_i_start: The index of the first row.
+        """
+        if self.settings.staging is not None:
+            self._upload_staged_files(
+                bucket, timestamp, bq_table_write_mode, rows, obj_i_start
+            )
+            return
+
+        def upload_csv(blob: t.Tuple[str, str]):
+            blob_name, csv = blob
+            logging.info("Uploading %s to bucket.", blob_name)
+            bucket.blob(blob_name).upload_from_string(
+                csv, content_type="text/csv"
+            )
+
+        with self._uploader(upload_csv) as upload:
+            for obj_i, chunk in zip(
+                count(obj_i_start, self.settings.chunk_size),
+                batched(rows, self.settings.chunk_size),
+            ):
+                csv_content, csv_writer = self.init_csv_writer()
+                for values in chunk:
+                    self.write_csv_row(csv_writer, values)
+
+                blob_name = self.ChunkMetadata(
+                    bq_table_name=self.settings.bq_table_name,
+                    bq_table_write_mode=bq_table_write_mode,
+                    timestamp=timestamp,
+                    obj_i_start=obj_i,
+                    obj_i_end=obj_i + len(chunk) - 1,
+                ).to_blob_name()
+
+                upload((blob_name, csv_content.getvalue().strip()))
+
+    @staticmethod
+    def to_json_value(value: t.Any):
+        """Convert a value to its JSON representation in a format BigQuery
+        accepts.
+
+        Args:
+            value: The value to convert.
+
+        Returns:
+            The value's JSON representation.
+        """
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, datetime):
+            return (
+                value.astimezone(dt_timezone.utc)
+                .replace(tzinfo=None)
+                .isoformat(sep=" ")
+            )
+        if isinstance(value, (date, time)):
+            return value.isoformat()
+
+        return str(value)
+
+    # pylint: disable-next=too-many-arguments,too-many-locals
+    def _upload_staged_files(
+        self,
+        bucket: gcs.Bucket,
+        timestamp: str,
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode",
+        rows: t.Iterator[t.Tuple[t.Any, ...]],
+        obj_i_start: int,
+    ):
+        """Stream ordered rows into compressed NDJSON files and upload them.
+
+        Args:
+            bucket: The GCS bucket.
+            timestamp: When the task first ran.
+            bq_table_write_mode: The write-mode of the BigQuery table.
+            rows: The ordered rows to upload.
+            obj_i_start: The index of the first row.
+        """
+        staging = t.cast(DataWarehouseTask.Staging, self.settings.staging)
+        file_size = self.settings.chunk_size * staging.chunks_per_file
+
+        def upload_file(blob: t.Tuple[str, t.IO[bytes]]):
+            blob_name, file = blob
+            with file:
+                logging.info("Uploading %s to bucket.", blob_name)
+                file.seek(0)
+                bucket.blob(blob_name).upload_from_file(
+                    file, content_type="application/gzip"
+                )
+
+        rows = iter(rows)
+        obj_i = obj_i_start
+        with self._uploader(upload_file) as upload:
+            while True:
+                # Closed once uploaded, which may be in the background.
+                # pylint: disable-next=consider-using-with
+                file = tempfile.SpooledTemporaryFile(
+                    max_size=staging.max_memory_size
+                )
+                row_count = 0
+                with gzip.GzipFile(fileobj=file, mode="wb") as gzip_file:
+                    for values in islice(rows, file_size):
+                        gzip_file.write(
+                            json.dumps(
+                                {
+                                    field: self.to_json_value(value)
+                                    for field, value in zip(
+                                        self.settings.fields, values
+                                    )
+                                }
+                            ).encode()
+                            + b"\n"
+                        )
+                        row_count += 1
+
+                if row_count == 0:
+                    file.close()
+                    return
+
+                blob_name = self.ChunkMetadata(
+                    bq_table_name=self.settings.bq_table_name,
+                    bq_table_write_mode=bq_table_write_mode,
+                    timestamp=timestamp,
+                    obj_i_start=obj_i,
+                    obj_i_end=obj_i + row_count - 1,
+                    file_extension="ndjson.gz",
+                ).to_blob_name()
+
+                upload((blob_name, file))
+                obj_i += row_count
+
+    def _upload_manifests(self, bucket: gcs.Bucket, timestamp: str):
+        """Upload a manifest of the files staged for the current timestamp, one
+        per write-mode, so each is loaded into BigQuery in one batched job.
+
+        Args:
+            bucket: The GCS bucket.
+            timestamp: When the task first ran.
+        """
+        for bq_table_write_mode in t.get_args(self.BqTableWriteMode):
+            blob_dir_name = (
+                f"{self.settings.bq_table_name}__{bq_table_write_mode}"
+            )
+            blob_names = [
+                t.cast(str, blob.name)
+                for blob in bucket.list_blobs(
+                    prefix=f"{blob_dir_name}/{timestamp}__"
+                )
+            ]
+            if not blob_names:
+                continue
+
+            blob_name = f"{blob_dir_name}__manifest/{timestamp}.json"
+            logging.info("Uploading %s to bucket.", blob_name)
+            bucket.blob(blob_name).upload_from_string(
+                json.dumps(
+                    {
+                        "bq_table_name": self.settings.bq_table_name,
+                        "bq_table_write_mode": bq_table_write_mode,
+                        "id_field": self.settings.id_field,
+                        "source_format": "NEWLINE_DELIMITED_JSON",
+                        "compression": "GZIP",
+                        "blob_names": blob_names,
+                    }
+                ),
+                content_type="application/json",
+            )
+
+    def count_uploaded_objects(self, since: str, until: str):
+        """Count the objects uploaded in every write-mode by the exports which
+        first ran within a span of timestamps.
+
+        Args:
+            since: The earliest timestamp, inclusive.
+            until: The latest timestamp, inclusive.
+
+        Returns:
+            The number of objects uploaded.
+        """
+        bucket = self._get_gcs_bucket()
+
+        obj_count = 0
+        for bq_table_write_mode in t.get_args(self.BqTableWriteMode):
+            for blob in bucket.list_blobs(
+                prefix=f"{self.settings.bq_table_name}__{bq_table_write_mode}/"
+            ):
+                chunk = self.ChunkMetadata.from_blob_name(blob.name)
+                if since <= chunk.timestamp <= until:
+                    obj_count += chunk.obj_i_end - chunk.obj_i_start + 1
+
+        return obj_count
+
+    def _upload_queryset(
+        self,
+        timestamp: str,
+        queryset: QuerySet[t.Any],
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode",
+    ):
+        """Save a queryset as CSV files in the GCS bucket.
+
+        If the task is retried, the upload resumes after the last CSV which was
+        uploaded for the current timestamp.
+
+        Args:
+            timestamp: When the task first ran.
+            queryset: The queryset to save.
+            bq_table_write_mode: The write-mode of the BigQuery table the CSVs
+                will be imported into.
+        """
+        # Other threads can't share a dry run's transaction.
+        if self.settings.partitions > 1 and not self.dry_run:
+            self._upload_partitioned_queryset(
+                timestamp, queryset, bq_table_write_mode
+            )
+            return
+
+        # Count the objects in the queryset and ensure there's at least 1.
+        row_count = queryset.count()
+        if row_count == 0:
+            return
+
+        # If the queryset is not ordered, order it by ID by default.
+        if not queryset.ordered:
+            queryset = queryset.order_by(self.settings.id_field)
+
+        # Limit the queryset to the object count.
+        queryset = queryset[:row_count]
+
+        # Each of the queryset's rows may be unpivoted into many objects.
+        unpivot = self.settings.unpivot
+        objs_per_row = 1 if unpivot is None else len(unpivot.columns)
+        obj_count = row_count * objs_per_row
+
+        bucket = self._get_gcs_bucket()
+
+        # Resume after the last uploaded object, if any.
+        obj_i_start = 1 + max(
+            (
+                chunk.obj_i_end
+                for chunk in self._list_uploaded_chunks(
+                    bucket, timestamp, bq_table_write_mode
+                )
+            ),
+            default=0,
+        )
+        if obj_i_start > obj_count:
+            return
+
+        # Offset the queryset by whole rows and skip the rest of the objects.
+        row_offset, obj_offset = divmod(obj_i_start - 1, objs_per_row)
+        if obj_i_start != 1:
+            logging.info("Offsetting queryset by %d objects.", obj_i_start - 1)
+            queryset = queryset[row_offset:]
+
+        self._upload_csvs(
+            bucket,
+            timestamp,
+            bq_table_write_mode,
+            islice(self.iter_rows(queryset), obj_offset, None),
+            obj_i_start,
+        )
+
+    def _get_partitions(self, queryset: QuerySet[t.Any]):
+        """Split a queryset into disjoint, equally wide ranges of IDs.
+
+        Args:
+            queryset: The queryset to split.
+
+        Returns:
+            The non-empty partitions, whose objects are indexed consecutively.
+        """
+        id_field = self.settings.id_field
+
+        ids = queryset.aggregate(id_min=Min(id_field), id_max=Max(id_field))
+        if ids["id_min"] is None:
+            return []
+
+        id_step = ceil(
+            (ids["id_max"] - ids["id_min"] + 1) / self.settings.partitions
+        )
+        id_ranges = [
+            (id_start, min(id_start + id_step - 1, ids["id_max"]))
+            for id_start in range(ids["id_min"], ids["id_max"] + 1, id_step)
+        ]
+
+        # Count the objects in every range in a single query.
+        obj_counts = queryset.aggregate(
+            **{
+                f"partition_{i}": Count(
+                    id_field, filter=Q(**{f"{id_field}__range": id_range})
+                )
+                for i, id_range in enumerate(id_ranges)
+            }
+        )
+
+        partitions: t.List[DataWarehouseTask.Partition] = []
+        obj_i_end = 0
+        for i, (id_start, id_end) in enumerate(id_ranges):
+            obj_count = obj_counts[f"partition_{i}"]
+            if obj_count:
+                partitions.append(
+                    self.Partition(
+                        id_start=id_start,
+                        id_end=id_end,
+                        obj_i_start=obj_i_end + 1,
+                        obj_i_end=obj_i_end + obj_count,
+                    )
+                )
+                obj_i_end += obj_count
+
+        return partitions
+
+    def _upload_partition(
+        self,
+        timestamp: str,
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode",
+        queryset: QuerySet[t.Any],
+        obj_i_start: int,
+    ):
+        """Upload a partition of a queryset. Called in a worker thread."""
+        try:
+            self._upload_csvs(
+                self._get_gcs_bucket(),
+                timestamp,
+                bq_table_write_mode,
+                self.iter_rows(queryset),
+                obj_i_start,
+            )
+        finally:
+            # Each thread opens its own database connections.
+            connections.close_all()
+
+    def _upload_partitioned_queryset(
+        self,
+        timestamp: str,
+        queryset: QuerySet[t.Any],
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode",
+    ):
+        """Save a queryset as CSV files in the GCS bucket, exporting disjoint
+        ranges of IDs concurrently in a pool of threads.
+
+        Every partition's objects are indexed consecutively after the previous
+        partition's, so the CSVs are named as if they were uploaded by a single
+        thread and are imported into the BigQuery table as one upload.
+
+        Args:
+            timestamp: When the task first ran.
+            queryset: The queryset to save.
+            bq_table_write_mode: The write-mode of the BigQuery table the CSVs
+                will be imported into.
+        """
+        partitions = self._get_partitions(queryset)
+        if not partitions:
+            return
+
+        bucket = self._get_gcs_bucket()
+        uploaded_obj_i_ends = [
+            chunk.obj_i_end
+            for chunk in self._list_uploaded_chunks(
+                bucket, timestamp, bq_table_write_mode
+            )
+        ]
+
+        queryset = queryset.order_by(self.settings.id_field)
+
+        with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+            futures: t.List[Future] = []
+            for partition in partitions:
+                # Resume after the partition's last uploaded object, if any.
+                obj_i_start = 1 + max(
+                    (
+                        obj_i_end
+                        for obj_i_end in uploaded_obj_i_ends
+                        if partition.obj_i_start
+                        <= obj_i_end
+                        <= partition.obj_i_end
+                    ),
+                    default=partition.obj_i_start - 1,
+                )
+                if obj_i_start > partition.obj_i_end:
+                    continue
+
+                # Offset the partition by its uploaded objects and limit it to
+                # its object count.
+                offset = obj_i_start - partition.obj_i_start
+                limit = partition.obj_i_end - partition.obj_i_start + 1
+                futures.append(
+                    executor.submit(
+                        self._upload_partition,
+                        timestamp,
+                        bq_table_write_mode,
+                        queryset.filter(
+                            **{
+                                f"{self.settings.id_field}__range": (
+                                    partition.id_start,
+                                    partition.id_end,
+                                )
+                            }
+                        )[offset:limit],
+                        obj_i_start,
+                    )
+                )
+
+            for future in futures:
+                future.result()  # Raise the first error, if any.
+
+    def _upload_incremental_queryset(
+        self, timestamp: str, queryset: QuerySet[t.Any], full_refresh: bool
+    ):
+        watermark, _ = Watermark.objects.get_or_create(
+            bq_table_name=self.settings.bq_table_name
+        )
+        full_refresh = full_refresh or watermark.is_full_refresh_due(
+            self.settings.full_refresh_interval
+        )
+
+        if self.settings.incremental_time_field is not None:
+            self._upload_keyset_queryset(
+                timestamp, queryset, full_refresh, watermark
+            )
+            return
+
+        # Fix the upper bound of this export so rows added while uploading are
+        # left for the next export.
+        id_field = self.settings.id_field
+        max_id = queryset.aggregate(max_id=Max(id_field))["max_id"]
+        if max_id is None:
+            return
+
+        queryset = queryset.filter(**{f"{id_field}__lte": max_id})
+        if full_refresh:
+            logging.info("Fully refreshing up to id: %d.", max_id)
+        else:
+            queryset = queryset.filter(**{f"{id_field}__gt": watermark.last_id})
+            logging.info(
+                "Appending after id: %d up to id: %d.",
+                watermark.last_id,
+                max_id,
+            )
+
+        self._upload_queryset(
+            timestamp,
+            queryset,
+            bq_table_write_mode="overwrite" if full_refresh else "append",
+        )
+
+        # Only advance the watermark once every row has been uploaded.
+        watermark.last_id = max_id
+        update_fields = ["last_id", "updated_at"]
+        if full_refresh:
+            watermark.last_full_refresh_at = timezone.now()
+            update_fields.append("last_full_refresh_at")
+        watermark.save(update_fields=update_fields)
+
+    def _upload_keyset_queryset(
+        self,
+        timestamp: str,
+        queryset: QuerySet[t.Any],
+        full_refresh: bool,
+        watermark: Watermark,
+    ):
+        time_field = t.cast(str, self.settings.incremental_time_field)
+        id_field = self.settings.id_field
+
+        # Fix the upper bound of this export to the last row which settled
+        # before the delay, so rows committed late are left for the next export.
+        last_row = (
+            queryset.filter(
+                **{
+                    f"{time_field}__lte": timezone.now()
+                    - self.settings.incremental_time_delay
+                }
+            )
+            .order_by(f"-{time_field}", f"-{id_field}")
+            .values_list(time_field, id_field)
+            .first()
+        )
+        if last_row is None:
+            return
+
+        max_time, max_id = last_row
+        if not full_refresh and (watermark.last_time, watermark.last_id) == (
+            max_time,
+            max_id,
+        ):
+            logging.info("No rows after: (%s, %d).", max_time, max_id)
+            return
+
+        queryset = queryset.filter(
+            Q(**{f"{time_field}__lt": max_time})
+            | Q(**{time_field: max_time, f"{id_field}__lte": max_id})
+        )
+        if full_refresh or watermark.last_time is None:
+            full_refresh = True
+            logging.info("Fully refreshing up to: (%s, %d).", max_time, max_id)
+        else:
+            queryset = queryset.filter(
+                Q(**{f"{time_field}__gt": watermark.last_time})
+                | Q(
+                    **{
+                        time_field: watermark.last_time,
+                        f"{id_field}__gt": watermark.last_id,
+                    }
+                )
+            )
+            logging.info(
+                "Appending after: (%s, %d) up to: (%s, %d).",
+                watermark.last_time,
+                watermark.last_id,
+                max_time,
+                max_id,
+            )
+
+        # Order by the keyset so a retried export resumes at the same row.
+        self._upload_queryset(
+            timestamp,
+            queryset.order_by(time_field, id_field),
+            bq_table_write_mode="overwrite" if full_refresh else "append",
+        )
+
+        # Only advance the watermark once every row has been uploaded.
+        watermark.last_time = max_time
+        watermark.last_id = max_id
+        update_fields = ["last_time", "last_id", "updated_at"]
+        if full_refresh:
+            watermark.last_full_refresh_at = timezone.now()
+            update_fields.append("last_full_refresh_at")
+        watermark.save(update_fields=update_fields)
+
+    # pylint: disable-next=too-many-locals
+    def _upload_upserted_queryset(
+        self, timestamp: str, queryset: QuerySet[t.Any], full_refresh: bool
+    ):
+        upsert = t.cast(t.Dict[Change.Entity, str], self.settings.upsert)
+
+        watermark, _ = Watermark.objects.get_or_create(
+            bq_table_name=self.settings.bq_table_name
+        )
+        full_refresh = full_refresh or watermark.is_full_refresh_due(
+            self.settings.full_refresh_interval
+        )
+
+        # Fix the upper bound of this export so changes recorded while
+        # uploading are left for the next export.
+        changes = Change.objects.filter(
+            entity__in=upsert, id__gt=watermark.last_id
+        )
+        max_change_id = changes.aggregate(max_id=Max("id"))["max_id"]
+
+        if full_refresh:
+            logging.info("Fully refreshing up to change: %s.", max_change_id)
+            self._upload_queryset(timestamp, queryset, "overwrite")
+        elif max_change_id is None:
+            logging.info("No changes after change: %d.", watermark.last_id)
+            return
+        else:
+            logging.info(
+                "Upserting changes after change: %d up to change: %d.",
+                watermark.last_id,
+                max_change_id,
+            )
+
+            changes = changes.filter(id__lte=max_change_id)
+            changed = Q()
+            for entity, lookup in upsert.items():
+                changed |= Q(
+                    **{
+                        f"{lookup}__in": changes.filter(entity=entity).values(
+                            "entity_id"
+                        )
+                    }
+                )
+
+            # Select the changed IDs in a subquery so the queryset's own joins
+            # and aggregations are unaffected.
+            id_field = self.settings.id_field
+            changed_ids = (
+                # pylint: disable-next=protected-access
+                queryset.model._base_manager.filter(changed)
+                .values(id_field)
+                .distinct()
+            )
+            self._upload_queryset(
+                timestamp,
+                queryset.filter(**{f"{id_field}__in": changed_ids}),
+                "upsert",
+            )
+
+            # Delete the changed rows which are no longer in the queryset, e.g.
+            # as the user was anonymized, deactivated or deleted.
+            removed_row_ids = set(changed_ids.values_list(id_field, flat=True))
+            for entity, lookup in upsert.items():
+                if lookup == id_field:  # Includes the IDs of deleted rows.
+                    removed_row_ids.update(
+                        changes.filter(entity=entity).values_list(
+                            "entity_id", flat=True
+                        )
+                    )
+            for row_ids in batched(
+                sorted(removed_row_ids), self.settings.chunk_size
+            ):
+                removed_row_ids.difference_update(
+                    queryset.filter(**{f"{id_field}__in": row_ids}).values_list(
+                        id_field, flat=True
+                    )
+                )
+
+            self._upload_rows(
+                self._get_gcs_bucket(),
+                timestamp,
+                "delete",
+                self._iter_deleted_rows(sorted(removed_row_ids)),
+            )
+
+        # Only advance the watermark once every row has been uploaded.
+        update_fields = ["updated_at"]
+        if max_change_id is not None:
+            watermark.last_id = max_change_id
+            update_fields.append("last_id")
+        if full_refresh:
+            watermark.last_full_refresh_at = timezone.now()
+            update_fields.append("last_full_refresh_at")
+        watermark.save(update_fields=update_fields)
+
+    @staticmethod
+    def hash_row(values: t.Tuple[t.Any, ...]):
+        """Hash a row's values into a signed 64-bit integer.
+
+        Args:
+            values: The row's values.
+
+        Returns:
+            The row's hash.
+        """
+        return int.from_bytes(
+            hashlib.blake2b(repr(values).encode(), digest_size=8).digest(),
+            signed=True,
+        )
+
+    def _iter_deleted_rows(self, row_ids: t.Iterable[int]):
+        """Iterate over the rows which delete rows by their IDs, leaving the
+        other values empty.
+
+        Args:
+            row_ids: The IDs of the rows to delete.
+
+        Returns:
+            An iterator of the rows' values.
+        """
+        id_index = self.settings.fields.index(self.settings.id_field)
+
+        return (
+            tuple(
+                row_id if i == id_index else None
+                for i in range(len(self.settings.fields))
+            )
+            for row_id in row_ids
+        )
+
+    def _upload_rows(
+        self,
+        bucket: gcs.Bucket,
+        timestamp: str,
+        bq_table_write_mode: "DataWarehouseTask.BqTableWriteMode",
+        rows: t.Iterator[t.Tuple[t.Any, ...]],
+    ):
+        """Upload ordered rows, resuming after the last uploaded chunk.
+
+        Unlike uploading a queryset, the rows which were already uploaded are
+        still iterated over but are not uploaded again.
+
+        Args:
+            bucket: The GCS bucket.
+            timestamp: When the task first ran.
+            bq_table_write_mode: The write-mode of the BigQuery table.
+            rows: The ordered rows to upload.
+        """
+        obj_i_start = 1 + max(
+            (
+                chunk.obj_i_end
+                for chunk in self._list_uploaded_chunks(
+                    bucket, timestamp, bq_table_write_mode
+                )
+            ),
+            default=0,
+        )
+
+        self._upload_csvs(
+            bucket,
+            timestamp,
+            bq_table_write_mode,
+            islice(rows, obj_i_start - 1, None),
+            obj_i_start,
+        )
+
+    # pylint: disable-next=too-many-locals
+    def _upload_diffed_queryset(
+        self, timestamp: str, queryset: QuerySet[t.Any], full_refresh: bool
+    ):
+        bq_table_name = self.settings.bq_table_name
+        id_field = self.settings.id_field
+        id_index = self.settings.fields.index(id_field)
+
+        watermark, _ = Watermark.objects.get_or_create(
+            bq_table_name=bq_table_name
+        )
+        full_refresh = full_refresh or watermark.is_full_refresh_due(
+            self.settings.full_refresh_interval
+        )
+
+        # The rows' hashes from the last export. Any left over once every row
+        # has been diffed were deleted.
+        row_hashes: t.Dict[int, int] = (
+            {}
+            if full_refresh
+            else dict(
+                RowHash.objects.filter(bq_table_name=bq_table_name)
+                .values_list("row_id", "row_hash")
+                .iterator(chunk_size=self.settings.chunk_size)
+            )
+        )
+        new_row_hashes: t.Dict[int, int] = {}
+        inserted_row_count = 0
+
+        def diff_rows():
+            nonlocal inserted_row_count
+
+            # Order by ID so a retried export diffs the rows in the same order.
+            for values in self.iter_rows(queryset.order_by(id_field)):
+                row_id, row_hash = values[id_index], self.hash_row(values)
+                last_row_hash = row_hashes.pop(row_id, None)
+                if last_row_hash != row_hash:
+                    inserted_row_count += last_row_hash is None
+                    new_row_hashes[row_id] = row_hash
+                    yield values
+
+        bucket = self._get_gcs_bucket()
+        self._upload_rows(
+            bucket,
+            timestamp,
+            "overwrite" if full_refresh else "upsert",
+            diff_rows(),
+        )
+
+        # Upload the IDs of the deleted rows.
+        deleted_row_ids = sorted(row_hashes)
+        self._upload_rows(
+            bucket,
+            timestamp,
+            "delete",
+            self._iter_deleted_rows(deleted_row_ids),
+        )
+
+        logging.info(
+            "Inserted %d rows, changed %d rows and deleted %d rows.",
+            inserted_row_count,
+            len(new_row_hashes) - inserted_row_count,
+            len(deleted_row_ids),
+        )
+
+        # Only save the rows' hashes once every row has been uploaded.
+        with transaction.atomic():
+            if full_refresh:
+                RowHash.objects.filter(bq_table_name=bq_table_name).delete()
+            else:
+                for row_ids in batched(
+                    deleted_row_ids, self.settings.chunk_size
+                ):
+                    RowHash.objects.filter(
+                        bq_table_name=bq_table_name, row_id__in=row_ids
+                    ).delete()
+
+            RowHash.objects.bulk_create(
+                [
+                    RowHash(
+                        bq_table_name=bq_table_name,
+                        row_id=row_id,
+                        row_hash=row_hash,
+                    )
+                    for row_id, row_hash in new_row_hashes.items()
+                ],
+                batch_size=self.settings.chunk_size,
+                update_conflicts=True,
+                unique_fields=["bq_table_name", "row_id"],
+                update_fields=["row_hash"],
+            )
+
+            if full_refresh:
+                watermark.last_full_refresh_at = timezone.now()
+                watermark.save(
+                    update_fields=["last_full_refresh_at", "updated_at"]
+                )
+
+    def _save_dry_run(
+        self,
+        path: t.Union[str, Path],
+        timestamp: str,
+        *task_args,
+        **task_kwargs,
+    ):
+        """Export into a SQLite bucket instead of GCS, then roll back every
+        change made to the database, e.g. to the watermarks, so the next export
+        is unaffected.
+
+        Args:
+            path: The path of the SQLite database.
+            timestamp: When the task first ran.
+        """
+        local_bucket, self.local_bucket = self.local_bucket, SqliteBucket(path)
+        self.dry_run = True
+        try:
+            with transaction.atomic():
+                self._save_query_set_as_csvs_in_gcs_bucket(
+                    self, timestamp, *task_args, **task_kwargs
+                )
+                transaction.set_rollback(True)
+        finally:
+            self.local_bucket = local_bucket
+            self.dry_run = False
+
+    @staticmethod
+    # pylint: disable-next=bad-staticmethod-argument
+    def _save_query_set_as_csvs_in_gcs_bucket(
+        self: _DataWarehouseTask, timestamp: str, *task_args, **task_kwargs
+    ):
+        # The settings always set this task as the base.
+        assert isinstance(self, DataWarehouseTask)
+
+        dry_run_path = task_kwargs.pop(self.dry_run_key, None)
+        if dry_run_path is not None:
+            self._save_dry_run(
+                dry_run_path, timestamp, *task_args, **task_kwargs
+            )
+            return
+
+        full_refresh = bool(task_kwargs.pop(self.full_refresh_key, False))
+
+        # Project up front so counting, slicing and diffing the queryset also
+        # only select the saved columns.
+        queryset = self.project(self.get_queryset(*task_args, **task_kwargs))
+
+        if self.settings.incremental:
+            self._upload_incremental_queryset(timestamp, queryset, full_refresh)
+        elif self.settings.upsert is not None:
+            self._upload_upserted_queryset(timestamp, queryset, full_refresh)
+        elif self.settings.diff:
+            self._upload_diffed_queryset(timestamp, queryset, full_refresh)
+        else:
+            self._upload_queryset(
+                timestamp, queryset, self.settings.bq_table_write_mode
+            )
+
+        if self.settings.staging is not None:
+            self._upload_manifests(self._get_gcs_bucket(), timestamp)
+
+
+def get_tasks():
+    """Get every data warehouse task in the installed apps.
+
+    Returns:
+        The data warehouse tasks, sorted by their BigQuery table's name.
+    """
+    autodiscover_modules("tasks")
+
+    return sorted(
+        (
+            task
+            for task in current_app.tasks.values()
+            if isinstance(task, DataWarehouseTask)
+        ),
+        key=lambda task: task.settings.bq_table_name,
+    )
@@ -0,0 +1,738 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 18:04:37(+01:00).
+"""
+
+import gzip
+import json
+import sqlite3
+import tempfile
+import threading
+import typing as t
+from concurrent.futures import Executor, Future
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from celery.exceptions import Retry
+from codeforlife.tests import CeleryTestCase
+from codeforlife.user.models import User
+from django.utils import timezone
+
+from .local import LocalBucket
+from .models import Change, RowHash, Watermark
+from .task import DataWarehouseTask as DWT
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=too-many-public-methods
+
+
+@DWT.shared(
+    DWT.Settings(
+        bq_table_name="user__incremental",
+        bq_table_write_mode="append",
+        chunk_size=10,
+        fields=["first_name"],
+        incremental=True,
+        full_refresh_interval=timedelta(days=7),
+    )
+)
+def incremental_users():
+    """Incrementally append all users in the BigQuery table."""
+    return User.objects.filter(username__startswith="dwt_")
+
+
+@DWT.shared(
+    DWT.Settings(
+        bq_table_name="user__keyset",
+        bq_table_write_mode="append",
+        chunk_size=10,
+        fields=["first_name"],
+        incremental=True,
+        incremental_time_field="date_joined",
+        incremental_time_delay=timedelta(minutes=5),
+    )
+)
+def keyset_users():
+    """Incrementally append the users in order of when they joined."""
+    return User.objects.filter(username__startswith="dwt_")
+
+
+@DWT.shared(
+    DWT.Settings(
+        bq_table_name="user__partitioned",
+        bq_table_write_mode="overwrite",
+        chunk_size=10,
+        fields=["first_name"],
+        partitions=3,
+    )
+)
+def partitioned_users():
+    """Overwrite all users in the BigQuery table, 3 ranges at a time."""
+    return User.objects.filter(username__startswith="dwt_")
+
+
+@DWT.shared(
+    DWT.Settings(
+        bq_table_name="user__upserted",
+        bq_table_write_mode="overwrite",
+        chunk_size=10,
+        fields=["first_name"],
+        upsert={Change.Entity.USER: "id"},
+    )
+)
+def upserted_users():
+    """Upsert the users which changed in the BigQuery table."""
+    return User.objects.filter(username__startswith="dwt_", is_active=True)
+
+
+@DWT.shared(
+    DWT.Settings(
+        bq_table_name="user__diffed",
+        bq_table_write_mode="overwrite",
+        chunk_size=10,
+        fields=["first_name"],
+        diff=True,
+    )
+)
+def diffed_users():
+    """Only upload the users which changed in the BigQuery table."""
+    return User.objects.filter(username__startswith="dwt_")
+
+
+@DWT.shared(
+    DWT.Settings(
+        bq_table_name="user__staged",
+        bq_table_write_mode="overwrite",
+        chunk_size=10,
+        fields=["first_name", "date_joined"],
+        staging=DWT.Staging(chunks_per_file=1, max_memory_size=100),
+    )
+)
+def staged_users():
+    """Overwrite all users in the BigQuery table, staged as NDJSON files."""
+    return User.objects.filter(username__startswith="dwt_")
+
+
+class InlineExecutor(Executor):
+    """Runs each call in the current thread so it shares the test's
+    transaction."""
+
+    def __init__(self, **kwargs):
+        pass
+
+    def submit(self, fn, /, *args, **kwargs):
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            future.set_exception(ex)
+
+        return future
+
+
+class TestDataWarehouseTask(CeleryTestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create(
+                username=f"dwt_user_{i}", first_name=f"User {i}"
+            )
+            for i in range(15)
+        ]
+
+    # Settings
+
+    def _test_settings(self, code: str, **kwargs):
+        kwargs.setdefault("bq_table_write_mode", "append")
+        with self.assert_raises_validation_error(code=code):
+            DWT.Settings(chunk_size=10, fields=["some_field"], **kwargs)
+
+    def test_settings__incremental_not_append(self):
+        """Incremental tables must be appended to."""
+        self._test_settings(
+            code="incremental_not_append",
+            bq_table_write_mode="overwrite",
+            incremental=True,
+        )
+
+    def test_settings__full_refresh_interval_not_incremental(self):
+        """Only incremental tables can be fully refreshed."""
+        self._test_settings(
+            code="full_refresh_interval_not_incremental",
+            full_refresh_interval=timedelta(days=1),
+        )
+
+    def test_settings__incremental_time_field_not_incremental(self):
+        """Only incremental tables can be ordered by time."""
+        self._test_settings(
+            code="incremental_time_field_not_incremental",
+            incremental_time_field="date_joined",
+        )
+
+    def test_settings__incremental_time_delay_lt_0(self):
+        """The incremental time delay must be >= 0."""
+        self._test_settings(
+            code="incremental_time_delay_lt_0",
+            incremental=True,
+            incremental_time_delay=-timedelta(minutes=1),
+        )
+
+    def test_settings__full_refresh_interval_lte_0(self):
+        """The full refresh interval must be > 0."""
+        self._test_settings(
+            code="full_refresh_interval_lte_0",
+            incremental=True,
+            full_refresh_interval=timedelta(),
+        )
+
+    def test_settings__upsert_not_overwrite(self):
+        """Upserted tables must be overwritten."""
+        self._test_settings(
+            code="upsert_not_overwrite",
+            upsert={Change.Entity.USER: "id"},
+        )
+
+    def test_settings__upsert_no_entities(self):
+        """Upserted tables must upsert the changes of at least 1 entity."""
+        self._test_settings(
+            code="upsert_no_entities",
+            bq_table_write_mode="overwrite",
+            upsert={},
+        )
+
+    def test_settings__diff_not_overwrite(self):
+        """Diffed tables must be overwritten."""
+        self._test_settings(code="diff_not_overwrite", diff=True)
+
+    def test_settings__diff_upserted(self):
+        """Diffed tables cannot be upserted."""
+        self._test_settings(
+            code="diff_upserted",
+            bq_table_write_mode="overwrite",
+            diff=True,
+            upsert={Change.Entity.USER: "id"},
+        )
+
+    def test_settings__diff_unpivoted_or_partitioned(self):
+        """Diffed tables cannot be partitioned."""
+        self._test_settings(
+            code="diff_unpivoted_or_partitioned",
+            bq_table_write_mode="overwrite",
+            diff=True,
+            partitions=2,
+        )
+
+    def test_settings__staging_chunks_per_file_lt_1(self):
+        """Staged files must hold at least 1 chunk."""
+        self._test_settings(
+            code="staging_chunks_per_file_lt_1",
+            staging=DWT.Staging(chunks_per_file=0),
+        )
+
+    # Projection
+
+    def test_project(self):
+        """Only the saved columns are selected, without related objects."""
+        queryset = incremental_users.project(
+            User.objects.select_related("userprofile").prefetch_related(
+                "groups"
+            )
+        )
+
+        assert not queryset.query.select_related
+        # pylint: disable-next=protected-access
+        assert not queryset._prefetch_related_lookups
+        assert list(queryset.filter(id=self.users[0].id)) == [
+            (self.users[0].first_name, self.users[0].id)
+        ]
+
+    def test_project__no_model_instances(self):
+        """Rows are exported as tuples without building model instances."""
+        with patch.object(User, "from_db", side_effect=AssertionError):
+            self._assert_export("overwrite", self.users)
+
+    # Incremental
+
+    def _export(
+        self,
+        task: DWT = incremental_users,
+        uploaded_blob_names: t.Optional[t.List[str]] = None,
+        **task_kwargs,
+    ):
+        bucket = MagicMock()
+        bucket.list_blobs.return_value = []
+        for blob_name in uploaded_blob_names or []:
+            blob = MagicMock()
+            blob.name = blob_name
+            bucket.list_blobs.return_value.append(blob)
+
+        with patch.object(DWT, "_get_gcs_bucket", return_value=bucket):
+            self.apply_task(task.name, kwargs=task_kwargs)
+
+        # Get the uploaded blobs' names and their rows (excluding headers).
+        blobs: t.Dict[str, t.List[str]] = {}
+        for blob_call, upload_call in zip(
+            bucket.blob.call_args_list,
+            bucket.blob.return_value.upload_from_string.call_args_list,
+        ):
+            blobs[blob_call.args[0]] = upload_call.args[0].split("\n")[1:]
+
+        return blobs
+
+    def _assert_export(
+        self,
+        bq_table_write_mode: DWT.BqTableWriteMode,
+        users: t.List[User],
+        **task_kwargs,
+    ):
+        blobs = self._export(**task_kwargs)
+
+        assert all(
+            blob_name.startswith(f"user__incremental__{bq_table_write_mode}/")
+            for blob_name in blobs
+        )
+        assert [row for rows in blobs.values() for row in rows] == [
+            f"{user.first_name},{user.id}" for user in users
+        ]
+
+        watermark = Watermark.objects.get(bq_table_name="user__incremental")
+        assert watermark.last_id == users[-1].id
+
+        return watermark
+
+    def test_incremental__first_export(self):
+        """The first export overwrites the table with every row."""
+        watermark = self._assert_export("overwrite", self.users)
+        assert watermark.last_full_refresh_at is not None
+
+    def test_incremental__append(self):
+        """Only the rows added since the last export are appended."""
+        self._export()
+
+        users = [
+            User.objects.create(username=f"dwt_new_user_{i}", first_name="New")
+            for i in range(3)
+        ]
+
+        self._assert_export("append", users)
+
+        # Nothing is exported if no rows were added.
+        assert not self._export()
+
+    def test_incremental__full_refresh(self):
+        """The whole table can be exported again on demand."""
+        self._export()
+
+        self._assert_export("overwrite", self.users, full_refresh=True)
+
+    def test_incremental__full_refresh_due(self):
+        """The whole table is exported again once the interval has elapsed."""
+        self._export()
+
+        Watermark.objects.filter(bq_table_name="user__incremental").update(
+            last_full_refresh_at=timezone.now() - timedelta(days=7)
+        )
+
+        self._assert_export("overwrite", self.users)
+
+    # Partitioned
+
+    def _export_partitioned(self, uploaded_blob_names: t.List[str]):
+        with patch(
+            "src.data_warehouse.task.ThreadPoolExecutor", InlineExecutor
+        ), patch("src.data_warehouse.task.connections"):
+            return self._export(partitioned_users, uploaded_blob_names)
+
+    def test_partitioned(self):
+        """Each range of IDs is exported separately but the objects are indexed
+        as if exported together."""
+        blobs = self._export_partitioned(uploaded_blob_names=[])
+
+        obj_i_start = 1
+        for blob_name in blobs:
+            chunk = DWT.ChunkMetadata.from_blob_name(blob_name)
+            assert chunk.obj_i_start == obj_i_start
+            obj_i_start = chunk.obj_i_end + 1
+
+        assert [row for rows in blobs.values() for row in rows] == [
+            f"{user.first_name},{user.id}" for user in self.users
+        ]
+
+    def test_partitioned__resume(self):
+        """A retried export skips the chunks which were already uploaded."""
+        # pylint: disable-next=protected-access
+        partitions = partitioned_users._get_partitions(
+            partitioned_users.get_queryset()
+        )
+        assert len(partitions) == 3
+
+        partition = partitions[0]
+        timestamp = DWT.to_timestamp(timezone.now())
+        uploaded_blob_name = DWT.ChunkMetadata(
+            bq_table_name="user__partitioned",
+            bq_table_write_mode="overwrite",
+            timestamp=timestamp,
+            obj_i_start=partition.obj_i_start,
+            obj_i_end=partition.obj_i_end,
+        ).to_blob_name()
+
+        with patch.object(DWT, "to_timestamp", return_value=timestamp):
+            blobs = self._export_partitioned(
+                uploaded_blob_names=[uploaded_blob_name]
+            )
+
+        assert [row for rows in blobs.values() for row in rows] == [
+            f"{user.first_name},{user.id}"
+            for user in self.users[partition.obj_i_end :]
+        ]
+
+    # Upserted
+
+    def test_chunk_metadata__upsert(self):
+        """The metadata of an upserted chunk can be read from its blob name."""
+        chunk = DWT.ChunkMetadata(
+            bq_table_name="user__upserted",
+            bq_table_write_mode="upsert",
+            timestamp=DWT.to_timestamp(timezone.now()),
+            obj_i_start=1,
+            obj_i_end=10,
+        )
+
+        assert DWT.ChunkMetadata.from_blob_name(chunk.to_blob_name()) == chunk
+
+    def _assert_upsert(
+        self, bq_table_write_mode: DWT.BqTableWriteMode, users: t.List[User]
+    ):
+        blobs = self._export(upserted_users)
+
+        assert all(
+            blob_name.startswith(f"user__upserted__{bq_table_write_mode}/")
+            for blob_name in blobs
+        )
+        assert [row for rows in blobs.values() for row in rows] == [
+            f"{user.first_name},{user.id}" for user in users
+        ]
+
+        watermark = Watermark.objects.get(bq_table_name="user__upserted")
+        assert watermark.last_id == Change.objects.latest("id").id
+
+    def test_upsert__first_export(self):
+        """The first export overwrites the table with every row."""
+        self._assert_upsert("overwrite", self.users)
+
+    def test_upsert(self):
+        """Only the rows which changed since the last export are upserted."""
+        self._export(upserted_users)
+
+        users = [self.users[3], self.users[7]]
+        for user in users:
+            user.first_name = "Changed"
+            user.save()
+
+        self._assert_upsert("upsert", users)
+
+        # Nothing is exported if no rows changed.
+        assert not self._export(upserted_users)
+
+    def test_upsert__bulk_changes(self):
+        """Changes recorded without saving the rows are also upserted."""
+        self._export(upserted_users)
+
+        users = self.users[:2]
+        User.objects.filter(id__in=[user.id for user in users]).update(
+            first_name="Changed"
+        )
+        Change.objects.record(Change.Entity.USER, [user.id for user in users])
+        for user in users:
+            user.refresh_from_db()
+
+        self._assert_upsert("upsert", users)
+
+    def test_upsert__removed_rows(self):
+        """The changed rows which dropped out of the queryset are deleted."""
+        self._export(upserted_users)
+
+        changed_user = self.users[1]
+        changed_user.first_name = "Changed"
+        changed_user.save()
+        anonymized_user = self.users[4]
+        anonymized_user.first_name = ""
+        anonymized_user.is_active = False
+        anonymized_user.save()
+        deleted_user = self.users[9]
+        deleted_user_id = deleted_user.id
+        deleted_user.delete()
+
+        blobs = self._export(upserted_users)
+
+        rows = {
+            bq_table_write_mode: [
+                row
+                for blob_name, rows in blobs.items()
+                if blob_name.startswith(
+                    f"user__upserted__{bq_table_write_mode}/"
+                )
+                for row in rows
+            ]
+            for bq_table_write_mode in ["upsert", "delete"]
+        }
+        assert rows["upsert"] == [f"Changed,{changed_user.id}"]
+        assert rows["delete"] == [
+            f",{anonymized_user.id}",
+            f",{deleted_user_id}",
+        ]
+
+    # Diffed
+
+    def _get_diffed_rows(
+        self, blobs: t.Dict[str, t.List[str]], bq_table_write_mode: str
+    ):
+        return [
+            row
+            for blob_name, rows in blobs.items()
+            if blob_name.startswith(f"user__diffed__{bq_table_write_mode}/")
+            for row in rows
+        ]
+
+    def test_diff__first_export(self):
+        """The first export overwrites the table with every row."""
+        blobs = self._export(diffed_users)
+
+        assert self._get_diffed_rows(blobs, "overwrite") == [
+            f"{user.first_name},{user.id}" for user in self.users
+        ]
+        assert RowHash.objects.filter(
+            bq_table_name="user__diffed"
+        ).count() == len(self.users)
+
+    def test_diff(self):
+        """Only the inserted, changed and deleted rows are uploaded."""
+        self._export(diffed_users)
+
+        changed_user = self.users[2]
+        User.objects.filter(id=changed_user.id).update(first_name="Changed")
+        changed_user.refresh_from_db()
+        inserted_user = User.objects.create(
+            username="dwt_inserted_user", first_name="Inserted"
+        )
+        deleted_user = self.users[5]
+        deleted_user_id = deleted_user.id
+        deleted_user.delete()
+
+        blobs = self._export(diffed_users)
+
+        assert self._get_diffed_rows(blobs, "upsert") == [
+            f"{user.first_name},{user.id}"
+            for user in (changed_user, inserted_user)
+        ]
+        assert self._get_diffed_rows(blobs, "delete") == [f",{deleted_user_id}"]
+        assert not RowHash.objects.filter(
+            bq_table_name="user__diffed", row_id=deleted_user_id
+        ).exists()
+
+        # Nothing is exported if no rows changed.
+        assert not self._export(diffed_users)
+
+    # Staged
+
+    def test_staging(self):
+        """The rows are staged as compressed NDJSON files in a local bucket and
+        listed in a manifest."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bucket = LocalBucket(temp_dir)
+            with patch.object(DWT, "local_bucket", bucket):
+                self.apply_task(staged_users.name)
+
+            blobs = sorted(
+                bucket.list_blobs(prefix="user__staged__overwrite/"),
+                key=lambda blob: DWT.ChunkMetadata.from_blob_name(
+                    blob.name
+                ).obj_i_start,
+            )
+            assert [
+                DWT.ChunkMetadata.from_blob_name(blob.name).obj_i_end
+                for blob in blobs
+            ] == [10, 15]
+
+            rows: t.List[t.Dict[str, t.Any]] = []
+            for blob in blobs:
+                with gzip.open(blob.path, "rt", encoding="utf-8") as file:
+                    rows.extend(json.loads(line) for line in file)
+            assert rows == [
+                {
+                    "first_name": user.first_name,
+                    "date_joined": DWT.to_json_value(user.date_joined),
+                    "id": user.id,
+                }
+                for user in self.users
+            ]
+
+            (manifest_blob,) = bucket.list_blobs(
+                prefix="user__staged__overwrite__manifest/"
+            )
+            manifest = json.loads(
+                manifest_blob.path.read_text(encoding="utf-8")
+            )
+            assert sorted(manifest["blob_names"]) == sorted(
+                blob.name for blob in blobs
+            )
+
+    # Keyset
+
+    def _assert_keyset_export(
+        self,
+        bq_table_write_mode: DWT.BqTableWriteMode,
+        users: t.List[User],
+    ):
+        blobs = self._export(keyset_users)
+
+        assert all(
+            blob_name.startswith(f"user__keyset__{bq_table_write_mode}/")
+            for blob_name in blobs
+        )
+        assert [row for rows in blobs.values() for row in rows] == [
+            f"{user.first_name},{user.id}" for user in users
+        ]
+
+        watermark = Watermark.objects.get(bq_table_name="user__keyset")
+        assert (watermark.last_time, watermark.last_id) == (
+            users[-1].date_joined,
+            users[-1].id,
+        )
+
+    def test_keyset(self):
+        """The rows are appended exactly once in order of when they were added,
+        after the delay."""
+        now = timezone.now()
+        for i, user in enumerate(self.users):
+            user.date_joined = now - timedelta(hours=1, seconds=-i)
+            user.save()
+
+        self._assert_keyset_export("overwrite", self.users)
+
+        # The later user was given a smaller ID.
+        later_user, earlier_user = [
+            User.objects.create(
+                username=f"dwt_keyset_user_{i}",
+                first_name="New",
+                date_joined=now - timedelta(minutes=minutes),
+            )
+            for i, minutes in enumerate([10, 20])
+        ]
+        User.objects.create(  # Added within the delay.
+            username="dwt_keyset_user_delayed", first_name="Delayed"
+        )
+
+        self._assert_keyset_export("append", [earlier_user, later_user])
+
+        # Reruns are no-ops.
+        assert not self._export(keyset_users)
+
+    # Pipeline
+
+    def _export_pipelined(self, upload_from_string: t.Callable[..., t.Any]):
+        bucket = MagicMock()
+        bucket.list_blobs.return_value = []
+        bucket.blob.return_value.upload_from_string.side_effect = (
+            upload_from_string
+        )
+
+        with patch.object(DWT, "_get_gcs_bucket", return_value=bucket):
+            self.apply_task(
+                incremental_users.name,
+                kwargs={DWT.full_refresh_key: True},
+                throw=True,
+            )
+
+        return bucket
+
+    def test_pipeline(self):
+        """The CSVs are uploaded in the background, in order, while the next
+        chunk is read from the database."""
+        upload_thread_ids: t.Set[int] = set()
+
+        bucket = self._export_pipelined(
+            lambda *args, **kwargs: upload_thread_ids.add(threading.get_ident())
+        )
+
+        assert upload_thread_ids
+        assert threading.get_ident() not in upload_thread_ids
+        assert [
+            DWT.ChunkMetadata.from_blob_name(call.args[0]).obj_i_start
+            for call in bucket.blob.call_args_list
+        ] == [1, 11]
+
+    def test_pipeline__upload_error(self):
+        """An error raised while uploading in the background fails the task,
+        which is retried, and the watermark isn't advanced."""
+
+        def upload_from_string(*args, **kwargs):
+            raise ConnectionError()
+
+        with self.assertRaises(Retry) as context:
+            self._export_pipelined(upload_from_string)
+        assert isinstance(context.exception.exc, ConnectionError)
+
+        watermark = Watermark.objects.get(bq_table_name="user__incremental")
+        assert watermark.last_id == 0
+        assert watermark.last_full_refresh_at is None
+
+    def test_pipeline__disabled(self):
+        """The CSVs are uploaded inline if the pipeline's depth is 0."""
+        upload_thread_ids: t.Set[int] = set()
+
+        with patch.object(DWT, "pipeline_depth", 0):
+            self._export_pipelined(
+                lambda *args, **kwargs: upload_thread_ids.add(
+                    threading.get_ident()
+                )
+            )
+
+        assert upload_thread_ids == {threading.get_ident()}
+
+    # Dry run
+
+    def _dry_run(self, task: DWT):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "warehouse.sqlite3"
+            self.apply_task(
+                task.name, kwargs={DWT.dry_run_key: str(path)}, throw=True
+            )
+
+            connection = sqlite3.connect(path)
+            try:
+                rows = connection.execute(
+                    "SELECT _write_mode, first_name, id"
+                    f' FROM "{task.settings.bq_table_name}"'
+                    " ORDER BY CAST(id AS INTEGER)"
+                ).fetchall()
+            finally:
+                connection.close()
+
+        assert task.local_bucket is None
+        assert not task.dry_run
+
+        return rows
+
+    def test_dry_run(self):
+        """A dry run exports into a SQLite database and every change it made
+        to the database is rolled back."""
+        rows = self._dry_run(incremental_users)
+
+        assert rows == [
+            ("overwrite", user.first_name, str(user.id)) for user in self.users
+        ]
+        assert not Watermark.objects.filter(
+            bq_table_name="user__incremental"
+        ).exists()
+
+    def test_dry_run__partitioned(self):
+        """A partitioned dry run is exported in a single thread since other
+        threads can't share its transaction."""
+        with patch("src.data_warehouse.task.ThreadPoolExecutor") as executor:
+            rows = self._dry_run(partitioned_users)
+
+        executor.assert_not_called()
+        assert rows == [
+            ("overwrite", user.first_name, str(user.id)) for user in self.users
+        ]
@@ -0,0 +1,82 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 21:02:15(+01:00).
+"""
+
+import logging
+import typing as t
+
+from codeforlife.tasks import shared_task
+from django.conf import settings
+
+from .models import Change, KpiSnapshot, Watermark
+from .scheduler import Scheduler
+from .task import DataWarehouseTask, get_tasks
+
+
+@shared_task
+def prune_changes():
+    """Delete the changes which every upserted table has already exported.
+
+    Tables which have not been exported yet are fully refreshed on their first
+    export so they don't need any of the recorded changes.
+    """
+    bq_table_names = [
+        task.settings.bq_table_name
+        for task in get_tasks()
+        if task.settings.upsert is not None
+    ]
+
+    last_ids = list(
+        Watermark.objects.filter(bq_table_name__in=bq_table_names).values_list(
+            "last_id", flat=True
+        )
+    )
+    change_count, _ = Change.objects.filter(
+        id__lte=min(last_ids, default=0)
+    ).delete()
+    logging.info("Pruned %d changes.", change_count)
+
+
+@DataWarehouseTask.shared(
+    DataWarehouseTask.Settings(
+        bq_table_write_mode="overwrite",
+        chunk_size=1000,
+        fields=["date", *KpiSnapshot.METRICS],
+        id_field="date",
+        heavy=True,  # Scans the Attempt table.
+    )
+)
+def kpi_snapshots():
+    """
+    Takes today's snapshot of the scalar KPIs, computing every metric in one
+    pass, and collects every snapshot taken. Used to report on the history of
+    the registrations, anonymisations and custom levels.
+    """
+    KpiSnapshot.objects.take()
+
+    return KpiSnapshot.objects.all()
+
+
+# The scheduler stops starting tasks after the run's time limit, so give the
+# tasks still running an hour to finish, the max time limit of any task.
+@shared_task(time_limit=settings.DATA_WAREHOUSE_RUN_TIME_LIMIT + 60 * 60)
+def run_warehouse_tasks(max_concurrency: t.Optional[int] = None):
+    """Run every data warehouse task, a few at a time and longest-first.
+
+    Args:
+        max_concurrency: The max number of tasks running at once.
+
+    Returns:
+        A summary of the run.
+    """
+    summary = Scheduler(max_concurrency=max_concurrency).run()
+    logging.info(
+        "Ran %d data warehouse tasks in %.1fs (%d failed, %d skipped).",
+        len(summary["tasks"]),
+        summary["wall_time"],
+        summary["failed"],
+        len(summary["skipped"]),
+    )
+
+    return summary
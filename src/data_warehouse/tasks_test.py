@@ -0,0 +1,67 @@
+"""
+© Ocado Group
+Created on 18/10/2026 at 21:16:52(+01:00).
+"""
+
+from datetime import timedelta
+
+from codeforlife.tests import CeleryTestCase
+from django.utils import timezone
+
+from ..rapid_router.models import Level
+from .models import Change, KpiSnapshot, Watermark
+from .task import get_tasks
+from .tasks import kpi_snapshots
+
+# pylint: disable=missing-class-docstring
+
+
+class TestTasks(CeleryTestCase):
+    fixtures = ["school_1"]
+
+    def test_prune_changes(self):
+        """Only the changes every upserted table has exported are deleted."""
+        changes = Change.objects.record(Change.Entity.SCHOOL, [1, 2, 3])
+
+        bq_table_names = [
+            task.settings.bq_table_name
+            for task in get_tasks()
+            if task.settings.upsert is not None
+        ]
+        assert bq_table_names
+        Watermark.objects.bulk_create(
+            [
+                Watermark(bq_table_name=bq_table_name, last_id=changes[-1].id)
+                for bq_table_name in bq_table_names
+            ]
+        )
+        Watermark.objects.filter(bq_table_name=bq_table_names[0]).update(
+            last_id=changes[0].id
+        )
+
+        self.apply_task("src.data_warehouse.tasks.prune_changes")
+
+        assert not Change.objects.filter(id__lte=changes[0].id).exists()
+        assert Change.objects.filter(id__gt=changes[0].id).count() == 2
+
+    def test_kpi_snapshots(self):
+        """Today's snapshot is taken and every snapshot is collected."""
+        today = timezone.now().date()
+        yesterday = today - timedelta(days=1)
+        KpiSnapshot.objects.create(
+            date=yesterday, **dict.fromkeys(KpiSnapshot.METRICS, 0)
+        )
+
+        self.assert_data_warehouse_task(task=kpi_snapshots)
+
+        assert list(
+            KpiSnapshot.objects.order_by("date").values_list("date", flat=True)
+        ) == [yesterday, today]
+
+        snapshot = KpiSnapshot.objects.get(date=today)
+        assert (
+            snapshot.total_games_created
+            == Level.objects.filter(
+                episode_id__isnull=True, owner__isnull=False
+            ).count()
+        )
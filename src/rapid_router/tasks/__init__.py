@@ -4,3 +4,4 @@ Created on 24/10/2025 at 14:01:46(+01:00).
 """
 
 from .level import *
+from .top_score import *
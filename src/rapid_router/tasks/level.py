@@ -5,9 +5,9 @@ Created on 24/10/2025 at 14:02:48(+01:00).
 
 from datetime import date
 
-from codeforlife.tasks import DataWarehouseTask
 from django.db.models import Count, IntegerField, Q, Value
 
+from ...data_warehouse.task import DataWarehouseTask
 from ..models import Level
 
 